@@ -12,7 +12,7 @@ document.addEventListener("DOMContentLoaded", async function () {
 
     async function fetchElections() {
         try {
-            const response = await fetch("/api/elections/", {
+            const response = await fetchWithValidators("/api/elections/", {
                 method: "GET",
                 headers: {
                     "Authorization": `Bearer ${accessToken}`,
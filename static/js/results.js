@@ -19,7 +19,7 @@ document.addEventListener("DOMContentLoaded", async function () {
 
     async function fetchResults() {
         try {
-            const response = await fetch(`/api/elections/${electionId}/results/`, {
+            const response = await fetchWithValidators(`/api/elections/${electionId}/results/`, {
                 method: "GET",
                 headers: { "Authorization": `Bearer ${accessToken}` }
             });
@@ -33,6 +33,58 @@ document.addEventListener("DOMContentLoaded", async function () {
             const data = await response.json();
             if (!response.ok) throw new Error(data.error || "Failed to fetch results.");
 
+            renderResults(data);
+            if (data.winner === null) subscribe(data);
+        } catch (error) {
+            serverMessage.innerHTML = `<p class="text-danger">${error.message}</p>`;
+        }
+    }
+
+    // Live updates: the server pushes tally deltas; EventSource reconnects
+    // by itself and resumes from the last event id it saw. EventSource
+    // cannot send headers, so the URL carries a short-lived stream ticket
+    // rather than the access token; once it expires a reconnect is refused
+    // and a new stream is opened with a fresh ticket (starting from a snapshot).
+    async function subscribe(results) {
+        const response = await fetch(`/api/elections/${electionId}/results/stream/ticket/`, {
+            method: "POST",
+            headers: { "Authorization": `Bearer ${accessToken}` }
+        });
+        if (!response.ok) return;
+        const { ticket } = await response.json();
+        const stream = new EventSource(`/api/elections/${electionId}/results/stream/?ticket=${encodeURIComponent(ticket)}`);
+
+        stream.addEventListener("error", () => {
+            if (stream.readyState === EventSource.CLOSED && results.winner === null) {
+                setTimeout(() => subscribe(results), 1000);
+            }
+        });
+
+        stream.addEventListener("snapshot", event => {
+            results = JSON.parse(event.data);
+            renderResults(results);
+        });
+
+        stream.addEventListener("delta", event => {
+            const delta = JSON.parse(event.data);
+            const candidates = new Map(results.candidates.map(c => [c.id, c]));
+            delta.candidates.forEach(c => candidates.set(c.id, c));
+            delta.removed.forEach(id => candidates.delete(id));
+            results = {
+                ...results,
+                total_votes: delta.total_votes,
+                winner: delta.winner,
+                candidates: [...candidates.values()].sort((a, b) => b.votes - a.votes)
+            };
+            renderResults(results);
+            if (results.winner !== null) stream.close(); // Final results, nothing more to stream
+        });
+
+        window.addEventListener("beforeunload", () => stream.close());
+    }
+
+    function renderResults(data) {
+        try {
             electionInfo.innerText = `Election: ${data.election}`;
 
             // Winner Announcement
@@ -26,6 +26,7 @@ document.addEventListener("DOMContentLoaded", function () {
             e.preventDefault();
             localStorage.removeItem("access_token");
             localStorage.removeItem("refresh_token");
+            sessionStorage.clear(); // Cached API responses belong to this user
             window.location.href = "/login/";
         });
     }
@@ -45,3 +46,28 @@ function showErrorToast(message) {
     toastElement.show();
 }
 
+
+// GET that revalidates with the ETag of the last successful response for
+// the same URL; on 304 the stored body is replayed as a 200 Response, so
+// callers handle both cases the same way
+async function fetchWithValidators(url, options = {}) {
+    const key = `validators:${url}`;
+    const stored = JSON.parse(sessionStorage.getItem(key) || "null");
+    const headers = { ...(options.headers || {}) };
+    if (stored) headers["If-None-Match"] = stored.etag;
+
+    const response = await fetch(url, { ...options, headers });
+    if (response.status === 304 && stored) {
+        return new Response(stored.body, { status: 200, headers: { "Content-Type": "application/json", "ETag": stored.etag } });
+    }
+
+    const etag = response.headers.get("ETag");
+    if (response.ok && etag) {
+        try {
+            sessionStorage.setItem(key, JSON.stringify({ etag, body: await response.clone().text() }));
+        } catch (error) {
+            sessionStorage.removeItem(key); // Storage full: just skip revalidation next time
+        }
+    }
+    return response;
+}
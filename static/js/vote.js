@@ -21,7 +21,7 @@ document.addEventListener("DOMContentLoaded", async function () {
     // Fetch election details and candidates
     async function fetchElectionDetails() {
         try {
-            const response = await fetch(`/api/elections/${electionId}/candidates/`, {
+            const response = await fetchWithValidators(`/api/elections/${electionId}/candidates/`, {
                 method: "GET",
                 headers: { "Authorization": `Bearer ${accessToken}` }
             });
@@ -8,14 +8,14 @@ from django.utils.html import format_html
 from django.contrib.auth.models import Group
 from django.utils.timezone import now
 from django.contrib.auth.hashers import make_password
-from django.core.mail import send_mail
 from django.utils.translation import gettext_lazy as _
 from .models import *
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg') 
-import base64
-from io import BytesIO
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from .charts import get_results_chart
+from .counters import site_statistics
+from .outbox import queue_email
+from .signals import ballots_deleted
 
 class UserAdmin(admin.ModelAdmin):
     list_display = ('username', 'email', 'phone_number', 'display_profile_pic', 'aadhar_number', 'is_verified')
@@ -63,14 +63,13 @@ class UserAdmin(admin.ModelAdmin):
         if not change:
             token, created = EmailVerificationToken.objects.get_or_create(user=obj)
 
-            # Send Verification Email
+            # Queue Verification Email (same transaction as the admin save)
             verification_link = request.build_absolute_uri(reverse('verify-email', args=[token.token]))
-            send_mail(
+            queue_email(
                 "Verify Your Email - Online Voting System",
                 f"Click the link to verify your email: {verification_link}",
                 settings.EMAIL_HOST_USER,
                 [obj.email],
-                fail_silently=False,
             )
 
 class CandidateInline(admin.TabularInline):
@@ -81,9 +80,31 @@ class CandidateInline(admin.TabularInline):
 class ElectionAdmin(admin.ModelAdmin):
     list_display = ('name', 'start_date', 'end_date', 'is_active', 'display_winner', 'total_votes')
     search_fields = ('name',)
-    list_filter = ('is_active', 'start_date', 'end_date')
+    list_filter = ('is_active', 'voting_method', 'start_date', 'end_date')
     inlines = [CandidateInline]
     readonly_fields = ('results_chart',)
+    list_select_related = ('result_snapshot',)
+
+    def get_queryset(self, request):
+        """Annotate vote totals and the leading candidate so a page loads in constant queries"""
+        leader = (
+            Candidate.objects.filter(election=OuterRef('pk'))
+            .with_vote_totals()
+            .order_by('-vote_total', 'id')
+        )
+        # An election holds plurality votes or ranked ballots, never both
+        vote_count, ballot_count = (
+            model.objects.filter(election=OuterRef('pk'))
+            .values('election')
+            .annotate(count=Count('id'))
+            .values('count')
+            for model in (Vote, RankedBallot)
+        )
+        return super().get_queryset(request).annotate(
+            vote_count=Coalesce(Subquery(vote_count), 0) + Coalesce(Subquery(ballot_count), 0),
+            leader_name=Subquery(leader.values('name')[:1]),
+            leader_party=Subquery(leader.values('party')[:1]),
+        )
 
     @admin.display(description="Winner")
     def display_winner(self, obj):
@@ -91,39 +112,36 @@ class ElectionAdmin(admin.ModelAdmin):
         if not obj.end_date or obj.end_date > now():
             return "Results Pending"
 
-        winner = obj.get_winner()
-        return f"{winner.name} ({winner.party})" if winner else "No winner"
+        # Prefer the final snapshot; fall back to the annotated leader until it is written
+        try:
+            winner = obj.result_snapshot.results["winner"]
+        except ElectionResultSnapshot.DoesNotExist:
+            if obj.voting_method == Election.RANKED:
+                return "Results Pending"  # The runoff winner is only known once counted
+            winner = {"name": obj.leader_name, "party": obj.leader_party} if obj.leader_name else None
+        return f"{winner['name']} ({winner['party']})" if winner else "No winner"
 
-    @admin.display(description="Total Votes")
+    @admin.display(description="Total Votes", ordering='vote_count')
     def total_votes(self, obj):
         """Calculate total votes in an election"""
-        return Vote.objects.filter(election=obj).count()
+        return obj.vote_count
 
     def results_chart(self, obj):
         """Generate a pie chart for vote distribution"""
         if not obj.end_date or obj.end_date > now():
             return "Results will be available after the election ends."
 
-        candidates = Candidate.objects.filter(election=obj)
-        labels = [candidate.name for candidate in candidates]
-        votes = [candidate.votes for candidate in candidates]
+        # Finalizing is the scheduler's job; a GET only reads what it wrote
+        try:
+            results = obj.result_snapshot.results
+        except ElectionResultSnapshot.DoesNotExist:
+            return "Results Pending"
 
-        if not any(votes):  # If no votes are cast
+        digest = get_results_chart(results)
+        if digest is None:  # If no votes are cast
             return "No votes cast yet."
 
-        # Create the pie chart
-        fig, ax = plt.subplots(figsize=(4, 4))
-        ax.pie(votes, labels=labels, autopct='%1.1f%%', startangle=90, colors=['#ff9999','#66b3ff','#99ff99','#ffcc99'])
-        ax.axis('equal')  # Equal aspect ratio ensures the pie chart is circular.
-
-        # Convert plot to a PNG image
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        buffer.close()
-
-        return format_html('<img src="data:image/png;base64,{}" style="width:100%;"/>', image_base64)
+        return format_html('<img src="{}" style="width:100%;"/>', reverse('results-chart', args=[digest]))
 
     results_chart.short_description = "Election Results Chart"
 
@@ -139,14 +157,33 @@ class ElectionAdmin(admin.ModelAdmin):
 
 
 class CandidateAdmin(admin.ModelAdmin):
-    list_display = ('name', 'party', 'election', 'votes', 'vote_percentage', 'profile_pic_preview')
+    list_display = ('name', 'party', 'election', 'live_votes', 'vote_percentage', 'profile_pic_preview')
     search_fields = ('name', 'party', 'election__name')
     list_filter = ('election',)
+    list_select_related = ('election',)
+
+    def get_queryset(self, request):
+        """Annotate each row with its whole election's total, however the changelist is filtered"""
+        folded = (
+            Candidate.objects.filter(election=OuterRef('election_id'))
+            .values('election').annotate(total=Sum('votes')).values('total')
+        )
+        shards = (
+            VoteCounterShard.objects.filter(candidate__election=OuterRef('election_id'))
+            .values('candidate__election').annotate(total=Sum('count')).values('total')
+        )
+        return super().get_queryset(request).with_vote_totals().annotate(
+            election_vote_total=Coalesce(Subquery(folded), 0) + Coalesce(Subquery(shards), 0)
+        )
+
+    @admin.display(description="Votes", ordering='vote_total')
+    def live_votes(self, obj):
+        return obj.vote_total
 
     def vote_percentage(self, obj):
         """Calculate vote percentage dynamically"""
-        total_votes = sum(c.votes for c in Candidate.objects.filter(election=obj.election))
-        return f"{(obj.votes / total_votes * 100):.2f}%" if total_votes > 0 else "0%"
+        total_votes = obj.election_vote_total
+        return f"{(obj.vote_total / total_votes * 100):.2f}%" if total_votes else "0%"
 
     vote_percentage.short_description = "Vote %"
 
@@ -169,15 +206,30 @@ class CandidateAdmin(admin.ModelAdmin):
         return super().add_view(request, form_url, extra_context)
 
 
+class VoteAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'election', 'timestamp')
+    list_filter = ('election',)
+    list_select_related = ('voter', 'candidate', 'election')  # __str__ reads voter and candidate
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        ballots_deleted()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        ballots_deleted()
+
+
 class CustomAdminSite(AdminSite):
     def index(self, request, extra_context=None):
         """Override admin index to pass data to template"""
         extra_context = extra_context or {}
+        statistics = site_statistics.totals()  # Maintained counters, not COUNT(*) scans
         extra_context.update({
-            'total_users': User.objects.count(),
-            'total_elections': Election.objects.count(),
-            'total_votes': Vote.objects.count(),
-            'total_candidates': Candidate.objects.count(),
+            'total_users': statistics['users'],
+            'total_elections': statistics['elections'],
+            'total_votes': statistics['votes'],
+            'total_candidates': statistics['candidates'],
         })
         return super().index(request, extra_context=extra_context)
 
@@ -187,4 +239,4 @@ admin.site = CustomAdminSite()
 admin.site.register(Election, ElectionAdmin)
 admin.site.register(Candidate, CandidateAdmin)
 admin.site.register(User, UserAdmin)
-admin.site.register(Vote)
\ No newline at end of file
+admin.site.register(Vote, VoteAdmin)
\ No newline at end of file
@@ -0,0 +1,147 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core import signing
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class TokenCache:
+    """Bounded TTL cache of verified tokens, keyed by the token signature.
+
+    An entry never outlives the token's own `exp` claim, nor `ttl` seconds,
+    so deactivations and blacklisting made on another worker still take
+    effect within `ttl`. Local user changes drop entries immediately via
+    `invalidate_user`.
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'JWT_AUTH_CACHE_TTL', 60)
+        self.max_entries = max_entries or getattr(settings, 'JWT_AUTH_CACHE_MAX_ENTRIES', 10000)
+        self._entries = OrderedDict()
+        self._keys_by_user = {}  # user id: keys of their entries, so invalidation does not scan
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user, validated_token = entry
+            if expires_at <= time.time():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return user, validated_token
+
+    def set(self, key, user, validated_token):
+        expires_at = min(validated_token.get('exp', 0), time.time() + self.ttl)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (expires_at, user, validated_token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _discard(self, key):
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[1].pk
+        keys = self._keys_by_user[user_id]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_user[user_id]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that verifies each token once per request.
+
+    The outcome is stored on the Django request, so `JWTAuthenticationMiddleware`
+    and DRF share a single verification, and verified tokens are kept in
+    `token_cache` across requests to skip the signature check and user query.
+    """
+
+    def authenticate(self, request):
+        django_request = getattr(request, '_request', request)
+        if hasattr(django_request, '_jwt_auth'):
+            if isinstance(django_request._jwt_auth, AuthenticationFailed):
+                raise django_request._jwt_auth
+            return django_request._jwt_auth
+
+        try:
+            django_request._jwt_auth = self._authenticate(django_request)
+        except AuthenticationFailed as e:
+            django_request._jwt_auth = e
+            raise
+        return django_request._jwt_auth
+
+    def _authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return self.authenticate_token(raw_token)
+
+    def authenticate_token(self, raw_token):
+        """Verify a raw token through `token_cache`."""
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        key = raw_token.rsplit(b'.', 1)[-1]
+        cached = token_cache.get(key)
+        if cached is None:
+            validated_token = self.get_validated_token(raw_token)
+            user = self.get_user(validated_token)
+            token_cache.set(key, user, validated_token)
+        else:
+            user, validated_token = cached
+        # Views may modify request.user, so never hand out the cached instance
+        return copy.copy(user), validated_token
+
+
+STREAM_TICKET_SALT = 'voting.results-stream'
+
+
+def issue_stream_ticket(user_id, election_id):
+    """Signed ticket letting a user open one election's live results stream.
+
+    EventSource cannot send an Authorization header, so the ticket goes in
+    the URL instead of the access token: it expires after
+    `RESULTS_STREAM_TICKET_SECONDS` and authenticates nothing else.
+    """
+    return signing.dumps({'user': user_id, 'election': election_id}, salt=STREAM_TICKET_SALT)
+
+
+def check_stream_ticket(ticket, election_id):
+    """Return the user id of a valid ticket for `election_id`, or raise AuthenticationFailed."""
+    try:
+        payload = signing.loads(
+            ticket, salt=STREAM_TICKET_SALT, max_age=getattr(settings, 'RESULTS_STREAM_TICKET_SECONDS', 60)
+        )
+    except signing.BadSignature:  # Includes SignatureExpired
+        raise AuthenticationFailed("Invalid or expired stream ticket.")
+    if payload.get('election') != election_id:
+        raise AuthenticationFailed("Invalid or expired stream ticket.")
+    return payload['user']
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+from django.utils.timezone import now
+
+from .models import Candidate, Vote
+
+MAGIC = b'VOTESNP1'
+PREFIX = struct.Struct('<8sI')  # magic, header length
+BLOCK = 4096
+
+
+def ballot_file_path(election_id):
+    return os.path.join(settings.BALLOT_SNAPSHOT_DIR, f"election-{election_id}.votes")
+
+
+def tally_checksum(totals):
+    """Digest of a `{candidate_id: votes}` tally, comparable across sources."""
+    text = ",".join(f"{candidate_id}:{votes}" for candidate_id, votes in sorted(totals.items()))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def export_ballot_file(election, path=None, chunk_size=50000):
+    """Write the election's votes as a columnar file and return its header.
+
+    Layout: magic and header length, a JSON header padded to a 4 KiB block,
+    then one fixed-width array per column (`candidate` uint16 index into
+    the header's candidate ids, `timestamp` int64 microseconds since the
+    epoch). Votes are copied in id order up to the largest id at start, in
+    keyset-paginated chunks written straight into a memory map.
+    """
+    path = path or ballot_file_path(election.id)
+    votes = Vote.objects.filter(election=election)
+    last_vote_id = votes.aggregate(max_id=Max('id'))['max_id'] or 0
+    # Read after the last vote id, so every exported vote's candidate is listed
+    candidate_ids = list(Candidate.objects.filter(election=election).order_by('id').values_list('id', flat=True))
+    index = np.zeros(max(candidate_ids, default=0) + 1, dtype=np.int64)
+    index[candidate_ids] = np.arange(len(candidate_ids))
+
+    votes = votes.filter(id__lte=last_vote_id).order_by('id').values_list('id', 'candidate_id', 'timestamp')
+    count = votes.count()
+
+    # Room for the header: a fixed part plus the candidate ids and tallies
+    header_size = -(-(PREFIX.size + 1024 + 32 * len(candidate_ids)) // BLOCK) * BLOCK
+    columns = {
+        'candidate': {'dtype': '<u2', 'offset': header_size},
+        'timestamp': {'dtype': '<i8', 'offset': header_size + -(-count * 2 // 8) * 8},
+    }
+    size = columns['timestamp']['offset'] + count * 8
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as ballot_file:
+        ballot_file.truncate(max(size, header_size))
+
+    if count:
+        candidate_column = np.memmap(tmp_path, dtype='<u2', mode='r+', offset=header_size, shape=(count,))
+        timestamp_column = np.memmap(
+            tmp_path, dtype='<i8', mode='r+', offset=columns['timestamp']['offset'], shape=(count,)
+        )
+        row, last_id = 0, 0
+        while row < count:
+            chunk = list(votes.filter(id__gt=last_id)[:min(chunk_size, count - row)])
+            if not chunk:
+                break
+            _, candidates, timestamps = zip(*chunk)
+            candidate_column[row:row + len(chunk)] = index[list(candidates)]
+            timestamp_column[row:row + len(chunk)] = [int(timestamp.timestamp() * 1_000_000) for timestamp in timestamps]
+            row += len(chunk)
+            last_id = chunk[-1][0]
+        candidate_column.flush()
+        timestamp_column.flush()
+        tallies = np.bincount(candidate_column[:row], minlength=len(candidate_ids))
+        data_checksum = zlib.crc32(timestamp_column[:row].tobytes(), zlib.crc32(candidate_column[:row].tobytes()))
+        del candidate_column, timestamp_column
+        count = row
+    else:
+        tallies, data_checksum = np.zeros(len(candidate_ids), dtype=np.int64), 0
+
+    header = {
+        'election_id': election.id,
+        'election': election.name,
+        'exported_at': now().isoformat(),
+        'last_vote_id': last_vote_id,
+        'count': count,
+        'candidates': candidate_ids,
+        'columns': columns,
+        'data_crc32': data_checksum,
+        'tally_checksum': tally_checksum(dict(zip(candidate_ids, tallies.tolist()))),
+    }
+    encoded = json.dumps(header, separators=(',', ':')).encode()
+    if PREFIX.size + len(encoded) > header_size:
+        os.remove(tmp_path)
+        raise ValueError("Ballot file header does not fit its reserved block.")
+    with open(tmp_path, 'r+b') as ballot_file:
+        ballot_file.write(PREFIX.pack(MAGIC, len(encoded)) + encoded)
+    os.replace(tmp_path, path)
+    return header
+
+
+class BallotFile:
+    """Read-only view of an exported ballot file.
+
+    Columns are `numpy.memmap`s, so every worker process mapping the same
+    file shares one copy in the OS page cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as ballot_file:
+            magic, length = PREFIX.unpack(ballot_file.read(PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a ballot file.")
+            self.header = json.loads(ballot_file.read(length))
+        count = self.header['count']
+        self.columns = {
+            name: np.memmap(path, dtype=column['dtype'], mode='r', offset=column['offset'], shape=(count,))
+            if count else np.zeros(0, dtype=column['dtype'])
+            for name, column in self.header['columns'].items()
+        }
+
+    def totals(self):
+        """Votes per candidate id."""
+        counts = np.bincount(self.columns['candidate'], minlength=len(self.header['candidates']))
+        return dict(zip(self.header['candidates'], counts.tolist()))
+
+    def votes_per_hour(self):
+        """Votes in each hour since the first one, as a list."""
+        timestamps = self.columns['timestamp']
+        if not len(timestamps):
+            return []
+        return np.bincount((timestamps - timestamps.min()) // 3_600_000_000).tolist()
+
+    def verify_data(self):
+        """Recompute the CRC of both columns; reads the whole file."""
+        checksum = zlib.crc32(self.columns['candidate'].tobytes())
+        return zlib.crc32(self.columns['timestamp'].tobytes(), checksum) == self.header['data_crc32']
+
+
+_open_files = {}
+_open_lock = threading.Lock()
+
+
+def open_ballot_file(election_id):
+    """Process-wide mapping of the election's ballot file, reopened when it is re-exported."""
+    path = ballot_file_path(election_id)
+    modified = os.stat(path).st_mtime_ns  # FileNotFoundError when never exported
+    with _open_lock:
+        cached = _open_files.get(path)
+        if cached is None or cached[0] != modified:
+            cached = _open_files[path] = (modified, BallotFile(path))
+        return cached[1]
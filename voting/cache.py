@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class ResultsCache:
+    """Versioned cache for computed election results.
+
+    Entries are keyed by (election, tally version, closed flag). Every vote
+    commit bumps the election's tally version in the shared Django cache, so
+    an entry can never be served once newer votes exist, and results cached
+    while polling was open are never reused after the election closes.
+    A small in-process LRU sits in front of the shared backend.
+    """
+
+    def __init__(self, alias=None, max_entries=None, timeout=None):
+        self.alias = alias or getattr(settings, 'RESULTS_CACHE_ALIAS', 'default')
+        self.max_entries = max_entries or getattr(settings, 'RESULTS_CACHE_MAX_ENTRIES', 1024)
+        self.timeout = timeout or getattr(settings, 'RESULTS_CACHE_TIMEOUT', 300)
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _version_key(self, election_id):
+        return f"results:version:{election_id}"
+
+    def get_version(self, election_id):
+        key = self._version_key(election_id)
+        version = self.backend.get(key)
+        if version is None:
+            # Seed from the clock so a lost version key can never repeat an old one
+            self.backend.add(key, time.time_ns(), timeout=None)
+            version = self.backend.get(key)
+        return version
+
+    def bump(self, election_id):
+        """Invalidate every cached result of the election."""
+        try:
+            self.backend.incr(self._version_key(election_id))
+        except ValueError:
+            self.backend.set(self._version_key(election_id), time.time_ns(), timeout=None)
+
+    def get_or_compute(self, election_id, is_closed, compute):
+        version = self.get_version(election_id)
+        key = f"results:{election_id}:{version}:{int(is_closed)}"
+
+        with self._lock:
+            if key in self._local:
+                self._local.move_to_end(key)
+                self.hits += 1
+                return self._local[key]
+
+        results = self.backend.get(key)
+        if results is None:
+            results = compute()
+            self.backend.set(key, results, timeout=self.timeout)
+            with self._lock:
+                self.misses += 1
+        else:
+            with self._lock:
+                self.hits += 1
+
+        with self._lock:
+            self._local[key] = results
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0,
+                "entries": len(self._local),
+                "max_entries": self.max_entries,
+            }
+
+
+results_cache = ResultsCache()
+
+
+class ChangeCounters:
+    """Named version counters in the shared cache, used as ETag validators.
+
+    They live in the `RESULTS_CACHE_ALIAS` backend, which the system checks
+    require to be shared, so a bump from the vote queue worker or the
+    scheduler reaches every web worker's next ETag. A counter only ever
+    changes by `bump()`; like the results versions, a missing one is seeded
+    from the clock, so an evicted counter can never repeat a value an old
+    ETag was built from.
+    """
+
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(settings, 'RESULTS_CACHE_ALIAS', 'default')
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _key(self, name):
+        return f"changes:{name}"
+
+    def get_many(self, *names):
+        """Current values of the counters, in one cache round trip when they exist."""
+        keys = [self._key(name) for name in names]
+        found = self.backend.get_many(keys)
+        for key in keys:
+            if key not in found:
+                self.backend.add(key, time.time_ns(), timeout=None)
+                found[key] = self.backend.get(key)
+        return [found[key] for key in keys]
+
+    def bump(self, name):
+        try:
+            self.backend.incr(self._key(name))
+        except ValueError:
+            self.backend.set(self._key(name), time.time_ns(), timeout=None)
+
+
+change_counters = ChangeCounters()
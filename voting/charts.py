@@ -0,0 +1,69 @@
+import hashlib
+import json
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+logger = logging.getLogger(__name__)
+
+CHART_COLORS = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99']
+
+
+def chart_digest(results):
+    """Content address of a results chart: the hash of exactly what it draws."""
+    data = [(candidate["name"], candidate["votes"]) for candidate in results["candidates"]]
+    return hashlib.sha256(json.dumps(data, separators=(',', ':')).encode()).hexdigest()
+
+
+def chart_path(digest):
+    return os.path.join(settings.CHART_CACHE_DIR, f"{digest}.png")
+
+
+def render_pie_chart(labels, votes):
+    """Render a vote-share pie chart to PNG bytes.
+
+    Uses its own `Figure` rather than pyplot's global state, so concurrent
+    requests in threaded workers cannot draw into each other's charts.
+    """
+    figure = Figure(figsize=(4, 4))
+    FigureCanvasAgg(figure)
+    ax = figure.subplots()
+    ax.pie(votes, labels=labels, autopct='%1.1f%%', startangle=90, colors=CHART_COLORS)
+    ax.axis('equal')  # Equal aspect ratio ensures the pie chart is circular.
+
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def get_results_chart(results):
+    """Digest of the chart for `results`, rendering it into the file cache on first use.
+
+    Returns None when no votes were cast.
+    """
+    votes = [candidate["votes"] for candidate in results["candidates"]]
+    if not any(votes):
+        return None
+
+    digest = chart_digest(results)
+    path = chart_path(digest)
+    if not os.path.exists(path):
+        png = render_pie_chart([candidate["name"] for candidate in results["candidates"]], votes)
+        os.makedirs(settings.CHART_CACHE_DIR, exist_ok=True)
+        # Write then rename so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as chart_file:
+            chart_file.write(png)
+        os.replace(tmp_path, path)
+    return digest
+
+
+def prerender_results_chart(results):
+    try:
+        get_results_chart(results)
+    except Exception:
+        logger.exception("Failed to pre-render results chart for %s", results.get("election"))
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends whose keys only the current process can see
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Settings naming cache aliases that web workers, `process_vote_queue` and
+# the scheduler must all read and bump
+SHARED_CACHE_SETTINGS = ('RESULTS_CACHE_ALIAS', 'ROUTING_CACHE_ALIAS')
+
+
+def is_shared_cache(alias):
+    """Whether other processes see what is written to the cache alias."""
+    return settings.CACHES.get(alias, {}).get('BACKEND') not in (None,) + PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    errors = []
+    for name in SHARED_CACHE_SETTINGS:
+        alias = getattr(settings, name, 'default')
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend is None:
+            errors.append(Error(f"{name} names the cache alias '{alias}', which is not in CACHES.", id='voting.E001'))
+        elif not is_shared_cache(alias):
+            errors.append(Error(
+                f"{name} points at '{alias}', a process-local cache ({backend.rsplit('.', 1)[-1]}).",
+                hint="Versions bumped by other workers, the vote queue or the scheduler would never be seen; "
+                     "use a shared backend such as RedisCache or PyMemcacheCache.",
+                id='voting.E002',
+            ))
+    return errors
@@ -0,0 +1,129 @@
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import Candidate, Election, RankedBallot, StatisticShard, User, Vote, VoteCounterShard
+
+
+class ShardedVoteCounter:
+    """Contention-free vote counter backed by `VoteCounterShard` rows.
+
+    Each increment lands on a random shard with a single DB-side
+    `UPDATE ... SET count = count + n`, so concurrent voters for the same
+    candidate rarely lock the same row and no increment can be lost.
+    Reads add the shards to the folded `Candidate.votes` column.
+    """
+
+    def __init__(self, num_shards=None):
+        self.num_shards = num_shards or getattr(settings, 'VOTE_COUNTER_SHARDS', 16)
+
+    def increment(self, candidate_id, amount=1):
+        """Atomically add `amount` votes to a random shard of the candidate."""
+        shard = random.randrange(self.num_shards)
+        updated = VoteCounterShard.objects.filter(candidate_id=candidate_id, shard=shard).update(
+            count=F('count') + amount
+        )
+        if updated:
+            return
+
+        # First vote on this shard: create it, or fall back to the update if
+        # another request created it concurrently.
+        try:
+            with transaction.atomic():
+                VoteCounterShard.objects.create(candidate_id=candidate_id, shard=shard, count=amount)
+        except IntegrityError:
+            VoteCounterShard.objects.filter(candidate_id=candidate_id, shard=shard).update(
+                count=F('count') + amount
+            )
+
+    def total(self, candidate_id):
+        """Live vote total for one candidate."""
+        candidate = Candidate.objects.with_vote_totals().only('votes').get(id=candidate_id)
+        return candidate.vote_total
+
+    def totals_for_election(self, election_id):
+        """Map of candidate id -> live vote total, in two aggregate queries."""
+        totals = dict(Candidate.objects.filter(election_id=election_id).values_list('id', 'votes'))
+        shard_sums = (
+            VoteCounterShard.objects.filter(candidate__election_id=election_id)
+            .values_list('candidate_id')
+            .annotate(total=Sum('count'))
+        )
+        for candidate_id, count in shard_sums:
+            totals[candidate_id] += count
+        return totals
+
+    def fold(self, candidate_id):
+        """Move the shard counts into `Candidate.votes` and reset the shards."""
+        with transaction.atomic():
+            shards = VoteCounterShard.objects.select_for_update().filter(candidate_id=candidate_id)
+            folded = shards.aggregate(total=Sum('count'))['total'] or 0
+            if folded:
+                Candidate.objects.filter(id=candidate_id).update(votes=F('votes') + folded)
+                shards.update(count=0)
+        return folded
+
+
+vote_counter = ShardedVoteCounter()
+
+
+class SiteStatistics:
+    """Incrementally maintained row counts for the admin home and ops API.
+
+    Same sharding scheme as `ShardedVoteCounter`: writers bump a random
+    shard, readers sum all shards in one aggregate query. `reconcile()`
+    replaces the shards with a fresh COUNT(*) to correct any drift; the
+    first read seeds counters that have no shards yet.
+    """
+
+    # Counter name: the models whose rows it counts
+    MODELS = {
+        'users': (User,),
+        'elections': (Election,),
+        'candidates': (Candidate,),
+        'votes': (Vote, RankedBallot),
+    }
+
+    def __init__(self, num_shards=None):
+        self.num_shards = num_shards or getattr(settings, 'STATISTIC_SHARDS', 8)
+
+    def increment(self, name, amount=1):
+        shard = random.randrange(self.num_shards)
+        updated = StatisticShard.objects.filter(name=name, shard=shard).update(value=F('value') + amount)
+        if updated:
+            return
+        if not StatisticShard.objects.filter(name=name).exists():
+            return  # Not seeded yet; the first read counts the rows
+        try:
+            with transaction.atomic():
+                StatisticShard.objects.create(name=name, shard=shard, value=amount)
+        except IntegrityError:
+            StatisticShard.objects.filter(name=name, shard=shard).update(value=F('value') + amount)
+
+    def totals(self):
+        totals = dict(StatisticShard.objects.values_list('name').annotate(total=Sum('value')))
+        unseeded = [name for name in self.MODELS if name not in totals]
+        if unseeded:
+            # First read on an existing database: start from the true counts
+            self.reconcile(*unseeded)
+            return self.totals()
+        return {name: totals[name] for name in self.MODELS}
+
+    def reconcile(self, *names):
+        """Reset the counters (all by default) to the true row counts. Returns {name: drift}."""
+        drift = {}
+        for name in names or self.MODELS:
+            models = self.MODELS[name]
+            with transaction.atomic():
+                shards = StatisticShard.objects.select_for_update().filter(name=name)
+                counted = shards.aggregate(total=Sum('value'))['total'] or 0
+                actual = sum(model.objects.count() for model in models)
+                shards.delete()
+                StatisticShard.objects.create(name=name, shard=0, value=actual)
+            drift[name] = counted - actual
+        return drift
+
+
+site_statistics = SiteStatistics()
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+import zlib
+
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware
+from rest_framework.exceptions import ValidationError
+
+from .models import Vote
+
+LEDGER_FIELDS = ('id', 'timestamp', 'election_id', 'candidate_id', 'candidate_name', 'voter_id', 'voter_username')
+FORMATS = ('csv', 'ndjson')
+
+
+def ledger_rows(election_id, since=None, until=None, after_id=None, before_id=None, chunk_size=2000):
+    """Yield the vote ledger of an election as tuples of `LEDGER_FIELDS`, in id order.
+
+    Rows are fetched by keyset pagination on the primary key, one bounded
+    query per chunk, so memory stays flat however many votes there are and
+    no cursor is held open between chunks.
+    """
+    votes = Vote.objects.filter(election_id=election_id)
+    if since is not None:
+        votes = votes.filter(timestamp__gte=since)
+    if until is not None:
+        votes = votes.filter(timestamp__lt=until)
+    if before_id is not None:
+        votes = votes.filter(id__lt=before_id)
+    votes = votes.order_by('id').values_list(
+        'id', 'timestamp', 'election_id', 'candidate_id', 'candidate__name', 'voter_id', 'voter__username'
+    )
+
+    last_id = after_id or 0
+    while True:
+        chunk = list(votes.filter(id__gt=last_id)[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1][0]
+
+
+def parse_ledger_filters(params):
+    """Range filters for `ledger_rows` from query or command options; values may be None."""
+    filters = {}
+    for name in ('since', 'until'):
+        if params.get(name):
+            try:
+                value = parse_datetime(params[name])
+            except ValueError:
+                value = None
+            if value is None:
+                raise ValidationError(f"{name} must be an ISO 8601 datetime.")
+            filters[name] = make_aware(value) if is_naive(value) else value
+    for name in ('after_id', 'before_id'):
+        if params.get(name) not in (None, ''):
+            try:
+                filters[name] = int(params[name])
+            except (TypeError, ValueError):
+                raise ValidationError(f"{name} must be an integer.")
+    return filters
+
+
+def encode_csv(rows, chunk_size=2000):
+    """CSV bytes with a header row, one bytes object per `chunk_size` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(LEDGER_FIELDS)
+    for count, row in enumerate(rows, 1):
+        writer.writerow((row[0], row[1].isoformat(), *row[2:]))
+        if count % chunk_size == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def encode_ndjson(rows, chunk_size=2000):
+    """One JSON object per line, one bytes object per `chunk_size` rows."""
+    lines = []
+    for row in rows:
+        record = dict(zip(LEDGER_FIELDS, row))
+        record['timestamp'] = record['timestamp'].isoformat()
+        lines.append(json.dumps(record, separators=(',', ':')))
+        if len(lines) >= chunk_size:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+def gzip_stream(chunks):
+    """Compress a byte stream incrementally into a single gzip member."""
+    compressor = zlib.compressobj(wbits=31)  # 16 + MAX_WBITS: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_ledger(election_id, file_format='csv', compress=False, chunk_size=2000, **filters):
+    """Encoded ledger export as an iterator of bytes."""
+    rows = ledger_rows(election_id, chunk_size=chunk_size, **filters)
+    encode = encode_csv if file_format == 'csv' else encode_ndjson
+    chunks = encode(rows, chunk_size)
+    return gzip_stream(chunks) if compress else chunks
@@ -0,0 +1,244 @@
+import sqlite3
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from .cache import change_counters, results_cache
+from .counters import site_statistics, vote_counter
+from .models import Candidate, Election, Vote
+from .routing import pin_to_primary
+
+PENDING = 'pending'
+PROCESSING = 'processing'
+COMMITTED = 'committed'
+REJECTED = 'rejected'
+
+
+class VoteQueue:
+    """Durable write-behind queue for accepted votes.
+
+    Votes are appended to a local SQLite file so the API can answer with a
+    receipt straight away; `drain()` later commits them to the main database
+    in batches. A (voter, election) unique key in the queue rejects repeat
+    submissions before they ever reach the worker.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS vote_queue (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            receipt_id TEXT NOT NULL UNIQUE,
+            voter_id INTEGER NOT NULL,
+            election_id INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            error TEXT,
+            enqueued_at REAL NOT NULL,
+            committed_at REAL,
+            UNIQUE (voter_id, election_id)
+        );
+        CREATE INDEX IF NOT EXISTS vote_queue_status ON vote_queue (status, seq);
+        CREATE INDEX IF NOT EXISTS vote_queue_election ON vote_queue (election_id, status);
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.VOTE_QUEUE_PATH)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, voter_id, election_id, candidate_id):
+        """Durably accept a vote and return its receipt id."""
+        receipt_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                existing = conn.execute(
+                    'SELECT status FROM vote_queue WHERE voter_id = ? AND election_id = ?',
+                    (voter_id, election_id),
+                ).fetchone()
+                if existing is not None:
+                    if existing['status'] != REJECTED:
+                        raise ValidationError("You have already voted in this election.")
+                    # A rejected ballot (e.g. unknown candidate) may be resubmitted
+                    conn.execute(
+                        'DELETE FROM vote_queue WHERE voter_id = ? AND election_id = ?',
+                        (voter_id, election_id),
+                    )
+                conn.execute(
+                    'INSERT INTO vote_queue (receipt_id, voter_id, election_id, candidate_id, status, enqueued_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (receipt_id, voter_id, election_id, candidate_id, PENDING, time.time()),
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return receipt_id
+
+    def status(self, receipt_id):
+        """Return the queue entry for a receipt as a dict, or None."""
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM vote_queue WHERE receipt_id = ?', (receipt_id,)).fetchone()
+        return dict(row) if row else None
+
+    def has_unfinished(self, election_id):
+        """Whether votes for the election are still pending or being committed."""
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT 1 FROM vote_queue WHERE election_id = ? AND status IN (?, ?) LIMIT 1',
+                (election_id, PENDING, PROCESSING),
+            ).fetchone() is not None
+
+    def release_claimed(self):
+        """Return entries left in `processing` by a crashed worker to the queue."""
+        with self._connect() as conn:
+            return conn.execute(
+                'UPDATE vote_queue SET status = ? WHERE status = ?', (PENDING, PROCESSING)
+            ).rowcount
+
+    def _claim(self, batch_size):
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute(
+                'SELECT seq, voter_id, election_id, candidate_id, enqueued_at FROM vote_queue '
+                'WHERE status = ? ORDER BY seq LIMIT ?',
+                (PENDING, batch_size),
+            ).fetchall()
+            conn.executemany(
+                'UPDATE vote_queue SET status = ? WHERE seq = ?', [(PROCESSING, row['seq']) for row in rows]
+            )
+            conn.execute('COMMIT')
+        return [dict(row) for row in rows]
+
+    def _finish(self, outcomes):
+        finished_at = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'UPDATE vote_queue SET status = ?, error = ?, committed_at = ? WHERE seq = ?',
+                [(status, error, finished_at if status == COMMITTED else None, seq)
+                 for seq, (status, error) in outcomes.items()],
+            )
+            conn.execute('COMMIT')
+
+    def drain(self, batch_size=500):
+        """Commit one batch of queued votes. Returns the number of entries processed."""
+        entries = self._claim(batch_size)
+        if not entries:
+            return 0
+
+        election_ids = {entry['election_id'] for entry in entries}
+        polling_windows = {
+            election_id: (start.timestamp(), end.timestamp())
+            # Ranked elections only take ballots through the ranked API
+            for election_id, start, end in Election.objects.filter(
+                id__in=election_ids, voting_method=Election.PLURALITY
+            ).values_list('id', 'start_date', 'end_date')
+        }
+        candidate_elections = dict(
+            Candidate.objects.filter(election_id__in=election_ids).values_list('id', 'election_id')
+        )
+
+        outcomes = {}
+        with transaction.atomic():
+            # Votes already in the ledger, e.g. committed before a worker crash
+            existing = dict(
+                ((voter_id, election_id), candidate_id)
+                for voter_id, election_id, candidate_id in Vote.objects.filter(
+                    election_id__in=election_ids, voter_id__in={entry['voter_id'] for entry in entries}
+                ).values_list('voter_id', 'election_id', 'candidate_id')
+            )
+
+            new_votes = []
+            for entry in entries:
+                key = (entry['voter_id'], entry['election_id'])
+                opens, closes = polling_windows.get(entry['election_id'], (None, None))
+                if opens is None:
+                    outcomes[entry['seq']] = (REJECTED, "No Election matches the given query.")
+                elif not opens <= entry['enqueued_at'] <= closes:
+                    outcomes[entry['seq']] = (REJECTED, "Voting is not open for this election.")
+                elif candidate_elections.get(entry['candidate_id']) != entry['election_id']:
+                    outcomes[entry['seq']] = (REJECTED, "No Candidate matches the given query.")
+                elif key in existing:
+                    if existing[key] == entry['candidate_id']:
+                        outcomes[entry['seq']] = (COMMITTED, None)
+                    else:
+                        outcomes[entry['seq']] = (REJECTED, "You have already voted in this election.")
+                else:
+                    existing[key] = entry['candidate_id']
+                    new_votes.append((entry['seq'], Vote(
+                        voter_id=entry['voter_id'], election_id=entry['election_id'],
+                        candidate_id=entry['candidate_id'],
+                    )))
+                    outcomes[entry['seq']] = (COMMITTED, None)
+
+            new_votes = self._create_votes(new_votes, outcomes, batch_size)
+            if new_votes:  # bulk_create sends no post_save signals
+                site_statistics.increment('votes', len(new_votes))
+
+            # One counter bump per candidate for the whole batch
+            deltas = Counter(vote.candidate_id for vote in new_votes)
+            for candidate_id, delta in deltas.items():
+                vote_counter.increment(candidate_id, delta)
+            for election_id in {vote.election_id for vote in new_votes}:
+                transaction.on_commit(lambda election_id=election_id: results_cache.bump(election_id))
+            for voter_id in {vote.voter_id for vote in new_votes}:
+                transaction.on_commit(lambda voter_id=voter_id: change_counters.bump(f'ballots:{voter_id}'))
+                transaction.on_commit(lambda voter_id=voter_id: pin_to_primary(voter_id))
+
+        self._finish(outcomes)
+        return len(entries)
+
+    @staticmethod
+    def _create_votes(new_votes, outcomes, batch_size):
+        """Insert `(seq, vote)` pairs and return the votes written.
+
+        A vote cast through the synchronous API after `existing` was read
+        makes the batch insert fail on the (voter, election) key; the batch
+        is then retried one row at a time and only the conflicting entries
+        are rejected.
+        """
+        try:
+            with transaction.atomic():
+                Vote.objects.bulk_create([vote for _, vote in new_votes], batch_size=batch_size)
+            return [vote for _, vote in new_votes]
+        except IntegrityError:
+            pass
+
+        created = []
+        for seq, vote in new_votes:
+            # Fresh instance: an earlier, rolled-back batch may have set the pk
+            vote = Vote(voter_id=vote.voter_id, election_id=vote.election_id, candidate_id=vote.candidate_id)
+            try:
+                with transaction.atomic():
+                    Vote.objects.bulk_create([vote])
+            except IntegrityError:
+                outcomes[seq] = (REJECTED, "You have already voted in this election.")
+            else:
+                created.append(vote)
+        return created
+
+
+_queue = None
+
+
+def get_vote_queue():
+    """Process-wide queue bound to `settings.VOTE_QUEUE_PATH`."""
+    global _queue
+    if _queue is None or _queue.path != str(settings.VOTE_QUEUE_PATH):
+        _queue = VoteQueue()
+    return _queue
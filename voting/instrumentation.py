@@ -0,0 +1,152 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('voting.requests')
+
+IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+NUMBER = re.compile(r'\b\d+\b')
+
+
+def fingerprint(sql):
+    """Shape of a query: parameters are already placeholders, IN lists and literals collapse."""
+    return NUMBER.sub('N', IN_LIST.sub('(...)', sql))
+
+
+class QueryRecorder:
+    """`execute_wrapper` hook counting queries, SQL time and repeated query shapes."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        """Query shapes run more than once, most repeated first."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+
+class LatencyHistograms:
+    """Per-URL-name request latency histograms in Prometheus exposition format."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, url_name, duration, queries, sql_duration):
+        with self._lock:
+            series = self._series.get(url_name)
+            if series is None:
+                series = self._series[url_name] = {
+                    'buckets': [0] * len(self.BUCKETS), 'count': 0, 'sum': 0.0, 'queries': 0, 'sql': 0.0,
+                }
+            for index, bound in enumerate(self.BUCKETS):
+                if duration <= bound:
+                    series['buckets'][index] += 1
+                    break
+            series['count'] += 1
+            series['sum'] += duration
+            series['queries'] += queries
+            series['sql'] += sql_duration
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        with self._lock:
+            series = {name: dict(values, buckets=list(values['buckets'])) for name, values in self._series.items()}
+
+        lines = [
+            '# HELP http_request_duration_seconds Request latency by URL name.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for name, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS, values['buckets']):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{url_name="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{url_name="{name}",le="+Inf"}} {values["count"]}')
+            lines.append(f'http_request_duration_seconds_sum{{url_name="{name}"}} {values["sum"]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{url_name="{name}"}} {values["count"]}')
+        for metric, key, help_text in (
+            ('db_queries_total', 'queries', 'SQL queries run by requests, by URL name.'),
+            ('db_query_duration_seconds_total', 'sql', 'Time spent in SQL by requests, by URL name.'),
+        ):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+            for name, values in sorted(series.items()):
+                value = values[key] if key == 'queries' else f'{values[key]:.6f}'
+                lines.append(f'{metric}{{url_name="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+latency_histograms = LatencyHistograms()
+
+
+class InstrumentationMiddleware:
+    """Opt-in per-request SQL and latency instrumentation.
+
+    When `REQUEST_INSTRUMENTATION` is off, Django drops the middleware at
+    startup, so it costs nothing. When on, every request records its
+    queries through `execute_wrapper` hooks, answers with a `Server-Timing`
+    header, feeds the latency histograms behind `/metrics`, and a sample of
+    requests is logged as JSON to the `voting.requests` logger.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_LOG_SAMPLE_RATE', 0.01)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        url_name = (match.url_name or match.view_name) if match else 'unmatched'
+        latency_histograms.observe(url_name, duration, recorder.count, recorder.duration)
+
+        duplicates = recorder.duplicates()
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries, {len(duplicates)} repeated"',
+            f'app;dur={duration * 1000:.1f}',
+        ])
+
+        if random.random() < self.sample_rate:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'url_name': url_name,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'queries': recorder.count,
+                'sql_ms': round(recorder.duration * 1000, 2),
+                'duplicates': [{'sql': sql, 'count': count} for sql, count in duplicates[:5]],
+            }))
+        return response
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import logging
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .cache import results_cache
+from .services import ElectionResultService
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event_id, event, data):
+    """One Server-Sent Event, encoded once and shared by every subscriber."""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def results_delta(previous, current):
+    """Changed candidates plus the new totals, or None when nothing changed."""
+    before = {candidate["id"]: candidate for candidate in previous["candidates"]}
+    changed = [candidate for candidate in current["candidates"] if before.get(candidate["id"]) != candidate]
+    removed = sorted(before.keys() - {candidate["id"] for candidate in current["candidates"]})
+    if not changed and not removed and current["winner"] == previous["winner"]:
+        return None
+    return {
+        "total_votes": current["total_votes"],
+        "winner": current["winner"],
+        "candidates": changed,
+        "removed": removed,
+    }
+
+
+class Subscriber:
+    """Bounded event buffer of one client stream."""
+
+    def __init__(self, max_buffer):
+        self.queue = asyncio.Queue(maxsize=max_buffer)
+        self.resets = 0
+
+    def send(self, message, snapshot):
+        """Queue an event; a client too slow to keep up skips straight to the latest snapshot."""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(snapshot)
+            self.resets += 1
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class ElectionBroadcaster:
+    """Fans one election's tally changes out to every local subscriber.
+
+    A single task per election polls the shared tally version, which costs a
+    cache read; only when a vote commit has bumped it are the results read
+    once and the delta broadcast to all subscribers. Recent deltas are kept
+    by event id (the tally version) so reconnecting clients can resume.
+    """
+
+    def __init__(self, election_id, hub):
+        self.election_id = election_id
+        self.hub = hub
+        self.subscribers = set()
+        self.history = deque(maxlen=hub.history)
+        self.version = None
+        self.results = None
+        self.snapshot = None
+        self.task = None
+
+    def subscribe(self, last_event_id=None):
+        subscriber = Subscriber(self.hub.max_buffer)
+        self.subscribers.add(subscriber)
+        if self.snapshot is not None:
+            self.catch_up(subscriber, last_event_id)
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def catch_up(self, subscriber, last_event_id):
+        """Replay the deltas missed since `last_event_id`, or send a snapshot if they are gone."""
+        if last_event_id == str(self.version):
+            return
+        versions = [previous for previous, _ in self.history]
+        if last_event_id in versions:
+            for _, message in list(self.history)[versions.index(last_event_id):]:
+                subscriber.send(message, self.snapshot)
+        else:
+            subscriber.send(self.snapshot, self.snapshot)
+
+    async def refresh(self):
+        """Read the results once if the tally version moved, and broadcast the change."""
+        version = await sync_to_async(results_cache.get_version)(self.election_id)
+        if version == self.version:
+            return
+        results = await sync_to_async(ElectionResultService.get_results)(self.election_id)
+        self.publish(version, results)
+
+    def publish(self, version, results):
+        previous_version, previous = self.version, self.results
+        self.version, self.results = version, results
+        self.snapshot = format_event(version, "snapshot", results)
+        if previous is None:
+            message = self.snapshot
+        else:
+            delta = results_delta(previous, results)
+            if delta is None:
+                return
+            message = format_event(version, "delta", delta)
+            self.history.append((str(previous_version), message))
+        for subscriber in self.subscribers:
+            subscriber.send(message, self.snapshot)
+
+    async def run(self):
+        try:
+            while self.subscribers:
+                try:
+                    await self.refresh()
+                except Exception:
+                    logger.exception("Live results refresh failed for election %s", self.election_id)
+                await asyncio.sleep(self.hub.poll_interval)
+        finally:
+            # No await between the last check and here, so nobody subscribed meanwhile
+            self.task = None
+            if not self.subscribers:
+                self.hub.broadcasters.pop(self.election_id, None)
+
+
+class LiveResultsHub:
+    """Per-process registry of election broadcasters, created on first subscriber."""
+
+    def __init__(self, poll_interval=None, heartbeat=None, max_buffer=None, history=None):
+        self.poll_interval = poll_interval or getattr(settings, 'LIVE_RESULTS_POLL_INTERVAL', 1)
+        self.heartbeat = heartbeat or getattr(settings, 'LIVE_RESULTS_HEARTBEAT', 15)
+        self.max_buffer = max_buffer or getattr(settings, 'LIVE_RESULTS_MAX_BUFFER', 32)
+        self.history = history or getattr(settings, 'LIVE_RESULTS_HISTORY', 64)
+        self.broadcasters = {}
+
+    def broadcaster(self, election_id):
+        if election_id not in self.broadcasters:
+            self.broadcasters[election_id] = ElectionBroadcaster(election_id, self)
+        return self.broadcasters[election_id]
+
+    async def stream(self, election_id, last_event_id=None):
+        """Encoded SSE stream for one client, with heartbeats while the tally is idle."""
+        broadcaster = self.broadcaster(election_id)
+        subscriber = broadcaster.subscribe(last_event_id)
+        try:
+            yield f"retry: {int(self.poll_interval * 1000)}\n\n".encode()
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": heartbeat\n\n"
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+
+live_results = LiveResultsHub()
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from voting.models import Election
+from voting.turnout import turnout_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-minute turnout rollup of past elections from the Vote ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--election', type=int, action='append', dest='elections',
+                            help="Election id to rebuild (repeatable; default: every election).")
+
+    def handle(self, *args, **options):
+        elections = Election.objects.order_by('id')
+        if options['elections']:
+            elections = elections.filter(id__in=options['elections'])
+
+        for election_id, name in elections.values_list('id', 'name'):
+            votes = turnout_rollup.backfill(election_id)
+            self.stdout.write(f"{name}: {votes} votes")
+        self.stdout.write(self.style.SUCCESS("Turnout rollup rebuilt."))
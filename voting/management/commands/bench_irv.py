@@ -0,0 +1,53 @@
+import time
+import tracemalloc
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from voting.ranked import EXHAUSTED, ballot_dtype, instant_runoff
+
+
+class Command(BaseCommand):
+    help = "Tabulate a synthetic instant-runoff election in memory and report time and peak memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ballots', type=int, default=5000000)
+        parser.add_argument('--candidates', type=int, default=20)
+        parser.add_argument('--memory-mb', type=float, default=256, help="Budget for ballot matrix plus tabulation.")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def generate(self, ballots, candidates, rng, chunk=100000):
+        """Plackett-Luce ballots with skewed popularity and truncated rankings, built chunk by chunk."""
+        matrix = np.empty((ballots, candidates), dtype=ballot_dtype(candidates))
+        popularity = np.log(rng.dirichlet(np.ones(candidates)))
+        for start in range(0, ballots, chunk):
+            rows = min(chunk, ballots - start)
+            keys = popularity + rng.gumbel(size=(rows, candidates))
+            ranked = np.argsort(-keys, axis=1).astype(matrix.dtype)
+            depth = rng.integers(1, candidates + 1, size=rows)
+            ranked[np.arange(candidates) >= depth[:, None]] = EXHAUSTED
+            matrix[start:start + rows] = ranked
+        return matrix
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        started = time.perf_counter()
+        ballots = self.generate(options['ballots'], options['candidates'], rng)
+        self.stdout.write(f"generated {len(ballots)} ballots in {time.perf_counter() - started:.1f}s")
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        rounds = instant_runoff(ballots, options['candidates'])
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        matrix_mb, peak_mb = ballots.nbytes / 2 ** 20, peak / 2 ** 20
+        self.stdout.write(f"rounds:        {len(rounds)}, winner index {rounds[-1]['winner']}, "
+                          f"exhausted {rounds[-1]['exhausted']}")
+        self.stdout.write(f"tabulation:    {elapsed:.2f}s ({len(ballots) / elapsed / 1e6:.1f}M ballots/s)")
+        self.stdout.write(f"memory:        {matrix_mb:.0f} MB ballot matrix + {peak_mb:.0f} MB peak during tabulation")
+        if matrix_mb + peak_mb <= options['memory_mb']:
+            self.stdout.write(self.style.SUCCESS(f"Within the {options['memory_mb']:.0f} MB budget."))
+        else:
+            self.stdout.write(self.style.ERROR(f"Over the {options['memory_mb']:.0f} MB budget."))
@@ -0,0 +1,56 @@
+import time
+import uuid
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from voting.authentication import CachedJWTAuthentication, token_cache
+from voting.models import User
+
+
+class Command(BaseCommand):
+    help = "Compare DB queries and time per request for the old double JWT auth and the cached single pass."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help="Requests to simulate per mode.")
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        run_id = uuid.uuid4().hex[:8]
+        user = User.objects.create(
+            username=f"bench-{run_id}", email=f"bench-{run_id}@example.com",
+            first_name="Bench", last_name="User", date_of_birth=date(1990, 1, 1),
+        )
+        header = f"Bearer {RefreshToken.for_user(user).access_token}"
+        factory = RequestFactory()
+
+        def before(request):
+            # Old flow: the middleware and DRF each verify the token and load the user
+            JWTAuthentication().authenticate(request)
+            Request(request, authenticators=[JWTAuthentication()]).user
+
+        def after(request):
+            auth = CachedJWTAuthentication()
+            auth.authenticate(request)
+            Request(request, authenticators=[auth]).user
+
+        try:
+            token_cache.clear()
+            for name, flow in (("before", before), ("after", after)):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(total):
+                        flow(factory.get("/api/elections/", HTTP_AUTHORIZATION=header))
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{name:<7} {len(queries) / total:6.3f} queries/request  "
+                    f"{elapsed / total * 1e6:8.1f} us/request"
+                )
+        finally:
+            user.delete()
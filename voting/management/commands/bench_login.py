@@ -0,0 +1,63 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import date
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+
+from voting.models import User
+from voting.passwords import password_pool
+from voting.services import LoginService
+
+
+class Command(BaseCommand):
+    help = "Report logins per second per core for the old double-hash, single-hash and async pooled login paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=50, help="Logins per path.")
+
+    def handle(self, *args, **options):
+        total = options['logins']
+        cores = os.cpu_count() or 1
+        run_id = uuid.uuid4().hex[:8]
+        email, password = f"bench-{run_id}@example.com", "bench-password"
+        user = User.objects.create(
+            username=f"bench-{run_id}", email=email, password=make_password(password),
+            first_name="Bench", last_name="User", date_of_birth=date(1990, 1, 1),
+        )
+
+        def double_hash():
+            # Previous serializer: explicit check_password, then authenticate() again
+            check_password(password, User.objects.get(email=email).password)
+            authenticate(email=email, password=password)
+
+        def single_hash():
+            LoginService.login(email, password)
+
+        async def async_pooled():
+            client = AsyncClient()
+            body = json.dumps({"email": email, "password": password})
+            responses = await asyncio.gather(*[
+                client.post("/api/login/async/", body, content_type="application/json") for _ in range(total)
+            ])
+            assert all(response.status_code == 200 for response in responses)
+
+        try:
+            for name, run, used_cores in (
+                ("double-hash", lambda: [double_hash() for _ in range(total)], 1),
+                ("single-hash", lambda: [single_hash() for _ in range(total)], 1),
+                (f"async x{password_pool.workers}", lambda: asyncio.run(async_pooled()),
+                 min(password_pool.workers, cores)),
+            ):
+                started = time.perf_counter()
+                with override_settings(ALLOWED_HOSTS=["testserver"]):
+                    run()
+                rate = total / (time.perf_counter() - started)
+                self.stdout.write(f"{name:<12} {rate:8.1f} logins/s  {rate / used_cores:8.1f} logins/s/core")
+        finally:
+            user.delete()
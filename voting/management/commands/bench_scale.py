@@ -0,0 +1,130 @@
+import json
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.utils.timezone import now
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from voting.management.commands.seed_scale import seeded_elections, seeded_voters
+from voting.models import Election, User
+
+
+class Command(BaseCommand):
+    help = ("Drive the API routes through the test client under concurrent load (login storm, dashboard polling, "
+            "vote surge, results refresh) and report throughput and latency percentiles as JSON. "
+            "Seed data first with `manage.py seed_scale`.")
+
+    SCENARIOS = ('login_storm', 'dashboard_polling', 'vote_surge', 'results_refresh')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=16, help="Concurrent clients.")
+        parser.add_argument('--prefix', default='seed', help="Username prefix used by seed_scale.")
+        parser.add_argument('--password', default='seed-password')
+        parser.add_argument('--scenario', action='append', choices=self.SCENARIOS, dest='scenarios',
+                            help="Scenario to run (repeatable; default: all).")
+        parser.add_argument('--output', help="Also write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        total, concurrency = options['requests'], options['concurrency']
+        voters = list(seeded_voters(options['prefix']).order_by('id')[:total])
+        election = seeded_elections(options['prefix']).filter(
+            status=Election.ONGOING, is_active=True
+        ).order_by('id').first()
+        if not voters or election is None:
+            raise CommandError("No seeded data; run `manage.py seed_scale` first.")
+
+        # Tokens are issued up front so only login_storm pays for hashing
+        tokens = [str(AccessToken.for_user(voter)) for voter in voters]
+        ballots = list(
+            seeded_voters(options['prefix'])
+            .exclude(vote__election=election).order_by('id').values_list('id', flat=True)[:total]
+        )
+        ballot_tokens = [str(AccessToken.for_user(User(id=voter_id))) for voter_id in ballots]
+        candidate_ids = list(election.candidate_set.values_list('id', flat=True))
+
+        def auth(index, pool=tokens):
+            return {'HTTP_AUTHORIZATION': f"Bearer {pool[index % len(pool)]}"}
+
+        scenarios = {
+            'login_storm': lambda client, i: client.post(
+                '/api/login/', {'email': voters[i % len(voters)].email, 'password': options['password']},
+                content_type='application/json',
+            ),
+            'dashboard_polling': lambda client, i: client.get('/api/elections/', **auth(i)),
+            'vote_surge': lambda client, i: client.post(
+                f'/api/elections/{election.id}/vote/', {'candidate_id': candidate_ids[i % len(candidate_ids)]},
+                content_type='application/json', **auth(i, ballot_tokens),
+            ),
+            'results_refresh': lambda client, i: client.get(f'/api/elections/{election.id}/results/', **auth(i)),
+        }
+        expected = {'login_storm': 200, 'dashboard_polling': 200, 'vote_surge': 201, 'results_refresh': 200}
+
+        report = {
+            'started_at': now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'requests': total,
+            'concurrency': concurrency,
+            'scenarios': {},
+        }
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for name in options['scenarios'] or self.SCENARIOS:
+                count = min(total, len(ballots)) if name == 'vote_surge' else total
+                report['scenarios'][name] = self.run_scenario(scenarios[name], expected[name], count, concurrency)
+                self.stderr.write(f"{name}: {report['scenarios'][name]['throughput_rps']} req/s")
+
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output + '\n')
+
+    def run_scenario(self, request, expected_status, total, concurrency):
+        """Run `total` requests over `concurrency` clients and summarise their latencies."""
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def worker(offset):
+            client = Client()
+            try:
+                for index in range(offset, total, concurrency):
+                    started = time.perf_counter()
+                    response = request(client, index)
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed)
+                        if response.status_code != expected_status:
+                            errors.append(response.status_code)
+            finally:
+                if concurrency > 1:
+                    connections.close_all()
+
+        started = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(worker, range(concurrency)))
+        else:
+            worker(0)  # Inline, on this thread's connection
+        duration = time.perf_counter() - started
+
+        milliseconds = np.array(latencies) * 1000 if latencies else np.zeros(1)
+        p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+        return {
+            'requests': len(latencies),
+            'errors': len(errors),
+            'error_statuses': sorted(set(errors)),
+            'duration_s': round(duration, 3),
+            'throughput_rps': round(len(latencies) / duration, 1) if duration else 0,
+            'latency_ms': {
+                'p50': round(float(p50), 2), 'p95': round(float(p95), 2), 'p99': round(float(p99), 2),
+                'max': round(float(milliseconds.max()), 2),
+            },
+        }
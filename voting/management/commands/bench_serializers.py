@@ -0,0 +1,58 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import now
+from rest_framework.renderers import JSONRenderer
+
+from voting.models import Candidate, Election
+from voting.renderers import FastJSONRenderer
+from voting.serializers import CandidateSerializer, serialize_candidates
+
+
+class Command(BaseCommand):
+    help = ("Serialize and render a large candidate list with CandidateSerializer + JSONRenderer and with "
+            "the values()-based path + FastJSONRenderer, check the bytes match, and report the timings. "
+            "Candidates are created in a transaction that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per path; the best one is reported.")
+
+    def best_of(self, repeat, function):
+        timings, output = [], None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = function()
+            timings.append(time.perf_counter() - started)
+        return min(timings), output
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            election = Election.objects.create(
+                name="Serializer benchmark", start_date=now() - timedelta(hours=1), end_date=now() + timedelta(hours=1)
+            )
+            Candidate.objects.bulk_create([
+                Candidate(election=election, name=f"Candidate {number}", party=f"Party {number % 12}",
+                          description="", votes=number * 7 % 1000,
+                          profile_picture=f"uploads/profile_pics/{number}.jpg" if number % 3 else "")
+                for number in range(options['candidates'])
+            ])
+            candidates = Candidate.objects.filter(election=election).with_vote_totals()
+
+            old_time, old_bytes = self.best_of(options['repeat'], lambda: JSONRenderer().render(
+                {"election_name": election.name, "candidates": CandidateSerializer(candidates, many=True).data}
+            ))
+            new_time, new_bytes = self.best_of(options['repeat'], lambda: FastJSONRenderer().render(
+                {"election_name": election.name, "candidates": serialize_candidates(candidates)}
+            ))
+            transaction.set_rollback(True)
+
+        if old_bytes != new_bytes:
+            raise CommandError("The two paths rendered different bytes.")
+        count = options['candidates']
+        self.stdout.write(f"candidates:  {count} ({len(new_bytes) / 2 ** 20:.1f} MB of JSON, identical)")
+        self.stdout.write(f"ModelSerializer + JSONRenderer:    {old_time * 1000:8.1f} ms ({count / old_time:,.0f}/s)")
+        self.stdout.write(f"values() + FastJSONRenderer:       {new_time * 1000:8.1f} ms ({count / new_time:,.0f}/s)")
+        self.stdout.write(self.style.SUCCESS(f"{old_time / new_time:.1f}x faster"))
@@ -0,0 +1,65 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.timezone import now
+
+from voting.counters import site_statistics, vote_counter
+from voting.models import Candidate, Election, User, Vote
+from voting.services import VotingService
+
+
+class Command(BaseCommand):
+    help = "Hammer a single candidate with concurrent votes and report throughput and final counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--votes', type=int, default=2000, help="Number of votes to cast.")
+        parser.add_argument('--threads', type=int, default=16, help="Number of concurrent voting threads.")
+        parser.add_argument('--keep', action='store_true', help="Keep the benchmark election and voters.")
+
+    def handle(self, *args, **options):
+        total, threads = options['votes'], options['threads']
+        run_id = uuid.uuid4().hex[:8]
+
+        election = Election.objects.create(
+            name=f"bench-{run_id}", start_date=now() - timedelta(hours=1), end_date=now() + timedelta(hours=1)
+        )
+        candidate = Candidate.objects.create(election=election, name="Hot candidate", party="Bench", description="")
+        User.objects.bulk_create([
+            User(
+                username=f"bench-{run_id}-{i}", email=f"bench-{run_id}-{i}@example.com",
+                first_name="Bench", last_name="Voter", date_of_birth=date(1990, 1, 1),
+            )
+            for i in range(total)
+        ], batch_size=1000)
+        site_statistics.increment('users', total)  # bulk_create sends no post_save
+        voters = list(User.objects.filter(username__startswith=f"bench-{run_id}-"))
+
+        def vote(user):
+            try:
+                VotingService.cast_vote(user, election.id, candidate.id)
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(vote, voters))
+        elapsed = time.perf_counter() - started
+
+        counted = vote_counter.total(candidate.id)
+        recorded = Vote.objects.filter(election=election).count()
+        self.stdout.write(f"votes cast:     {total} from {threads} threads")
+        self.stdout.write(f"elapsed:        {elapsed:.2f}s ({total / elapsed:.0f} votes/s)")
+        self.stdout.write(f"counter total:  {counted}")
+        self.stdout.write(f"vote rows:      {recorded}")
+        if counted == recorded == total:
+            self.stdout.write(self.style.SUCCESS("Counts are exact."))
+        else:
+            self.stdout.write(self.style.ERROR("Lost or duplicated increments detected."))
+
+        if not options['keep']:
+            election.delete()
+            User.objects.filter(username__startswith=f"bench-{run_id}-").delete()
@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from voting.exports import FORMATS, export_ledger, parse_ledger_filters
+from voting.models import Election
+
+
+class Command(BaseCommand):
+    help = "Stream an election's vote ledger as CSV or NDJSON, optionally gzipped, in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('election_id', type=int)
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true', help="Gzip the output.")
+        parser.add_argument('--output', help="File to write (default: stdout).")
+        parser.add_argument('--since', help="Only votes cast at or after this ISO 8601 datetime.")
+        parser.add_argument('--until', help="Only votes cast before this ISO 8601 datetime.")
+        parser.add_argument('--after-id', help="Only votes with a larger id.")
+        parser.add_argument('--before-id', help="Only votes with a smaller id.")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Votes fetched per query.")
+
+    def handle(self, *args, **options):
+        if not Election.objects.filter(id=options['election_id']).exists():
+            raise CommandError(f"Election {options['election_id']} does not exist.")
+        try:
+            filters = parse_ledger_filters(options)
+        except ValidationError as e:
+            raise CommandError(e.detail[0])
+
+        chunks = export_ledger(
+            options['election_id'], options['format'], compress=options['gzip'],
+            chunk_size=options['chunk_size'], **filters,
+        )
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
+            else:
+                output.flush()
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+from rest_framework.exceptions import ValidationError
+
+from voting.charts import prerender_results_chart
+from voting.models import Election
+from voting.services import ElectionResultService
+
+
+class Command(BaseCommand):
+    help = "Write final result snapshots for completed elections that do not have one yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--election', type=int, help="Only finalize this election id.")
+
+    def handle(self, *args, **options):
+        elections = Election.objects.filter(end_date__lt=now(), result_snapshot__isnull=True).order_by('end_date')
+        if options['election']:
+            elections = elections.filter(id=options['election'])
+
+        finalized = 0
+        for election in elections.iterator():
+            try:
+                snapshot = ElectionResultService.finalize_election(election)
+            except ValidationError as error:
+                # e.g. queued votes still pending; a later run picks it up
+                self.stdout.write(self.style.WARNING(f"{election.name}: skipped, {error.detail[0]}"))
+                continue
+            prerender_results_chart(snapshot.results)
+            finalized += 1
+            self.stdout.write(f"{election.name}: {snapshot.total_votes} votes")
+
+        self.stdout.write(self.style.SUCCESS(f"Finalized {finalized} elections."))
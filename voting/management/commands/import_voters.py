@@ -0,0 +1,232 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import DataError, IntegrityError, transaction
+
+from voting.counters import site_statistics
+from voting.models import User
+
+UNIQUE_FIELDS = ('username', 'email', 'phone_number', 'aadhar_number')
+# Compared case-insensitively, like a case-insensitive database collation would
+CASELESS_FIELDS = ('username', 'email')
+
+
+def _init_worker():
+    # Spawned workers need Django configured before hashing
+    django.setup()
+
+
+def _hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def _unique_key(field, value):
+    return value.lower() if value and field in CASELESS_FIELDS else value
+
+
+def _age(birth_date, today):
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+
+class Command(BaseCommand):
+    help = "Bulk-import a voter roll from CSV, hashing passwords in a process pool and resuming from a checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help="CSV with username, first_name, last_name, email, date_of_birth "
+                                             "(YYYY-MM-DD), phone_number, aadhar_number and optional password.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows validated and inserted per batch.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Hashing processes (1 = inline).")
+        parser.add_argument('--unusable-passwords', action='store_true',
+                            help="Ignore the password column; voters set one via password reset.")
+        parser.add_argument('--verified', action='store_true', help="Mark imported voters as email-verified.")
+        parser.add_argument('--checkpoint', help="Checkpoint file (default: <csv_path>.checkpoint).")
+        parser.add_argument('--errors', help="Write rejected rows with the reason to this CSV.")
+
+    def handle(self, *args, **options):
+        self.options = options
+        checkpoint_path = options['checkpoint'] or f"{options['csv_path']}.checkpoint"
+        done = self.read_checkpoint(checkpoint_path)
+        if done:
+            self.stdout.write(f"Resuming after row {done}.")
+
+        self.seen = {field: set() for field in UNIQUE_FIELDS}
+        self.today = date.today()
+        self.imported = self.rejected = 0
+        pool = None
+        if options['workers'] > 1 and not options['unusable_passwords']:
+            pool = ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker)
+
+        error_file = open(options['errors'], 'a', newline='') if options['errors'] else None
+        self.error_writer = csv.writer(error_file) if error_file else None
+        started = time.perf_counter()
+        try:
+            with open(options['csv_path'], newline='') as source:
+                reader = csv.DictReader(source)
+                missing = {'username', 'first_name', 'last_name', 'email', 'date_of_birth'} - set(reader.fieldnames or [])
+                if missing:
+                    raise CommandError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+
+                batch, row_number = [], 0
+                for row in reader:
+                    row_number += 1
+                    if row_number <= done:
+                        continue
+                    batch.append((row_number, row))
+                    if len(batch) >= options['batch_size']:
+                        self.import_batch(batch, pool)
+                        self.write_checkpoint(checkpoint_path, row_number)
+                        batch = []
+                        self.report(row_number - done, started)
+                if batch:
+                    self.import_batch(batch, pool)
+                    self.write_checkpoint(checkpoint_path, row_number)
+        finally:
+            if pool:
+                pool.shutdown()
+            if error_file:
+                error_file.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.imported} voters, rejected {self.rejected} rows in {elapsed:.1f}s "
+            f"({(self.imported + self.rejected) / elapsed if elapsed else 0:.0f} rows/s)."
+        ))
+
+    def read_checkpoint(self, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path) as checkpoint:
+            return json.load(checkpoint)['rows']
+
+    def write_checkpoint(self, path, rows):
+        # Atomic replace so a crash never leaves a half-written checkpoint
+        with open(f"{path}.tmp", 'w') as checkpoint:
+            json.dump({'rows': rows}, checkpoint)
+        os.replace(f"{path}.tmp", path)
+
+    def report(self, rows, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{rows} rows processed ({rows / elapsed:.0f} rows/s)")
+
+    def reject(self, row_number, row, reason):
+        self.rejected += 1
+        if self.error_writer:
+            self.error_writer.writerow([row_number, row.get('email', ''), reason])
+
+    def import_batch(self, batch, pool):
+        rows = self.validate_batch(batch)
+        if not rows:
+            return
+
+        if self.options['unusable_passwords']:
+            hashes = [make_password(None) for _ in rows]
+        else:
+            passwords = [row.get('password') or None for _, row in rows]
+            if pool:
+                chunk = max(1, len(passwords) // (self.options['workers'] * 4))
+                chunks = [passwords[i:i + chunk] for i in range(0, len(passwords), chunk)]
+                hashes = [hashed for hashed_chunk in pool.map(_hash_passwords, chunks) for hashed in hashed_chunk]
+            else:
+                hashes = _hash_passwords(passwords)
+
+        users = [self.build_user(row, password_hash) for (_, row), password_hash in zip(rows, hashes)]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=1000)
+        except (DataError, IntegrityError):
+            # Something validation could not see (a concurrent signup, a database
+            # rule): insert row by row so only the offending rows are rejected
+            users = self.insert_one_by_one(rows, users)
+        site_statistics.increment('users', len(users))
+        self.imported += len(users)
+
+    def insert_one_by_one(self, rows, users):
+        inserted = []
+        for (row_number, row), user in zip(rows, users):
+            user.pk = None  # May have been set by the rolled-back bulk insert
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user])
+            except (DataError, IntegrityError) as error:
+                self.reject(row_number, row, f"Rejected by the database: {error}")
+            else:
+                inserted.append(user)
+        return inserted
+
+    def build_user(self, row, password_hash):
+        return User(
+            username=row['username'], first_name=row['first_name'], last_name=row['last_name'],
+            email=row['email'], date_of_birth=row['date_of_birth'],
+            phone_number=row.get('phone_number') or None, aadhar_number=row.get('aadhar_number') or None,
+            password=password_hash, is_verified=self.options['verified'],
+        )
+
+    def validate_batch(self, batch):
+        """Check required fields, field lengths, age and uniqueness of a batch against this run's index and one query per field."""
+        candidates = []
+        for row_number, row in batch:
+            row = {key: (value or '').strip() for key, value in row.items() if key}
+            if not row['username'] or not row['email']:
+                self.reject(row_number, row, "Username and email are required.")
+                continue
+            try:
+                validate_email(row['email'])
+            except ValidationError:
+                self.reject(row_number, row, "Invalid email.")
+                continue
+            if not row['first_name'] or not row['last_name']:
+                self.reject(row_number, row, "First and last name are required.")
+                continue
+            try:
+                row['date_of_birth'] = datetime.strptime(row['date_of_birth'], "%Y-%m-%d").date()
+            except ValueError:
+                self.reject(row_number, row, "Invalid date_of_birth.")
+                continue
+            if _age(row['date_of_birth'], self.today) < 18:
+                self.reject(row_number, row, "Voter must be 18+.")
+                continue
+            try:
+                # Lengths and username characters, before the database rejects the whole batch
+                self.build_user(row, '').clean_fields(exclude=['password'])
+            except ValidationError as error:
+                self.reject(row_number, row, " ".join(
+                    f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items()
+                ))
+                continue
+            duplicate = next(
+                (field for field in UNIQUE_FIELDS
+                 if row.get(field) and _unique_key(field, row[field]) in self.seen[field]), None
+            )
+            if duplicate:
+                self.reject(row_number, row, f"Duplicate {duplicate} in file.")
+                continue
+            for field in UNIQUE_FIELDS:
+                if row.get(field):
+                    self.seen[field].add(_unique_key(field, row[field]))
+            candidates.append((row_number, row))
+
+        existing = {}
+        for field in UNIQUE_FIELDS:
+            values = [row[field] for _, row in candidates if row.get(field)]
+            existing[field] = {
+                _unique_key(field, value)
+                for value in User.objects.filter(**{f"{field}__in": values}).values_list(field, flat=True)
+            }
+        valid = []
+        for row_number, row in candidates:
+            duplicate = next((field for field in UNIQUE_FIELDS
+                              if row.get(field) and _unique_key(field, row[field]) in existing[field]), None)
+            if duplicate:
+                self.reject(row_number, row, f"{duplicate} already registered.")
+            else:
+                valid.append((row_number, row))
+        return valid
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from voting.ingestion import get_vote_queue
+
+
+class Command(BaseCommand):
+    help = "Drain the write-behind vote queue into the database in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Votes committed per transaction.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling the queue instead of exiting when empty.")
+        parser.add_argument('--interval', type=float, default=0.5, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        queue = get_vote_queue()
+        released = queue.release_claimed()
+        if released:
+            self.stdout.write(f"Re-queued {released} votes left over by a previous worker.")
+
+        processed = 0
+        while True:
+            drained = queue.drain(options['batch_size'])
+            processed += drained
+            if drained:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} queued votes."))
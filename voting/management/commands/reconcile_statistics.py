@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from voting.counters import site_statistics
+
+
+class Command(BaseCommand):
+    help = "Reset the maintained site statistics to true row counts and report any drift."
+
+    def handle(self, *args, **options):
+        for name, drift in site_statistics.reconcile().items():
+            self.stdout.write(f"{name}: drift {drift:+d}")
+        self.stdout.write(self.style.SUCCESS("Statistics reconciled."))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from voting.turnout import TurnoutRollup
+
+
+class Command(BaseCommand):
+    help = "Fold newly committed votes into the per-minute turnout rollup."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=50000, help="Votes read per transaction.")
+        parser.add_argument('--loop', action='store_true', help="Keep tailing the vote ledger instead of exiting.")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds to sleep when no new votes settled.")
+
+    def handle(self, *args, **options):
+        rollup = TurnoutRollup(chunk_size=options['chunk_size'])
+        total = 0
+        while True:
+            rolled = rollup.tail()
+            total += rolled
+            if rolled:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {total} votes."))
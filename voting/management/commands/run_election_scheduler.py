@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from voting.scheduler import ElectionLifecycleScheduler
+
+
+class Command(BaseCommand):
+    help = "Keep Election.status current, finalizing results and warming caches at each boundary."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Apply due transitions and exit (for cron).")
+        parser.add_argument('--max-sleep', type=float, default=60, help="Longest wait between checks, in seconds.")
+
+    def handle(self, *args, **options):
+        scheduler = ElectionLifecycleScheduler(max_sleep=options['max_sleep'])
+        if options['once']:
+            for election, status in scheduler.run_due_transitions():
+                self.stdout.write(f"{election.name}: {status}")
+            return
+        scheduler.run()
@@ -0,0 +1,112 @@
+import re
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from voting.cache import results_cache
+from voting.counters import site_statistics
+from voting.models import Candidate, Election, User, Vote
+
+# Cycle of election states, so any M covers every dashboard section
+STATES = (Election.ONGOING, Election.CLOSED, Election.ONGOING, Election.UPCOMING)
+
+
+def seeded_voters(prefix):
+    """Voters seeded with exactly this prefix: `seed` must not pick up `seed-2-…` or `seed2-…`."""
+    return User.objects.filter(username__regex=rf"^{re.escape(prefix)}-[0-9]+$")
+
+
+def seeded_elections(prefix):
+    return Election.objects.filter(name__regex=rf"^{re.escape(prefix)} election [0-9]+$")
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate voters, elections, candidates and votes for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voters', type=int, default=10000)
+        parser.add_argument('--elections', type=int, default=4)
+        parser.add_argument('--candidates', type=int, default=6, help="Candidates per election.")
+        parser.add_argument('--turnout', type=float, default=0.6, help="Share of voters voting in each open election.")
+        parser.add_argument('--password', default='seed-password', help="Password shared by every seeded voter.")
+        parser.add_argument('--prefix', default='seed', help="Username prefix; use a new one to seed again.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        prefix, batch_size = options['prefix'], options['batch_size']
+        started = time.perf_counter()
+
+        # One hash for everyone: seeding stays fast and the login storm still hashes for real
+        password = make_password(options['password'])
+        for start in range(0, options['voters'], batch_size):
+            User.objects.bulk_create([
+                User(
+                    username=f"{prefix}-{i}", email=f"{prefix}-{i}@example.com", password=password,
+                    first_name="Seed", last_name=f"Voter {i}", date_of_birth=date(1970, 1, 1) + timedelta(days=i % 12000),
+                    is_verified=True,
+                )
+                for i in range(start, min(start + batch_size, options['voters']))
+            ], batch_size=batch_size)
+        voter_ids = np.array(
+            seeded_voters(prefix).order_by('id').values_list('id', flat=True)
+        )
+        site_statistics.increment('users', options['voters'])
+        self.stdout.write(f"{len(voter_ids)} voters")
+
+        current = now()
+        windows = {
+            Election.ONGOING: (current - timedelta(hours=2), current + timedelta(hours=6)),
+            Election.CLOSED: (current - timedelta(days=2), current - timedelta(days=1)),
+            Election.UPCOMING: (current + timedelta(days=1), current + timedelta(days=2)),
+        }
+        total_votes = 0
+        for number in range(options['elections']):
+            state = STATES[number % len(STATES)]
+            start_date, end_date = windows[state]
+            with transaction.atomic():
+                election = Election.objects.create(
+                    name=f"{prefix} election {number + 1}", start_date=start_date, end_date=end_date
+                )
+                # Skewed support, as in a real race: a few front-runners and a long tail
+                share = rng.dirichlet(np.full(options['candidates'], 0.8))
+                voters = np.array([], dtype=voter_ids.dtype)
+                choices = np.array([], dtype=np.int64)
+                if state != Election.UPCOMING:
+                    voters = rng.choice(voter_ids, size=int(len(voter_ids) * options['turnout']), replace=False)
+                    choices = rng.choice(options['candidates'], size=len(voters), p=share)
+                counts = np.bincount(choices, minlength=options['candidates'])
+
+                # Tallies go straight into the folded counter column
+                Candidate.objects.bulk_create([
+                    Candidate(election=election, name=f"Candidate {index + 1}", party=f"Party {index % 5 + 1}",
+                              description="Seeded candidate.", votes=int(counts[index]))
+                    for index in range(options['candidates'])
+                ])
+                # Re-read the ids: MySQL's bulk_create does not return them
+                candidate_ids = np.array(
+                    Candidate.objects.filter(election=election).order_by('id').values_list('id', flat=True)
+                )
+                for start in range(0, len(voters), batch_size):
+                    Vote.objects.bulk_create([
+                        Vote(voter_id=int(voter_id), election=election, candidate_id=int(candidate_id))
+                        for voter_id, candidate_id in zip(
+                            voters[start:start + batch_size], candidate_ids[choices[start:start + batch_size]]
+                        )
+                    ], batch_size=batch_size)
+                site_statistics.increment('candidates', len(candidate_ids))
+                site_statistics.increment('votes', len(voters))
+                transaction.on_commit(lambda election_id=election.id: results_cache.bump(election_id))
+            total_votes += len(voters)
+            self.stdout.write(f"{election.name} ({state}): {len(candidate_ids)} candidates, {len(voters)} votes")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(voter_ids)} voters, {options['elections']} elections and {total_votes} votes "
+            f"in {time.perf_counter() - started:.1f}s."
+        ))
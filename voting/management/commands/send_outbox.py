@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from voting.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound emails in batches over one reused connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Emails sent per connection.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling the outbox instead of exiting when empty.")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds to sleep when nothing is due.")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_pending(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {total_sent} emails, {total_failed} failed attempts."))
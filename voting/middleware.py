@@ -1,25 +1,50 @@
-from django.utils.deprecation import MiddlewareMixin
-from django.urls import reverse, resolve
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from rest_framework.exceptions import AuthenticationFailed
 
+from .authentication import CachedJWTAuthentication
+from .instrumentation import InstrumentationMiddleware
+from .routing import ReadConsistencyMiddleware
+
+
 class JWTAuthenticationMiddleware:
-    EXCLUDED_ENDPOINTS = ["home", "login", "register", "api-login", "api-register"]
+    """Authenticate API requests from their JWT once, before the view runs.
+
+    Pages, static files and the public auth endpoints are skipped without
+    touching the token; DRF reuses the result stored on the request.
+    """
+    API_PREFIX = "/api/"
+    EXCLUDED_PATHS = ("/api/register/", "/api/login/", "/api/refresh/", "/api/verify-email/", "/api/password-reset")
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.auth = CachedJWTAuthentication()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.needs_authentication(request):
+            self.authenticate(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Under ASGI only API requests pay for a thread hop (token cache, user lookup)
+        if self.needs_authentication(request):
+            await sync_to_async(self.authenticate)(request)
+        return await self.get_response(request)
+
+    def needs_authentication(self, request):
+        path = request.path_info
+        return path.startswith(self.API_PREFIX) and not path.startswith(self.EXCLUDED_PATHS)
+
+    def authenticate(self, request):
         try:
-            resolved = resolve(request.path_info)
-            if resolved.url_name in self.EXCLUDED_ENDPOINTS:
-                response = self.get_response(request)
-            else:
-                auth = JWTAuthentication()
-                auth_result = auth.authenticate(request)
-                if auth_result is not None:
-                    user, _ = auth_result  # Extract user from JWT
-                    request.user = user  # Set request.user
+            auth_result = self.auth.authenticate(request)
+            if auth_result is not None:
+                request.user = auth_result[0]  # Set request.user
         except AuthenticationFailed:
-            pass
-        response = self.get_response(request)
-        return response
+            pass  # DRF raises the stored error for protected views
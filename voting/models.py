@@ -3,6 +3,7 @@ import uuid
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils.timezone import now
@@ -83,16 +84,47 @@ class EmailVerificationToken(models.Model):
 
 # Election model to store election details
 class Election(models.Model):
+    UPCOMING = 'upcoming'
+    ONGOING = 'ongoing'
+    CLOSED = 'closed'
+    STATUS_CHOICES = (
+        (UPCOMING, 'Upcoming'),
+        (ONGOING, 'Ongoing'),
+        (CLOSED, 'Closed'),
+    )
+
+    PLURALITY = 'plurality'
+    RANKED = 'ranked'
+    VOTING_METHOD_CHOICES = (
+        (PLURALITY, 'First past the post'),
+        (RANKED, 'Ranked choice (instant runoff)'),
+    )
+
     name = models.CharField(max_length=255)
-    start_date = models.DateTimeField()
-    end_date = models.DateTimeField()
+    voting_method = models.CharField(max_length=10, choices=VOTING_METHOD_CHOICES, default=PLURALITY)
+    start_date = models.DateTimeField(db_index=True)
+    end_date = models.DateTimeField(db_index=True)
     is_active = models.BooleanField(default=True)  # Controls if voting is open
+    # Materialized from the dates; kept current by the lifecycle scheduler
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=UPCOMING, editable=False)
 
     class Meta:
         db_table = 'election'
+        indexes = [models.Index(fields=['status', 'is_active', 'end_date'])]
 
     def __str__(self):
         return self.name
+
+    def status_at(self, moment):
+        if moment < self.start_date:
+            return self.UPCOMING
+        if moment > self.end_date:
+            return self.CLOSED
+        return self.ONGOING
+
+    def save(self, *args, **kwargs):
+        self.status = self.status_at(now())
+        super().save(*args, **kwargs)
     
     def is_ongoing(self):
         return self.start_date <= now() <= self.end_date
@@ -104,7 +136,27 @@ class Election(models.Model):
         """Returns the candidate with the highest votes"""
         if not self.is_completed():
             return None
-        return self.candidate_set.order_by('-votes').first()
+        snapshot = ElectionResultSnapshot.objects.select_related('winner').filter(election=self).first()
+        if snapshot is not None:
+            return snapshot.winner
+        if self.voting_method == self.RANKED:
+            from .ranked import tabulate_election
+            return tabulate_election(self).winner
+        return self.candidate_set.with_vote_totals().order_by('-vote_total').first()
+
+
+class CandidateQuerySet(models.QuerySet):
+    def with_vote_totals(self):
+        """Annotate `vote_total`: the folded `votes` column plus every counter shard."""
+        shard_sum = (
+            VoteCounterShard.objects.filter(candidate=models.OuterRef('pk'))
+            .values('candidate')
+            .annotate(total=models.Sum('count'))
+            .values('total')
+        )
+        return self.annotate(
+            vote_total=models.F('votes') + Coalesce(models.Subquery(shard_sum), 0)
+        )
 
 
 # Candidate model to store candidates running in elections
@@ -116,6 +168,7 @@ class Candidate(models.Model):
     votes = models.IntegerField(default=0)  # To store vote count
     profile_picture = models.ImageField(upload_to=upload_profile_pic, null=True, blank=True)  # Candidate picture
 
+    objects = CandidateQuerySet.as_manager()
 
     class Meta:
         db_table = 'candidate'
@@ -124,6 +177,21 @@ class Candidate(models.Model):
         return f"{self.name} ({self.party})"
 
 
+# Sharded vote counter: live votes are spread over N rows per candidate so
+# concurrent voters do not queue up on a single hot candidate row.
+class VoteCounterShard(models.Model):
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='vote_shards')
+    shard = models.PositiveSmallIntegerField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'vote_counter_shard'
+        unique_together = ('candidate', 'shard')
+
+    def __str__(self):
+        return f"{self.candidate_id}#{self.shard}: {self.count}"
+
+
 # Vote model to store each user's vote
 class Vote(models.Model):
     voter = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -137,3 +205,124 @@ class Vote(models.Model):
 
     def __str__(self):
         return f"{self.voter.username} voted for {self.candidate.name}"
+
+
+# A ranked-choice ballot: candidate ids in order of preference
+class RankedBallot(models.Model):
+    voter = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    election = models.ForeignKey(Election, on_delete=models.CASCADE, related_name='ranked_ballots')
+    ranking = models.JSONField()
+    timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'ranked_ballot'
+        unique_together = ('voter', 'election')
+
+    def __str__(self):
+        return f"Ballot {self.id} in {self.election_id}"
+
+
+# Final results of a completed election, written once when it is finalized
+class ElectionResultSnapshot(models.Model):
+    election = models.OneToOneField(Election, on_delete=models.CASCADE, related_name='result_snapshot')
+    total_votes = models.PositiveIntegerField()
+    winner = models.ForeignKey(Candidate, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    results = models.JSONField()  # Same payload as the results API
+    finalized_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'election_result_snapshot'
+
+    def __str__(self):
+        return f"Final results of {self.election_id}"
+
+    def save(self, *args, **kwargs):
+        """Snapshots are immutable once written."""
+        if self.pk is not None:
+            raise ValidationError(_("Result snapshots cannot be modified."))
+        super().save(*args, **kwargs)
+
+
+# Progress of a job tailing the Vote ledger by id: votes up to `last_vote_id`
+# have been processed ('votes': tally reconciliation, 'turnout': rollup)
+class TallyCheckpoint(models.Model):
+    name = models.CharField(max_length=32, unique=True)
+    last_vote_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'tally_checkpoint'
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_vote_id}"
+
+
+class CandidateTally(models.Model):
+    candidate = models.OneToOneField(Candidate, on_delete=models.CASCADE, related_name='reconciled_tally')
+    counted_votes = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'candidate_tally'
+
+    def __str__(self):
+        return f"{self.candidate_id}: {self.counted_votes}"
+
+
+# Votes per candidate per minute, rolled up from the Vote ledger for turnout curves
+class TurnoutBucket(models.Model):
+    election = models.ForeignKey(Election, on_delete=models.CASCADE, related_name='turnout_buckets')
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name='+')
+    minute = models.DateTimeField()
+    votes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'turnout_bucket'
+        unique_together = ('election', 'candidate', 'minute')
+
+    def __str__(self):
+        return f"{self.candidate_id} @ {self.minute:%Y-%m-%d %H:%M}: {self.votes}"
+
+
+# Site-wide row counters (users, elections, candidates, votes), sharded like
+# the vote counters so every vote insert does not hit one statistics row
+class StatisticShard(models.Model):
+    name = models.CharField(max_length=32)
+    shard = models.PositiveSmallIntegerField()
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'statistic_shard'
+        unique_together = ('name', 'shard')
+
+    def __str__(self):
+        return f"{self.name}#{self.shard}: {self.value}"
+
+
+# Transactional outbox for outbound email, delivered by `manage.py send_outbox`
+class OutboxEmail(models.Model):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, null=True, blank=True)
+    recipients = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'outbox_email'
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils.timezone import now
+
+from .models import OutboxEmail
+
+
+def queue_email(subject, body, from_email, recipients):
+    """Record an email for delivery; call inside the transaction that makes it necessary."""
+    return OutboxEmail.objects.create(
+        subject=subject, body=body, from_email=from_email, recipients=list(recipients)
+    )
+
+
+def deliver_pending(batch_size=None, connection=None):
+    """Send one batch of due emails over a single connection. Returns (sent, failed) counts."""
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 100)
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    retry_base = getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE', 30)
+    lease = timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_LEASE', 300))
+
+    # Lease the batch so concurrent workers skip it while SMTP runs outside any transaction
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update()
+            .filter(status=OutboxEmail.PENDING, next_attempt_at__lte=now())
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(next_attempt_at=now() + lease)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = connection or get_connection()
+    try:
+        connection.open()
+        open_error = None
+    except Exception as e:
+        open_error = e  # Count the attempt against every leased email
+
+    try:
+        for email in emails:
+            email.attempts += 1
+            try:
+                if open_error is not None:
+                    raise open_error
+                EmailMessage(
+                    email.subject, email.body, email.from_email, email.recipients, connection=connection
+                ).send()
+            except Exception as e:
+                failed += 1
+                email.last_error = str(e)
+                if email.attempts >= max_attempts:
+                    email.status = OutboxEmail.FAILED
+                else:
+                    # Exponential backoff: base, 2x base, 4x base, ...
+                    email.next_attempt_at = now() + timedelta(seconds=retry_base * 2 ** (email.attempts - 1))
+            else:
+                sent += 1
+                email.status = OutboxEmail.SENT
+                email.sent_at = now()
+            email.save(update_fields=['attempts', 'status', 'next_attempt_at', 'last_error', 'sent_at'])
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+
+
+class PasswordCheckPool:
+    """Bounded thread pool for password hashing off the event loop.
+
+    PBKDF2 runs inside hashlib with the GIL released, so a pool sized to the
+    core count uses every CPU without blocking the ASGI loop. Once
+    `max_pending` checks are queued, new logins are refused instead of
+    piling up behind a login storm.
+    """
+
+    class Saturated(Exception):
+        pass
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or getattr(settings, 'LOGIN_HASH_WORKERS', None) or os.cpu_count() or 1
+        self.max_pending = max_pending or getattr(settings, 'LOGIN_HASH_MAX_PENDING', self.workers * 64)
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-check')
+            return self._executor
+
+    async def check(self, password, encoded):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise self.Saturated()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, check_password, password, encoded)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+password_pool = PasswordCheckPool()
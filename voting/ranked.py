@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .models import Candidate, RankedBallot
+
+EXHAUSTED = -1
+
+
+def ballot_dtype(num_candidates):
+    """Smallest signed integer type holding every candidate index and `EXHAUSTED`."""
+    return np.int8 if num_candidates < 127 else np.int16
+
+
+def instant_runoff(ballots, num_candidates):
+    """Tabulate an instant-runoff count over a ballot matrix.
+
+    `ballots` has one row per ballot and one column per preference, holding
+    candidate indices with `EXHAUSTED` after the last ranked candidate. Each
+    round touches only the ballots of the eliminated candidate, moving them
+    to their next continuing preference with array operations, so the whole
+    count needs two bytes per ballot beyond the matrix itself.
+
+    Returns a list of rounds: `tallies` per candidate index (0 once
+    eliminated), `exhausted` ballot count, and the `eliminated` or `winner`
+    index. The candidate eliminated on a tie has the fewest first
+    preferences, then the highest index.
+    """
+    count, depth = ballots.shape
+    position = np.zeros(count, dtype=np.int8 if depth < 127 else np.int16)
+    current = ballots[:, 0].copy() if depth else np.full(count, EXHAUSTED, dtype=ballots.dtype)
+    continuing = np.ones(num_candidates, dtype=bool)
+    tallies = np.bincount(current[current != EXHAUSTED], minlength=num_candidates).astype(np.int64)
+    first_preferences = tallies.copy()
+
+    rounds = []
+    while True:
+        active = int(tallies.sum())
+        exhausted = count - active
+        leader = int(np.argmax(np.where(continuing, tallies, -1)))
+        if tallies[leader] * 2 > active or continuing.sum() == 1:
+            rounds.append({"tallies": tallies.copy(), "exhausted": exhausted, "eliminated": None, "winner": leader})
+            return rounds
+
+        # Lowest tally, then fewest first preferences, then highest index
+        order = np.lexsort((-np.arange(num_candidates), first_preferences, np.where(continuing, tallies, np.inf)))
+        loser = int(order[0])
+        rounds.append({"tallies": tallies.copy(), "exhausted": exhausted, "eliminated": loser, "winner": None})
+        continuing[loser] = False
+        tallies[loser] = 0
+
+        # Move the loser's ballots down their rankings until they reach a
+        # continuing candidate or run out of preferences
+        transferred = moving = np.flatnonzero(current == loser)
+        while moving.size:
+            position[moving] += 1
+            ended = position[moving] >= depth
+            current[moving[ended]] = EXHAUSTED
+            moving = moving[~ended]
+            choice = ballots[moving, position[moving]]
+            current[moving] = choice
+            moving = moving[(choice != EXHAUSTED) & ~continuing[choice]]
+        landed = current[transferred]
+        tallies += np.bincount(landed[landed != EXHAUSTED], minlength=num_candidates)
+
+
+@dataclass
+class RankedResult:
+    candidates: list
+    rounds: list
+    total_ballots: int
+
+    @property
+    def winner(self):
+        return self.candidates[self.rounds[-1]["winner"]] if self.rounds and self.total_ballots else None
+
+
+def load_ballots(election, chunk_size=10000):
+    """Ballot matrix of an election and its candidates in column-index order."""
+    candidates = list(Candidate.objects.filter(election=election).order_by('id'))
+    index = {candidate.id: position for position, candidate in enumerate(candidates)}
+    ballots = RankedBallot.objects.filter(election=election).order_by('id').values_list('id', 'ranking')
+    count = ballots.count()
+    matrix = np.full((count, len(candidates)), EXHAUSTED, dtype=ballot_dtype(len(candidates)))
+
+    row, last_id = 0, 0
+    while row < count:
+        chunk = list(ballots.filter(id__gt=last_id)[:min(chunk_size, count - row)])
+        if not chunk:
+            break
+        for _, ranking in chunk:
+            # Candidates removed after the ballot was cast are skipped
+            preferences = [index[candidate_id] for candidate_id in ranking if candidate_id in index]
+            matrix[row, :len(preferences)] = preferences
+            row += 1
+        last_id = chunk[-1][0]
+    return matrix[:row], candidates
+
+
+def tabulate_election(election):
+    matrix, candidates = load_ballots(election)
+    rounds = instant_runoff(matrix, len(candidates)) if candidates else []
+    return RankedResult(candidates=candidates, rounds=rounds, total_ballots=len(matrix))
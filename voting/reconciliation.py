@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.timezone import now
+
+from .counters import vote_counter
+from .models import Candidate, CandidateTally, TallyCheckpoint, Vote, VoteCounterShard
+
+
+class TallyReconciler:
+    """Recount votes from the `Vote` ledger and compare them with the live counters.
+
+    Votes are scanned in primary-key ranges with one `GROUP BY candidate`
+    per range, so memory is bounded by the number of candidates rather than
+    the number of votes. Running counts and the last scanned id are saved
+    after every range: an interrupted run resumes where it stopped and later
+    runs only scan new votes. Like `TurnoutRollup`, the scan stops at votes
+    older than `lag` seconds, so an id handed out to a transaction that has
+    not committed yet is never skipped. Use `full=True` after deleting votes.
+    """
+
+    CHECKPOINT = 'votes'
+
+    def __init__(self, chunk_size=100000, fix=False, full=False, progress=None, lag=None):
+        self.chunk_size = chunk_size
+        self.lag = lag if lag is not None else getattr(settings, 'TALLY_RECONCILE_LAG', 10)
+        self.fix = fix
+        self.full = full
+        self.progress = progress or (lambda message: None)
+
+    def run(self):
+        """Scan new votes, then return mismatches as (candidate_id, ledger, counter, fixed) tuples."""
+        high_water = self.scan()
+        return [self.check(candidate_id, counted, high_water) for candidate_id, counted in self.mismatches()]
+
+    def scan(self):
+        checkpoint, _ = TallyCheckpoint.objects.get_or_create(name=self.CHECKPOINT)
+        if self.full:
+            CandidateTally.objects.all().delete()
+            checkpoint.last_vote_id = 0
+            checkpoint.save()
+
+        tallies = dict(CandidateTally.objects.values_list('candidate_id', 'counted_votes'))
+        # Fixed upper bound: newer votes, and votes arriving during the scan, are handled by check()
+        start = checkpoint.last_vote_id
+        settled = Vote.objects.filter(timestamp__lte=now() - timedelta(seconds=self.lag))
+        high_water = max(settled.aggregate(max_id=Max('id'))['max_id'] or 0, start)
+        while start < high_water:
+            end = min(start + self.chunk_size, high_water)
+            counts = (
+                Vote.objects.filter(id__gt=start, id__lte=end)
+                .values_list('candidate_id')
+                .annotate(votes=Count('id'))
+                .order_by()
+            )
+            changed = {}
+            for candidate_id, votes in counts.iterator():
+                tallies[candidate_id] = changed[candidate_id] = tallies.get(candidate_id, 0) + votes
+            self.save_chunk(checkpoint, end, changed)
+            self.progress(f"Scanned votes {start + 1}-{end}")
+            start = end
+        return high_water
+
+    def save_chunk(self, checkpoint, end, changed):
+        with transaction.atomic():
+            CandidateTally.objects.bulk_create(
+                [CandidateTally(candidate_id=candidate_id, counted_votes=votes) for candidate_id, votes in changed.items()],
+                update_conflicts=True, unique_fields=['candidate'], update_fields=['counted_votes'],
+            )
+            checkpoint.last_vote_id = end
+            checkpoint.save(update_fields=['last_vote_id', 'updated_at'])
+
+    def mismatches(self):
+        """Candidates whose live counter differs from the reconciled ledger count."""
+        live = Candidate.objects.with_vote_totals().values_list('id', 'vote_total')
+        counted = dict(CandidateTally.objects.values_list('candidate_id', 'counted_votes'))
+        for candidate_id, total in live.iterator():
+            if total != counted.get(candidate_id, 0):
+                yield candidate_id, counted.get(candidate_id, 0)
+
+    def check(self, candidate_id, counted, high_water):
+        """Re-check one candidate under a short lock on its counter shards, fixing it if asked."""
+        with transaction.atomic():
+            list(VoteCounterShard.objects.select_for_update().filter(candidate_id=candidate_id))
+            # Votes committed after the scan started are in the counter but not the tally yet
+            ledger = counted + Vote.objects.filter(candidate_id=candidate_id, id__gt=high_water).count()
+            counter = vote_counter.total(candidate_id)
+            fixed = False
+            if self.fix and ledger != counter:
+                vote_counter.increment(candidate_id, ledger - counter)
+                fixed = True
+        return candidate_id, ledger, counter, fixed
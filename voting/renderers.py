@@ -0,0 +1,56 @@
+import math
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the stdlib encoder is used instead
+    orjson = None
+
+# Output that may hold a float orjson formats differently from `repr()`
+SUSPECT_FLOAT = re.compile(rb'null|\de-?\d')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """`JSONRenderer` backed by orjson, producing the same bytes.
+
+    orjson matches DRF's compact, non-ASCII-escaping output; values it does
+    not encode natively (dates, decimals, lazy strings, querysets) go
+    through DRF's own encoder via `default`, so their text is unchanged.
+    Floats print alike except in exponent form (`1e16` against `1e+16`)
+    and non-finite ones (orjson writes null); payloads holding those, as
+    well as indented output, integers beyond 64 bits and a missing orjson,
+    fall back to the stdlib encoder.
+    """
+
+    OPTIONS = (
+        (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (data is None or orjson is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if SUSPECT_FLOAT.search(ret) and _has_stdlib_only_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same JavaScript-subset escaping as JSONRenderer
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def _has_stdlib_only_float(data):
+    """Whether `data` holds a float that `repr()` writes in exponent form, or a non-finite one."""
+    if isinstance(data, float):
+        return not math.isfinite(data) or (data != 0 and not 1e-4 <= abs(data) < 1e16)
+    if isinstance(data, dict):
+        return any(_has_stdlib_only_float(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(_has_stdlib_only_float(value) for value in data)
+    return False
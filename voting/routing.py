@@ -0,0 +1,123 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+
+PRIMARY = 'default'
+PRIMARY_POLICY = 'primary'
+REPLICA_POLICY = 'replica'
+
+# Alias reads are routed to in the current request or block; None is the primary
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_alias():
+    """The configured replica, or the primary when there is none."""
+    alias = getattr(settings, 'REPLICA_DATABASE', 'replica')
+    return alias if alias in settings.DATABASES else PRIMARY
+
+
+class PrimaryReplicaRouter:
+    """Writes always go to the primary; reads follow the current read policy.
+
+    Reads default to the primary. Only views declaring
+    `read_consistency = 'replica'` (see `ReadConsistencyMiddleware`) read
+    from the replica, and code that must see its own writes can force the
+    primary with `primary_reads()`. Locking reads (`select_for_update`,
+    `get_or_create`) are routed as writes by Django, so they never reach
+    the replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+
+@contextmanager
+def reads_from(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def reading_from_replica():
+    """Whether reads in the current request or block go to a replica."""
+    return _read_alias.get() not in (None, PRIMARY)
+
+
+def primary_reads():
+    """Context manager and decorator: read from the primary inside it, whatever the view's policy."""
+    return reads_from(PRIMARY)
+
+
+def _pin_key(user_id):
+    return f"routing:primary-pin:{user_id}"
+
+
+def _pins():
+    # Shared: pins are set by whichever process commits the vote (a web
+    # worker or `process_vote_queue`) and read by every web worker
+    return caches[getattr(settings, 'ROUTING_CACHE_ALIAS', 'default')]
+
+
+def pin_to_primary(user_id):
+    """Send the user's reads to the primary for `PRIMARY_STICKY_SECONDS`, so they see their own vote."""
+    _pins().set(_pin_key(user_id), True, timeout=getattr(settings, 'PRIMARY_STICKY_SECONDS', 15))
+
+
+def is_pinned_to_primary(user_id):
+    return _pins().get(_pin_key(user_id), False)
+
+
+class ReadConsistencyMiddleware:
+    """Apply the resolved view's read-consistency policy for the whole request.
+
+    Views (or DRF view classes) set `read_consistency` to `'replica'` when
+    slightly stale data is acceptable; everything else reads the primary.
+    A user who voted recently is pinned to the primary whatever the policy.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_alias.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+    async def __acall__(self, request):
+        # The policy set by process_view, run in a thread under ASGI, is copied back to this context
+        token = _read_alias.set(None)
+        try:
+            return await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        policy = getattr(getattr(view_func, 'cls', view_func), 'read_consistency', PRIMARY_POLICY)
+        if policy != REPLICA_POLICY:
+            return None
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and is_pinned_to_primary(user.id):
+            return None
+        _read_alias.set(replica_alias())
+        return None
@@ -0,0 +1,106 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils.timezone import now
+from rest_framework.exceptions import ValidationError
+
+from .cache import change_counters, results_cache
+from .charts import prerender_results_chart
+from .checks import is_shared_cache
+from .models import Election
+from .services import ElectionResultService
+
+logger = logging.getLogger(__name__)
+
+
+def finalize_results(election):
+    """Write the final results snapshot as soon as polling closes, and pre-render its chart."""
+    try:
+        snapshot = ElectionResultService.finalize_election(election)
+    except ValidationError:
+        # Queued votes are still being committed: `finalize_elections` or
+        # the first results request finalizes it once they are in
+        logger.info("Deferred finalizing election %s until its queued votes are committed", election.id)
+        return
+    # Here rather than in finalize_election, which may run inside a results request
+    prerender_results_chart(snapshot.results)
+
+
+def warm_results_cache(election):
+    """Populate the shared results cache so the web workers' first dashboard poll is a hit.
+
+    Skipped when the results cache is process-local (the `voting.E002`
+    check silenced in development): only the scheduler would see the entry.
+    """
+    if is_shared_cache(results_cache.alias):
+        ElectionResultService.get_results(election.id)
+
+
+class ElectionLifecycleScheduler:
+    """Flips `Election.status` at each start/end boundary and fires hooks.
+
+    `clock` and `sleep` are injectable so the loop can be driven by a fake
+    clock in tests. Hooks receive the election after its status changed and
+    are registered per target status.
+    """
+
+    def __init__(self, clock=now, sleep=time.sleep, max_sleep=60, hooks=None):
+        self.clock = clock
+        self.sleep = sleep
+        self.max_sleep = max_sleep
+        self.hooks = hooks if hooks is not None else {
+            Election.ONGOING: [warm_results_cache],
+            Election.CLOSED: [finalize_results],
+        }
+
+    def run_due_transitions(self):
+        """Apply every transition due at the current clock time. Returns (election, status) pairs."""
+        moment = self.clock()
+        transitions = []
+        with transaction.atomic():
+            due = Election.objects.select_for_update().filter(
+                status__in=[Election.UPCOMING, Election.ONGOING], start_date__lte=moment
+            ).exclude(status=Election.ONGOING, end_date__gte=moment)
+            for election in due:
+                election.status = election.status_at(moment)
+                transitions.append((election, election.status))
+            Election.objects.bulk_update([election for election, _ in transitions], ['status'])
+            if transitions:  # bulk_update sends no post_save signals
+                transaction.on_commit(lambda: change_counters.bump('elections'))
+            for election, status in transitions:
+                if status == Election.CLOSED:
+                    # Closing declares a winner: cached tallies and live streams must refresh
+                    transaction.on_commit(lambda election_id=election.id: results_cache.bump(election_id))
+
+        for election, status in transitions:
+            for hook in self.hooks.get(status, []):
+                try:
+                    hook(election)
+                except Exception:
+                    logger.exception("Lifecycle hook %s failed for election %s", hook.__name__, election.id)
+        return transitions
+
+    def next_transition_at(self):
+        """Time of the next start or end boundary, or None if nothing is pending."""
+        upcoming = Election.objects.filter(status=Election.UPCOMING).aggregate(at=Min('start_date'))['at']
+        # An election closes strictly after its end_date
+        ongoing = Election.objects.filter(status=Election.ONGOING).aggregate(at=Min('end_date'))['at']
+        if ongoing is not None:
+            ongoing += timedelta(microseconds=1)
+        boundaries = [at for at in (upcoming, ongoing) if at is not None]
+        return min(boundaries) if boundaries else None
+
+    def run(self, iterations=None):
+        """Sleep until each boundary and apply it; `max_sleep` bounds the wait so new elections are noticed."""
+        while iterations is None or iterations > 0:
+            self.run_due_transitions()
+            next_at = self.next_transition_at()
+            wait = self.max_sleep
+            if next_at is not None:
+                wait = min(max((next_at - self.clock()).total_seconds(), 0), self.max_sleep)
+            self.sleep(wait)
+            if iterations is not None:
+                iterations -= 1
@@ -1,9 +1,9 @@
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
-from django.contrib.auth.hashers import check_password
-from rest_framework.exceptions import AuthenticationFailed
+from django.utils import timezone
 from rest_framework import serializers
 from .models import *
+from .services import LoginService
 
 User = get_user_model()
 
@@ -34,35 +34,14 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     password = serializers.CharField(write_only=True, required=True)
 
     def validate(self, attrs):
-        # import pdb
-        # pdb.set_trace()
-        email = attrs.get("email")
-        password = attrs.get("password")
-
-        # Check if email exists
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            raise AuthenticationFailed("No account found with this email.")
-
-        # Check password
-        if not check_password(password, user.password):
-            raise AuthenticationFailed("Incorrect password.")
-
-        # Check if user is active
-        if not user.is_active:
-            raise AuthenticationFailed("Your account is disabled.")
-
-        # Generate token
-        tokens = super().validate({"email": user.email, "password": password})
-
-        return {
-            "access": tokens["access"],
-            "refresh": tokens["refresh"]
-        }
+        # One user lookup and one password hash per login; tokens are issued
+        # for the user already loaded instead of re-authenticating
+        return LoginService.login(attrs.get("email"), attrs.get("password"))
 
 
 class CandidateSerializer(serializers.ModelSerializer):
+    votes = serializers.IntegerField(source='vote_total', read_only=True)
+
     class Meta:
         model = Candidate
         fields = ['id', 'name', 'party', 'votes', 'profile_picture']
@@ -72,11 +51,54 @@ class ElectionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Election
-        fields = ['id', 'name', 'start_date', 'end_date','has_voted']
+        fields = ['id', 'name', 'voting_method', 'start_date', 'end_date','has_voted']
 
     def get_has_voted(self, obj):
         """Check if the logged-in user has voted in this election"""
+        voted_election_ids = self.context.get('voted_election_ids')
+        if voted_election_ids is not None:
+            return obj.id in voted_election_ids
         user = self.context.get('request').user
         if user.is_authenticated:
-            return Vote.objects.filter(voter=user, election=obj).exists()
-        return False
\ No newline at end of file
+            return (Vote.objects.filter(voter=user, election=obj).exists()
+                    or RankedBallot.objects.filter(voter=user, election=obj).exists())
+        return False
+
+# Plain-function serializers for the read-heavy listings. They read
+# `values_list()` rows instead of model instances and emit exactly what
+# the ModelSerializers above emit, without DRF's per-field overhead.
+
+CANDIDATE_COLUMNS = ('id', 'name', 'party', 'vote_total', 'profile_picture')
+ELECTION_COLUMNS = ('id', 'name', 'voting_method', 'start_date', 'end_date', 'status')
+
+
+def serialize_datetime(value):
+    """`serializers.DateTimeField` output: ISO 8601 in the current time zone, `Z` for UTC."""
+    if not value:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def serialize_candidates(queryset):
+    """`CandidateSerializer(many=True).data` for a `with_vote_totals()` queryset, without a request."""
+    url = Candidate._meta.get_field('profile_picture').storage.url
+    return [
+        {'id': id, 'name': name, 'party': party, 'votes': int(votes), 'profile_picture': url(picture) if picture else None}
+        for id, name, party, votes, picture in queryset.values_list(*CANDIDATE_COLUMNS)
+    ]
+
+
+def serialize_elections_by_status(queryset, voted_election_ids):
+    """`ElectionSerializer` output of every election, grouped by status in queryset order."""
+    by_status = {Election.ONGOING: [], Election.UPCOMING: [], Election.CLOSED: []}
+    for id, name, voting_method, start_date, end_date, election_status in queryset.values_list(*ELECTION_COLUMNS):
+        by_status[election_status].append({
+            'id': id,
+            'name': name,
+            'voting_method': voting_method,
+            'start_date': serialize_datetime(start_date),
+            'end_date': serialize_datetime(end_date),
+            'has_voted': id in voted_election_ids,
+        })
+    return by_status
@@ -1,10 +1,20 @@
 from django.shortcuts import get_object_or_404
-from rest_framework.exceptions import ValidationError
 from .models import *
-from django.utils.timezone import now
-from django.core.mail import send_mail
+from rest_framework.exceptions import NotFound, ValidationError
+from .cache import results_cache
+from .counters import vote_counter
+from .ingestion import get_vote_queue
+from .outbox import queue_email
+from .ranked import tabulate_election
+from .routing import primary_reads
+from django.db import IntegrityError, transaction
+from django.db.models import Count
 from django.conf import settings
-from django.contrib.auth.hashers import make_password
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import update_last_login
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.urls import reverse
 import datetime
 
@@ -41,105 +51,346 @@ class UserService:
         if User.objects.filter(aadhar_number=aadhar).exists():
             raise ValidationError("Aadhar number already registered.")
 
-        # Create user
-        user = User.objects.create(
-            username=username,
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            password=make_password(password),
-            date_of_birth=dob,
-            phone_number=phone,
-            aadhar_number=aadhar,
-            profile_picture=profile_picture,
-            is_verified=False  # Pending email verification
-        )
-        user.save()
-
-        # Generate Email Verification Token
-        token = EmailVerificationToken.objects.create(user=user)
-
-        # Send Verification Email
-        verification_link = request.build_absolute_uri(reverse('verify-email', args=[token.token]))
-        send_mail(
-            "Verify Your Email - Online Voting System",
-            f"Click the link to verify your email: {verification_link}",
-            settings.EMAIL_HOST_USER,
-            [email],
-            fail_silently=False,
-        )
+        # Create user, token and verification email atomically; the email is
+        # delivered later by the outbox worker
+        with transaction.atomic():
+            user = User.objects.create(
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+                password=make_password(password),
+                date_of_birth=birth_date,
+                phone_number=phone,
+                aadhar_number=aadhar,
+                profile_picture=profile_picture,
+                is_verified=False  # Pending email verification
+            )
+
+            # Generate Email Verification Token
+            token = EmailVerificationToken.objects.create(user=user)
+
+            # Queue Verification Email
+            verification_link = request.build_absolute_uri(reverse('verify-email', args=[token.token]))
+            queue_email(
+                "Verify Your Email - Online Voting System",
+                f"Click the link to verify your email: {verification_link}",
+                settings.EMAIL_HOST_USER,
+                [email],
+            )
 
         return user
 
 
+class LoginService:
+    @staticmethod
+    def get_user(email):
+        try:
+            return User.objects.get(email=email)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("No account found with this email.")
+
+    @staticmethod
+    async def aget_user(email):
+        try:
+            return await User.objects.aget(email=email)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("No account found with this email.")
+
+    @staticmethod
+    def check_credentials(user, password_ok):
+        if not password_ok:
+            raise AuthenticationFailed("Incorrect password.")
+        if not user.is_active:
+            raise AuthenticationFailed("Your account is disabled.")
+
+    @staticmethod
+    def login(email, password):
+        """Look the user up once, hash the password once and issue tokens."""
+        user = LoginService.get_user(email)
+        LoginService.check_credentials(user, check_password(password, user.password))
+        return LoginService.issue_tokens(user)
+
+    @staticmethod
+    def issue_tokens(user):
+        refresh = RefreshToken.for_user(user)
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
+        return {
+            "access": str(refresh.access_token),
+            "refresh": str(refresh),
+        }
+
+
 class VotingService:
     @staticmethod
     def get_ongoing_elections():
-        return Election.objects.filter(start_date__lte=now(), end_date__gte=now(), is_active=True).order_by('end_date')
+        return Election.objects.filter(status=Election.ONGOING, is_active=True).order_by('end_date')
     
     @staticmethod
     def get_completed_elections():
-        return Election.objects.filter(end_date__lt=now(), is_active=True).order_by('end_date')
+        return Election.objects.filter(status=Election.CLOSED, is_active=True).order_by('end_date')
 
     @staticmethod
     def get_upcoming_elections():
-        return Election.objects.filter(start_date__gte=now(),is_active=True).order_by('end_date')
+        return Election.objects.filter(status=Election.UPCOMING, is_active=True).order_by('end_date')
+
+    @staticmethod
+    def get_active_elections():
+        return Election.objects.filter(is_active=True).order_by('end_date')
+
+    @staticmethod
+    def get_voted_election_ids(user):
+        """Set of election ids the user has already voted in."""
+        if not user.is_authenticated:
+            return set()
+        return set(
+            Vote.objects.filter(voter=user).values_list('election_id', flat=True)
+            .union(RankedBallot.objects.filter(voter=user).values_list('election_id', flat=True))
+        )
 
     @staticmethod
     def get_candidates_for_election(election_id):
         election = get_object_or_404(Election, id=election_id)
-        return Candidate.objects.filter(election=election)
+        return Candidate.objects.filter(election=election).with_vote_totals()
 
     @staticmethod
+    @primary_reads()  # The duplicate-vote check must never read a lagging replica
     def cast_vote(user, election_id, candidate_id):
         election = get_object_or_404(Election, id=election_id)
 
+        if not election.is_ongoing():
+            raise ValidationError("Voting is not open for this election.")
+
+        if election.voting_method == Election.RANKED:
+            raise ValidationError("This election takes ranked ballots.")
+
         if Vote.objects.filter(voter=user, election=election).exists():
             raise ValidationError("You have already voted in this election.")
 
         candidate = get_object_or_404(Candidate, id=candidate_id, election=election)
 
-        Vote.objects.create(voter=user, election=election, candidate=candidate)
-
-        candidate.votes += 1
-        candidate.save()
+        # Record the vote and bump the sharded counter in one transaction
+        try:
+            with transaction.atomic():
+                Vote.objects.create(voter=user, election=election, candidate=candidate)
+                ElectionResultService.check_not_finalized(election)
+                vote_counter.increment(candidate.id)
+                transaction.on_commit(lambda: results_cache.bump(election.id))
+        except IntegrityError:
+            raise ValidationError("You have already voted in this election.")
 
         return candidate
 
+    @staticmethod
+    @primary_reads()  # The duplicate-vote check must never read a lagging replica
+    def cast_ranked_ballot(user, election_id, ranking):
+        """Record a ballot ranking candidate ids in order of preference."""
+        election = get_object_or_404(Election, id=election_id)
+
+        if not election.is_ongoing():
+            raise ValidationError("Voting is not open for this election.")
+
+        if election.voting_method != Election.RANKED:
+            raise ValidationError("This election does not take ranked ballots.")
+
+        try:
+            ranking = [int(candidate_id) for candidate_id in ranking]
+        except (TypeError, ValueError):
+            raise ValidationError("Ranking must be a list of candidate ids.")
+        if not ranking:
+            raise ValidationError("Rank at least one candidate.")
+        if len(set(ranking)) != len(ranking):
+            raise ValidationError("Each candidate can be ranked only once.")
+        if Candidate.objects.filter(election=election, id__in=ranking).count() != len(ranking):
+            raise NotFound("No Candidate matches the given query.")
+
+        try:
+            with transaction.atomic():
+                ballot = RankedBallot.objects.create(voter=user, election=election, ranking=ranking)
+                ElectionResultService.check_not_finalized(election)
+                transaction.on_commit(lambda: results_cache.bump(election.id))
+        except IntegrityError:
+            raise ValidationError("You have already voted in this election.")
+
+        return ballot
+
+    @staticmethod
+    def enqueue_vote(user, election_id, candidate_id):
+        """Accept a vote into the write-behind queue and return its receipt id."""
+        try:
+            candidate_id = int(candidate_id)
+        except (TypeError, ValueError):
+            raise ValidationError("A valid candidate is required.")
+        return get_vote_queue().enqueue(user.id, int(election_id), candidate_id)
+
+    @staticmethod
+    def get_vote_receipt(user, receipt_id):
+        entry = get_vote_queue().status(receipt_id)
+        if entry is None or entry["voter_id"] != user.id:
+            raise NotFound("No vote matches the given receipt.")
+        return {
+            "receipt_id": entry["receipt_id"],
+            "election_id": entry["election_id"],
+            "status": entry["status"],
+            "error": entry["error"],
+        }
+
 
 class ElectionResultService:
     @staticmethod
     def get_results(election_id):
-        election = get_object_or_404(Election, id=election_id)
+        return ElectionResultService.get_election_results(ElectionResultService.get_election(election_id))
+
+    @staticmethod
+    def get_election(election_id):
+        # Completed elections are served straight from their final snapshot,
+        # fetched in the same indexed lookup as the election itself
+        return get_object_or_404(Election.objects.select_related('result_snapshot'), id=election_id)
+
+    @staticmethod
+    def get_election_results(election):
+        if election.is_completed():
+            snapshot = ElectionResultService.get_snapshot(election)
+            if snapshot is not None:
+                return snapshot.results
+            # Not final yet: serve the live count from the primary's row
+            with primary_reads():
+                election = Election.objects.get(id=election.id)
+        # Live tallies come from the primary even when the view reads a replica
+        with primary_reads():
+            return results_cache.get_or_compute(
+                election.id, False, lambda: ElectionResultService.compute_results(election)
+            )
+
+    @staticmethod
+    def get_snapshot(election):
+        """Final snapshot of a completed election, finalizing it on first use."""
+        if not election.is_completed():
+            return None
+        try:
+            return election.result_snapshot
+        except ElectionResultSnapshot.DoesNotExist:
+            pass
+        try:
+            return ElectionResultService.finalize_election(election)
+        except ValidationError:
+            # Not ended on the primary (`end_date` was extended), or queued votes are pending
+            return None
+
+    @staticmethod
+    def check_not_finalized(election):
+        """Roll back a ballot written after the election's snapshot was frozen.
+
+        Called after the insert: the ballot's foreign key share-locks the
+        election row, so either `finalize_election` (which locks it for
+        update) waits and counts the ballot, or the snapshot is visible here.
+        """
+        if ElectionResultSnapshot.objects.filter(election=election).exists():
+            raise ValidationError("Voting is not open for this election.")
 
-        candidates = Candidate.objects.filter(election=election).order_by('-votes')
-        total_votes = sum(candidate.votes for candidate in candidates)
+    @staticmethod
+    def build_results(election, tallies):
+        """Results payload from `(candidate, votes)` pairs."""
+        tallies = sorted(tallies, key=lambda tally: -tally[1])
+        total_votes = sum(votes for _, votes in tallies)
 
         candidate_results = [
             {
                 "id": candidate.id,
                 "name": candidate.name,
                 "party": candidate.party,
-                "votes": candidate.votes,
-                "vote_percentage": round((candidate.votes / total_votes) * 100, 2) if total_votes > 0 else 0,
+                "votes": votes,
+                "vote_percentage": round((votes / total_votes) * 100, 2) if total_votes > 0 else 0,
                 "profile_picture": candidate.profile_picture.url if candidate.profile_picture else None
             }
-            for candidate in candidates
+            for candidate, votes in tallies
         ]
 
-        # Only declare a winner if the election has ended
-        winner = election.get_winner() if election.is_completed() else None
+        # Only declare a winner if the election has ended; candidates are
+        # already ordered by votes, so the winner is the first row
+        winner = candidate_results[0] if election.is_completed() and candidate_results else None
 
         return {
             "election": election.name,
             "total_votes": total_votes,
             "candidates": candidate_results,
-            "winner": {
-                "id": winner.id,
-                "name": winner.name,
-                "party": winner.party,
-                "votes": winner.votes,
-                "vote_percentage": round((winner.votes / total_votes) * 100, 2) if total_votes > 0 else 0,
-                "profile_picture": winner.profile_picture.url if winner.profile_picture else None
-            } if winner else None
-        }
\ No newline at end of file
+            "winner": dict(winner) if winner else None
+        }
+
+    @staticmethod
+    def build_ranked_results(election, tabulation):
+        """Results payload of a ranked election: the final round plus every round of the count."""
+        final = tabulation.rounds[-1]["tallies"] if tabulation.rounds else [0] * len(tabulation.candidates)
+        results = ElectionResultService.build_results(
+            election, [(candidate, int(votes)) for candidate, votes in zip(tabulation.candidates, final)]
+        )
+        results["rounds"] = []
+        for number, count in enumerate(tabulation.rounds, 1):
+            eliminated = count["eliminated"]
+            results["rounds"].append({
+                "round": number,
+                "tallies": [
+                    {"id": candidate.id, "name": candidate.name, "votes": int(votes)}
+                    for candidate, votes in sorted(
+                        zip(tabulation.candidates, count["tallies"]), key=lambda tally: -tally[1]
+                    ) if votes
+                ],
+                "exhausted": count["exhausted"],
+                "eliminated": tabulation.candidates[eliminated].id if eliminated is not None else None,
+            })
+        results["total_votes"] = tabulation.total_ballots
+        return results
+
+    @staticmethod
+    def compute_results(election):
+        if election.voting_method == Election.RANKED:
+            return ElectionResultService.build_ranked_results(election, tabulate_election(election))
+        candidates = Candidate.objects.filter(election=election).with_vote_totals().order_by('-vote_total')
+        return ElectionResultService.build_results(election, [(c, c.vote_total) for c in candidates])
+
+    @staticmethod
+    @primary_reads()  # The final count must see every vote
+    def finalize_election(election):
+        """Recount a completed election from the Vote table and store its final snapshot."""
+        if not election.is_completed():
+            raise ValidationError("Election has not ended yet.")
+
+        with transaction.atomic():
+            # The caller's row may be stale (read from a replica, or before an
+            # admin extended `end_date`): check the locked primary row
+            election = Election.objects.select_for_update().get(id=election.id)
+            if not election.is_completed():
+                raise ValidationError("Election has not ended yet.")
+
+            snapshot = ElectionResultSnapshot.objects.select_for_update().filter(election=election).first()
+            if snapshot is not None:
+                return snapshot
+            # Votes accepted before closing may still sit in the write-behind queue
+            if get_vote_queue().has_unfinished(election.id):
+                raise ValidationError("Queued votes for this election have not been committed yet.")
+
+            if election.voting_method == Election.RANKED:
+                results = ElectionResultService.build_ranked_results(election, tabulate_election(election))
+            else:
+                counts = dict(
+                    Vote.objects.filter(election=election).values_list('candidate').annotate(total=Count('id'))
+                )
+                candidates = Candidate.objects.filter(election=election).order_by('id')
+                results = ElectionResultService.build_results(
+                    election, [(candidate, counts.get(candidate.id, 0)) for candidate in candidates]
+                )
+            try:
+                with transaction.atomic():
+                    snapshot = ElectionResultSnapshot.objects.create(
+                        election=election,
+                        total_votes=results["total_votes"],
+                        winner_id=results["winner"]["id"] if results["winner"] else None,
+                        results=results,
+                    )
+                # Live streams and cached tallies pick up the winner
+                transaction.on_commit(lambda: results_cache.bump(election.id))
+                return snapshot
+            except IntegrityError:
+                # Finalized concurrently by another worker
+                return ElectionResultSnapshot.objects.get(election=election)
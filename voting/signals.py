@@ -0,0 +1,110 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import token_cache
+from .cache import change_counters, results_cache
+from .counters import site_statistics
+from .models import Candidate, Election, RankedBallot, User, Vote
+from .routing import pin_to_primary
+
+
+def on_commit_once(key, func):
+    """`transaction.on_commit(func)`, unless a callback for `key` is already waiting in this transaction."""
+    connection = transaction.get_connection()
+    hooks, pending = getattr(connection, 'voting_on_commit_once', (None, set()))
+    if hooks is not connection.run_on_commit:
+        # Django replaces the list of hooks on every commit and rollback
+        pending = set()
+        connection.voting_on_commit_once = (connection.run_on_commit, pending)
+    if key in pending:
+        return
+
+    def run():
+        pending.discard(key)
+        func()
+
+    pending.add(key)
+    transaction.on_commit(run)
+
+
+def bump_results(election_id):
+    on_commit_once(f'results:{election_id}', lambda: results_cache.bump(election_id))
+
+
+def bump_elections():
+    on_commit_once('changes:elections', lambda: change_counters.bump('elections'))
+
+
+def ballots_deleted():
+    """Ballots deleted in bulk (cascades, admin actions) send no per-row signals.
+
+    Recount them and invalidate every voter's `has_voted` flags once per
+    transaction instead.
+    """
+    on_commit_once('statistics:votes', lambda: site_statistics.reconcile('votes'))
+    bump_elections()
+
+
+@receiver([post_save, post_delete], sender=Election)
+def invalidate_election_results(sender, instance, **kwargs):
+    """Election renamed, rescheduled or removed: drop its cached results."""
+    bump_results(instance.id)
+    bump_elections()
+
+
+@receiver([post_save, post_delete], sender=Candidate)
+def invalidate_candidate_results(sender, instance, **kwargs):
+    """Candidates edited in the admin change the results of their election."""
+    bump_results(instance.election_id)
+
+
+@receiver(post_save, sender=Vote)
+@receiver(post_save, sender=RankedBallot)
+def invalidate_voter_ballots(sender, instance, **kwargs):
+    """The voter's `has_voted` flags changed; keep their reads on the primary until replicas catch up."""
+    voter_id = instance.voter_id
+    on_commit_once(f'changes:ballots:{voter_id}', lambda: change_counters.bump(f'ballots:{voter_id}'))
+    on_commit_once(f'pin:{voter_id}', lambda: pin_to_primary(voter_id))
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """Deactivated, deleted or re-passworded users must not ride on cached tokens."""
+    if update_fields == {'last_login'}:
+        return  # Every login saves this; it changes nothing a token vouches for
+    token_cache.invalidate_user(instance.pk)
+
+
+if apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+    @receiver(post_save, sender=BlacklistedToken)
+    def invalidate_blacklisted_tokens(sender, instance, **kwargs):
+        token_cache.clear()
+
+
+STATISTIC_NAMES = {
+    User: 'users', Election: 'elections', Candidate: 'candidates', Vote: 'votes', RankedBallot: 'votes',
+}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Election)
+@receiver(post_save, sender=Candidate)
+@receiver(post_save, sender=Vote)
+@receiver(post_save, sender=RankedBallot)
+def count_created_rows(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        site_statistics.increment(STATISTIC_NAMES[sender])
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Election)
+@receiver(post_delete, sender=Candidate)
+def count_deleted_rows(sender, instance, **kwargs):
+    # No per-row delete receiver on ballots: it would disable Django's fast
+    # delete for every cascade that reaches them
+    site_statistics.increment(STATISTIC_NAMES[sender], -1)
+    ballots_deleted()
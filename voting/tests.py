@@ -1,3 +1,1691 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+from datetime import date, timedelta, timezone as dt_timezone
+from io import StringIO
 
-# Create your tests here.
+from unittest import mock, skipUnless
+
+import numpy as np
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core import mail
+from django.contrib import admin
+from django.contrib.auth.models import AnonymousUser, update_last_login
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import TokenCache, token_cache
+from .admin import CandidateAdmin, ElectionAdmin
+from .checks import check_shared_caches
+from .charts import chart_digest, chart_path, get_results_chart, render_pie_chart
+from .ballot_files import BallotFile, export_ballot_file
+from .cache import ChangeCounters, ResultsCache, change_counters, results_cache
+from .counters import ShardedVoteCounter, site_statistics, vote_counter
+from .instrumentation import QueryRecorder, latency_histograms
+from .live import LiveResultsHub
+from .management.commands.seed_scale import seeded_elections, seeded_voters
+from .middleware import JWTAuthenticationMiddleware
+from .ingestion import COMMITTED, PENDING, REJECTED, VoteQueue, get_vote_queue
+from .models import (
+    Candidate, CandidateTally, Election, ElectionResultSnapshot, OutboxEmail, RankedBallot, StatisticShard,
+    TallyCheckpoint, TurnoutBucket, User, Vote, VoteCounterShard,
+)
+from .outbox import deliver_pending, queue_email
+from .reconciliation import TallyReconciler
+from .turnout import TurnoutRollup
+from .ranked import instant_runoff
+from .routing import (
+    PrimaryReplicaRouter, ReadConsistencyMiddleware, is_pinned_to_primary, pin_to_primary, reads_from,
+)
+from .renderers import FastJSONRenderer
+from .scheduler import ElectionLifecycleScheduler, warm_results_cache
+from .serializers import (
+    CandidateSerializer, ElectionSerializer, serialize_candidates, serialize_elections_by_status,
+)
+from .services import ElectionResultService, VotingService
+
+
+def make_voter(index):
+    return User.objects.create(
+        username=f"voter{index}", email=f"voter{index}@example.com",
+        first_name="Test", last_name="Voter", date_of_birth=date(1990, 1, 1),
+    )
+
+
+def make_election(name="Election", starts=-1, ends=1):
+    return Election.objects.create(
+        name=name, start_date=now() + timedelta(hours=starts), end_date=now() + timedelta(hours=ends)
+    )
+
+
+def make_candidate(election, name="A", party="P"):
+    return Candidate.objects.create(election=election, name=name, party=party, description="")
+
+
+def make_staff(index, superuser=False):
+    staff = make_voter(index)
+    staff.is_staff = True
+    staff.is_superuser = superuser
+    staff.save()
+    return staff
+
+
+class TwoCandidateTestCase(TestCase):
+    """An ongoing election with candidates A (party P) and B (party Q), starting from empty caches."""
+
+    def setUp(self):
+        cache.clear()
+        results_cache.clear()
+        self.election = make_election()
+        self.a = make_candidate(self.election, "A", "P")
+        self.b = make_candidate(self.election, "B", "Q")
+
+
+class ShardedVoteCounterTests(TestCase):
+    def setUp(self):
+        self.election = make_election()
+        self.candidate = make_candidate(self.election)
+
+    def test_cast_vote_increments_sharded_counter(self):
+        for i in range(25):
+            VotingService.cast_vote(make_voter(i), self.election.id, self.candidate.id)
+
+        self.assertEqual(vote_counter.total(self.candidate.id), 25)
+        self.assertEqual(vote_counter.totals_for_election(self.election.id), {self.candidate.id: 25})
+        self.assertEqual(Vote.objects.filter(candidate=self.candidate).count(), 25)
+
+    def test_duplicate_vote_does_not_bump_counter(self):
+        voter = make_voter(1)
+        VotingService.cast_vote(voter, self.election.id, self.candidate.id)
+        with self.assertRaises(ValidationError):
+            VotingService.cast_vote(voter, self.election.id, self.candidate.id)
+        self.assertEqual(vote_counter.total(self.candidate.id), 1)
+
+    def test_fold_moves_shards_into_candidate_votes(self):
+        counter = ShardedVoteCounter(num_shards=4)
+        for _ in range(10):
+            counter.increment(self.candidate.id)
+
+        self.assertEqual(counter.fold(self.candidate.id), 10)
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.votes, 10)
+        self.assertFalse(VoteCounterShard.objects.exclude(count=0).exists())
+        self.assertEqual(counter.total(self.candidate.id), 10)
+
+    def test_results_use_live_totals(self):
+        other = make_candidate(self.election, "B", "Q")
+        VotingService.cast_vote(make_voter(1), self.election.id, other.id)
+
+        results = ElectionResultService.get_results(self.election.id)
+        self.assertEqual(results["total_votes"], 1)
+        self.assertEqual(results["candidates"][0]["id"], other.id)
+        self.assertEqual(results["candidates"][0]["vote_percentage"], 100.0)
+
+
+class VoteQueueTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.queue = VoteQueue(f"{self.tmp.name}/queue.sqlite3")
+        self.election = make_election()
+        self.candidate = make_candidate(self.election)
+
+    def test_drain_bulk_creates_votes_and_counts(self):
+        voters = [make_voter(i) for i in range(5)]
+        receipts = [self.queue.enqueue(v.id, self.election.id, self.candidate.id) for v in voters]
+        self.assertEqual(self.queue.status(receipts[0])["status"], PENDING)
+
+        self.assertEqual(self.queue.drain(batch_size=100), 5)
+        self.assertEqual(Vote.objects.filter(election=self.election).count(), 5)
+        self.assertEqual(vote_counter.total(self.candidate.id), 5)
+        self.assertTrue(all(self.queue.status(r)["status"] == COMMITTED for r in receipts))
+
+    def test_duplicate_enqueue_rejected(self):
+        voter = make_voter(1)
+        self.queue.enqueue(voter.id, self.election.id, self.candidate.id)
+        with self.assertRaises(ValidationError):
+            self.queue.enqueue(voter.id, self.election.id, self.candidate.id)
+
+    def test_unknown_candidate_rejected_and_resubmittable(self):
+        voter = make_voter(1)
+        receipt = self.queue.enqueue(voter.id, self.election.id, 999999)
+        self.queue.drain()
+        self.assertEqual(self.queue.status(receipt)["status"], REJECTED)
+
+        receipt = self.queue.enqueue(voter.id, self.election.id, self.candidate.id)
+        self.queue.drain()
+        self.assertEqual(self.queue.status(receipt)["status"], COMMITTED)
+
+    def test_redelivered_entries_are_not_double_counted(self):
+        voter = make_voter(1)
+        receipt = self.queue.enqueue(voter.id, self.election.id, self.candidate.id)
+        self.queue.drain()
+        # Simulate a worker that committed to the DB but crashed before acknowledging
+        with self.queue._connect() as conn:
+            conn.execute("UPDATE vote_queue SET status = ?", (PENDING,))
+        self.queue.drain()
+
+        self.assertEqual(self.queue.status(receipt)["status"], COMMITTED)
+        self.assertEqual(vote_counter.total(self.candidate.id), 1)
+
+    def test_vote_cast_during_drain_rejects_only_that_entry(self):
+        racer, other = make_voter(1), make_voter(2)
+        receipts = [self.queue.enqueue(v.id, self.election.id, self.candidate.id) for v in (racer, other)]
+        create_votes = VoteQueue._create_votes
+
+        def racing(new_votes, outcomes, batch_size):
+            # Committed through the synchronous API after drain() read the existing votes
+            Vote.objects.create(voter=racer, election=self.election, candidate=self.candidate)
+            return create_votes(new_votes, outcomes, batch_size)
+
+        with mock.patch.object(VoteQueue, "_create_votes", staticmethod(racing)):
+            self.queue.drain()
+        self.assertEqual([self.queue.status(r)["status"] for r in receipts], [REJECTED, COMMITTED])
+        self.assertEqual(Vote.objects.filter(election=self.election).count(), 2)
+        self.assertEqual(vote_counter.total(self.candidate.id), 1)
+
+    def test_queued_api_returns_receipt(self):
+        voter = make_voter(1)
+        with override_settings(VOTE_INGESTION_QUEUED=True, VOTE_QUEUE_PATH=f"{self.tmp.name}/api.sqlite3"):
+            client = APIClient()
+            client.force_authenticate(voter)
+            response = client.post(f"/api/elections/{self.election.id}/vote/", {"candidate_id": self.candidate.id})
+            self.assertEqual(response.status_code, 202)
+            receipt_id = response.data["receipt_id"]
+
+            self.assertEqual(client.get(f"/api/votes/{receipt_id}/").data["status"], PENDING)
+            get_vote_queue().drain()
+            self.assertEqual(client.get(f"/api/votes/{receipt_id}/").data["status"], COMMITTED)
+
+    def test_queued_votes_are_in_the_final_snapshot(self):
+        with override_settings(VOTE_QUEUE_PATH=self.queue.path):
+            self.queue.enqueue(make_voter(1).id, self.election.id, self.candidate.id)
+            Election.objects.filter(id=self.election.id).update(end_date=now())
+            self.election.refresh_from_db()
+
+            # Polling closed with the vote still queued: nothing is frozen yet
+            with self.assertRaises(ValidationError):
+                ElectionResultService.finalize_election(self.election)
+            self.assertIsNone(ElectionResultService.get_snapshot(self.election))
+
+            self.queue.drain()
+            self.assertEqual(ElectionResultService.finalize_election(self.election).total_votes, 1)
+
+    def test_vote_racing_finalization_is_rolled_back(self):
+        # cast_vote saw polling open, but the snapshot was written before its insert
+        ElectionResultSnapshot.objects.create(election=self.election, total_votes=0, results={})
+        with self.assertRaises(ValidationError):
+            VotingService.cast_vote(make_voter(1), self.election.id, self.candidate.id)
+        self.assertFalse(Vote.objects.exists())
+        self.assertEqual(vote_counter.total(self.candidate.id), 0)
+
+
+class ResultsCacheTests(TwoCandidateTestCase):
+    def setUp(self):
+        super().setUp()
+
+    def test_repeat_reads_hit_cache(self):
+        ElectionResultService.get_results(self.election.id)
+        with self.assertNumQueries(1):  # only the election lookup
+            ElectionResultService.get_results(self.election.id)
+        self.assertEqual(results_cache.stats()["hits"], 1)
+        self.assertEqual(results_cache.stats()["misses"], 1)
+
+    def test_vote_commit_bumps_version(self):
+        self.assertEqual(ElectionResultService.get_results(self.election.id)["total_votes"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            VotingService.cast_vote(make_voter(1), self.election.id, self.b.id)
+        results = ElectionResultService.get_results(self.election.id)
+        self.assertEqual(results["total_votes"], 1)
+        self.assertEqual(results["candidates"][0]["id"], self.b.id)
+
+    def test_winner_appears_once_election_closes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            VotingService.cast_vote(make_voter(1), self.election.id, self.b.id)
+        self.assertIsNone(ElectionResultService.get_results(self.election.id)["winner"])
+
+        # Closing without any new votes must not serve the open-election entry
+        Election.objects.filter(id=self.election.id).update(end_date=now() - timedelta(minutes=1))
+        self.assertEqual(ElectionResultService.get_results(self.election.id)["winner"]["id"], self.b.id)
+
+    def test_votes_rejected_outside_polling_window(self):
+        closed = make_election("Closed", starts=-3, ends=-1)
+        candidate = make_candidate(closed, "C", "R")
+        with self.assertRaises(ValidationError):
+            VotingService.cast_vote(make_voter(1), closed.id, candidate.id)
+
+    def test_process_local_cache_is_refused(self):
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            # Results versions and primary pins both name it
+            self.assertEqual([error.id for error in check_shared_caches(None)], ["voting.E002", "voting.E002"])
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache:6379/0"}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(check_shared_caches(None), [])
+            with override_settings(RESULTS_CACHE_ALIAS="missing"):
+                self.assertEqual([error.id for error in check_shared_caches(None)], ["voting.E001"])
+
+    def test_lru_eviction(self):
+        small = ResultsCache(max_entries=1)
+        small.get_or_compute(1, False, lambda: "one")
+        small.get_or_compute(2, False, lambda: "two")
+        self.assertEqual(small.stats()["entries"], 1)
+
+
+class ElectionsAPIQueryTests(TestCase):
+    def setUp(self):
+        self.voter = make_voter(1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.voter)
+
+    def make_elections(self, count):
+        for i in range(count):
+            election = make_election(f"E{i}", starts=[-2, 1, -3][i % 3], ends=[2, 3, -1][i % 3])
+            if i % 2:
+                candidate = make_candidate(election)
+                Vote.objects.create(voter=self.voter, election=election, candidate=candidate)
+
+    def test_query_count_is_constant(self):
+        for count in (3, 30, 150):
+            Election.objects.all().delete()
+            self.make_elections(count)
+            with self.assertNumQueries(2):
+                response = self.client.get("/api/elections/")
+            self.assertEqual(response.status_code, 200)
+            data = response.data
+            self.assertEqual(
+                len(data["ongoing_elections"]) + len(data["upcoming_elections"]) + len(data["completed_elections"]),
+                count,
+            )
+
+    def test_partition_and_has_voted(self):
+        self.make_elections(6)
+        data = self.client.get("/api/elections/").data
+        self.assertEqual([e["name"] for e in data["ongoing_elections"]], ["E0", "E3"])
+        self.assertEqual([e["name"] for e in data["upcoming_elections"]], ["E1", "E4"])
+        self.assertEqual([e["name"] for e in data["completed_elections"]], ["E2", "E5"])
+        self.assertEqual([e["has_voted"] for e in data["ongoing_elections"]], [False, True])
+
+
+class ResultSnapshotTests(TwoCandidateTestCase):
+    def setUp(self):
+        super().setUp()
+        for i, candidate in enumerate([self.a, self.b, self.b]):
+            VotingService.cast_vote(make_voter(i), self.election.id, candidate.id)
+        Election.objects.filter(id=self.election.id).update(end_date=now() - timedelta(minutes=1))
+        self.election.refresh_from_db()
+
+    def test_finalize_recounts_from_vote_table(self):
+        # A drifted counter must not leak into the final results
+        vote_counter.increment(self.a.id, 10)
+        snapshot = ElectionResultService.finalize_election(self.election)
+
+        self.assertEqual(snapshot.total_votes, 3)
+        self.assertEqual(snapshot.winner_id, self.b.id)
+        self.assertEqual([c["votes"] for c in snapshot.results["candidates"]], [2, 1])
+        self.assertEqual(snapshot.results["winner"]["vote_percentage"], 66.67)
+        self.assertEqual(self.election.get_winner(), self.b)
+
+    def test_completed_results_served_in_one_query(self):
+        ElectionResultService.finalize_election(self.election)
+        with self.assertNumQueries(1):
+            results = ElectionResultService.get_results(self.election.id)
+        self.assertEqual(results["total_votes"], 3)
+
+    def test_finalizing_bumps_the_results_version(self):
+        version = results_cache.get_version(self.election.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            ElectionResultService.finalize_election(self.election)
+        self.assertNotEqual(results_cache.get_version(self.election.id), version)
+
+    def test_snapshot_is_immutable(self):
+        snapshot = ElectionResultService.finalize_election(self.election)
+        self.assertEqual(ElectionResultService.finalize_election(self.election), snapshot)
+        snapshot.total_votes = 100
+        with self.assertRaises(Exception):
+            snapshot.save()
+
+    def test_stale_row_cannot_finalize_an_extended_election(self):
+        # The admin extended polling; this row (e.g. from a replica) predates it
+        Election.objects.filter(id=self.election.id).update(end_date=now() + timedelta(hours=1))
+        with self.assertRaises(ValidationError):
+            ElectionResultService.finalize_election(self.election)
+        self.assertFalse(ElectionResultSnapshot.objects.exists())
+
+        results = ElectionResultService.get_election_results(self.election)
+        self.assertIsNone(results["winner"])
+        self.assertEqual(results["total_votes"], 3)
+        self.assertFalse(ElectionResultSnapshot.objects.exists())
+
+    def test_backfill_command(self):
+        ongoing = make_election("Ongoing")
+        call_command("finalize_elections", stdout=StringIO())
+        self.assertTrue(ElectionResultSnapshot.objects.filter(election=self.election).exists())
+        self.assertFalse(ElectionResultSnapshot.objects.filter(election=ongoing).exists())
+
+
+class FakeClock:
+    def __init__(self, start):
+        self.current = start
+
+    def __call__(self):
+        return self.current
+
+    def sleep(self, seconds):
+        self.current += timedelta(seconds=seconds)
+
+
+class ElectionLifecycleSchedulerTests(TestCase):
+    def setUp(self):
+        self.clock = FakeClock(now())
+        self.fired = []
+        self.scheduler = ElectionLifecycleScheduler(
+            clock=self.clock, sleep=self.clock.sleep, max_sleep=86400,
+            hooks={
+                Election.ONGOING: [lambda e: self.fired.append((e.name, Election.ONGOING))],
+                Election.CLOSED: [lambda e: self.fired.append((e.name, Election.CLOSED))],
+            },
+        )
+        self.election = make_election("Poll", starts=1, ends=2)
+
+    def status(self):
+        return Election.objects.values_list('status', flat=True).get(id=self.election.id)
+
+    def test_status_flips_exactly_at_boundaries(self):
+        self.assertEqual(self.status(), Election.UPCOMING)
+        self.clock.current = self.election.start_date - timedelta(microseconds=1)
+        self.assertEqual(self.scheduler.run_due_transitions(), [])
+
+        self.clock.current = self.election.start_date
+        self.scheduler.run_due_transitions()
+        self.assertEqual(self.status(), Election.ONGOING)
+
+        self.clock.current = self.election.end_date
+        self.scheduler.run_due_transitions()
+        self.assertEqual(self.status(), Election.ONGOING)
+
+        self.clock.current = self.election.end_date + timedelta(microseconds=1)
+        self.scheduler.run_due_transitions()
+        self.assertEqual(self.status(), Election.CLOSED)
+        self.assertEqual(self.fired, [("Poll", Election.ONGOING), ("Poll", Election.CLOSED)])
+
+    def test_cache_warmed_only_when_shared(self):
+        with mock.patch.object(ElectionResultService, "get_results") as get_results:
+            for shared in (False, True):
+                with mock.patch("voting.scheduler.is_shared_cache", return_value=shared):
+                    warm_results_cache(self.election)
+        # A process-local cache would only be warm for the scheduler itself
+        get_results.assert_called_once_with(self.election.id)
+
+    def test_loop_sleeps_until_next_boundary(self):
+        self.assertEqual(self.scheduler.next_transition_at(), self.election.start_date)
+        self.scheduler.run(iterations=3)
+        self.assertEqual(self.status(), Election.CLOSED)
+        self.assertEqual(len(self.fired), 2)
+        self.assertIsNone(self.scheduler.next_transition_at())
+
+    def test_listing_uses_status_column(self):
+        self.clock.current = self.election.start_date
+        self.scheduler.run_due_transitions()
+        self.assertEqual(list(VotingService.get_ongoing_elections()), [self.election])
+        self.assertEqual(list(VotingService.get_upcoming_elections()), [])
+
+    def test_default_close_hook_finalizes_results(self):
+        closed = make_election("Closed", starts=-3, ends=-1)
+        Election.objects.filter(id=closed.id).update(status=Election.ONGOING)
+        ElectionLifecycleScheduler().run_due_transitions()
+        self.assertTrue(ElectionResultSnapshot.objects.filter(election=closed).exists())
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.voter = make_voter(1)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.voter).access_token}")
+
+    def test_token_verified_once_then_cached(self):
+        # First request: one user lookup shared by middleware and DRF
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/profile/").status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/profile/").status_code, 200)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get("/api/profile/")
+        self.voter.is_active = False
+        self.voter.save()
+        self.assertEqual(self.client.get("/api/profile/").status_code, 401)
+
+    def test_login_keeps_cached_tokens(self):
+        self.client.get("/api/profile/")
+        update_last_login(None, self.voter)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/profile/").status_code, 200)
+
+    def test_invalidation_drops_only_that_users_tokens(self):
+        cache = TokenCache(max_entries=2)
+        other = make_voter(2)
+        for key, user in ((b"a", self.voter), (b"b", other), (b"c", self.voter)):
+            cache.set(key, user, RefreshToken.for_user(user).access_token)
+        self.assertIsNone(cache.get(b"a"))  # Evicted
+        cache.invalidate_user(self.voter.pk)
+        self.assertIsNone(cache.get(b"c"))
+        self.assertIsNotNone(cache.get(b"b"))
+        self.assertEqual(cache._keys_by_user, {other.pk: {b"b"}})
+
+    def test_invalid_token_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+        self.assertEqual(self.client.get("/api/profile/").status_code, 401)
+        self.assertEqual(len(token_cache), 0)
+
+    async def test_middleware_runs_natively_under_asgi(self):
+        async def get_response(request):
+            return request.user
+
+        middleware = JWTAuthenticationMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        token = RefreshToken.for_user(self.voter).access_token
+        request = RequestFactory().get("/api/profile/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual((await middleware(request)).id, self.voter.id)
+
+    def test_cache_respects_token_expiry(self):
+        token = RefreshToken.for_user(self.voter).access_token
+        token.set_exp(lifetime=timedelta(seconds=-1))
+        token_cache.set(b"sig", self.voter, token)
+        self.assertIsNone(token_cache.get(b"sig"))
+
+
+class LoginTests(TestCase):
+    def setUp(self):
+        self.voter = make_voter(1)
+        self.voter.password = make_password("secret-pass")
+        self.voter.save()
+
+    def test_login_hashes_password_once(self):
+        with mock.patch("voting.services.check_password", wraps=check_password) as checked:
+            response = APIClient().post("/api/login/", {"email": self.voter.email, "password": "secret-pass"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.data)
+        self.assertEqual(checked.call_count, 1)
+
+    def test_login_rejects_bad_password(self):
+        response = APIClient().post("/api/login/", {"email": self.voter.email, "password": "wrong"})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["detail"], "Incorrect password.")
+
+    async def test_async_login(self):
+        client = AsyncClient()
+        response = await client.post(
+            "/api/login/async/", {"email": "voter1@example.com", "password": "secret-pass"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.json())
+
+        response = await client.post(
+            "/api/login/async/", {"email": "voter1@example.com", "password": "wrong"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 401)
+
+        for body in ("[]", '"voter1@example.com"', "1"):
+            response = await client.post("/api/login/async/", body, content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+
+
+class EmailOutboxTests(TestCase):
+    def test_registration_queues_email_instead_of_sending(self):
+        response = APIClient().post("/api/register/", {
+            "username": "newvoter", "first_name": "New", "last_name": "Voter",
+            "email": "new@example.com", "password": "secret-pass", "confirm_password": "secret-pass",
+            "date_of_birth": "1990-01-01", "phone_number": "9999999999", "aadhar_number": "123412341234",
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.get().recipients, ["new@example.com"])
+
+        self.assertEqual(deliver_pending(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("/api/verify-email/", mail.outbox[0].body)
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.SENT)
+
+    def test_batch_reuses_one_connection(self):
+        for i in range(3):
+            queue_email("Subject", "Body", None, [f"user{i}@example.com"])
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.open") as opened:
+            self.assertEqual(deliver_pending(), (3, 0))
+        self.assertEqual(opened.call_count, 1)
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_BASE=60)
+    def test_failed_sends_back_off_then_give_up(self):
+        email = queue_email("Subject", "Body", None, ["user@example.com"])
+        with mock.patch("django.core.mail.backends.locmem.EmailBackend.send_messages", side_effect=OSError("down")):
+            self.assertEqual(deliver_pending(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDING, 1))
+            self.assertGreater(email.next_attempt_at, now() + timedelta(seconds=50))
+
+            self.assertEqual(deliver_pending(), (0, 0))  # not due yet
+            OutboxEmail.objects.update(next_attempt_at=now())
+            self.assertEqual(deliver_pending(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.last_error), (OutboxEmail.FAILED, "down"))
+
+
+class ImportVotersTests(TestCase):
+    HEADER = "username,first_name,last_name,email,date_of_birth,phone_number,aadhar_number,password\n"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = f"{self.tmp.name}/roll.csv"
+
+    def write_roll(self, lines):
+        with open(self.path, "w") as roll:
+            roll.write(self.HEADER + "".join(line + "\n" for line in lines))
+
+    def run_import(self, *args):
+        call_command("import_voters", self.path, "--workers", "1", "--batch-size", "2", *args, stdout=StringIO())
+
+    def test_import_validates_and_hashes(self):
+        make_voter(9)  # voter9@example.com already registered
+        self.write_roll([
+            "a,Ann,One,a@example.com,1990-01-01,111,100000000001,pw-a",
+            "b,Bob,Two,b@example.com,2015-01-01,222,100000000002,pw-b",        # under 18
+            "c,Cat,Three,a@example.com,1990-01-01,333,100000000003,pw-c",      # duplicate email in file
+            "d,Dan,Four,voter9@example.com,1990-01-01,444,100000000004,pw-d",  # already registered
+            "e,Eve,Five,e@example.com,1985-05-05,,,",
+            "f,Fay,Six,,1990-01-01,,,",                                        # blank email
+            "g,Gus,Seven,,1990-01-01,,,",                                      # blank email again
+            ",Hal,Eight,h@example.com,1990-01-01,,,",                          # blank username
+            "i,Ivy,Nine,not-an-email,1990-01-01,,,",                           # invalid email
+        ])
+        self.run_import("--errors", f"{self.tmp.name}/errors.csv")
+
+        self.assertEqual(sorted(User.objects.values_list("username", flat=True)), ["a", "e", "voter9"])
+        self.assertTrue(User.objects.get(username="a").check_password("pw-a"))
+        self.assertFalse(User.objects.get(username="e").has_usable_password())
+        with open(f"{self.tmp.name}/errors.csv") as errors:
+            self.assertEqual(len(errors.readlines()), 7)
+
+    def test_rejects_overlong_and_case_variant_values(self):
+        self.write_roll([
+            "a,Ann,One,a@example.com,1990-01-01,1234567890123456,,",                # phone_number over 15
+            "b,Bob,Two,b@example.com,1990-01-01,,1234567890123,",                   # aadhar_number over 12
+            f"c,{'C' * 31},Three,c@example.com,1990-01-01,,,",                      # first_name over 30
+            "d,Dan,Four,d@example.com,1990-01-01,,,",
+            "D,Dee,Four,D@Example.com,1990-01-01,,,",                               # same voter, other case
+        ])
+        self.run_import("--unusable-passwords", "--errors", f"{self.tmp.name}/errors.csv")
+        self.assertEqual(list(User.objects.values_list("username", flat=True)), ["d"])
+        with open(f"{self.tmp.name}/errors.csv") as errors:
+            self.assertEqual(len(errors.readlines()), 4)
+
+    def test_database_conflicts_reject_only_their_rows(self):
+        from .management.commands.import_voters import Command
+        self.write_roll([
+            "a,Ann,One,a@example.com,1990-01-01,,,",
+            "b,Bob,Two,voter9@example.com,1990-01-01,,,",
+        ])
+        validate_batch = Command.validate_batch
+
+        def signup_after_validation(command, batch):
+            valid = validate_batch(command, batch)
+            make_voter(9)  # voter9@example.com registers before the insert
+            return valid
+
+        with mock.patch.object(Command, "validate_batch", signup_after_validation):
+            self.run_import("--unusable-passwords", "--errors", f"{self.tmp.name}/errors.csv")
+        self.assertEqual(sorted(User.objects.values_list("username", flat=True)), ["a", "voter9"])
+        with open(f"{self.tmp.name}/errors.csv") as errors:
+            self.assertIn("voter9@example.com", errors.read())
+
+    def test_resume_from_checkpoint(self):
+        self.write_roll([
+            "a,Ann,One,a@example.com,1990-01-01,111,100000000001,",
+            "b,Bob,Two,b@example.com,1990-01-01,222,100000000002,",
+            "c,Cat,Three,c@example.com,1990-01-01,333,100000000003,",
+        ])
+        with open(f"{self.path}.checkpoint", "w") as checkpoint:
+            checkpoint.write('{"rows": 2}')
+        self.run_import("--unusable-passwords")
+        self.assertEqual(list(User.objects.values_list("username", flat=True)), ["c"])
+
+
+class AdminChangelistQueryTests(TestCase):
+    def setUp(self):
+        admin_user = make_staff(0, superuser=True)
+        self.client.force_login(admin_user)
+        self.voters = [make_voter(i) for i in range(1, 4)]
+
+    def seed(self, elections):
+        Election.objects.bulk_create([
+            Election(name=f"E{i}", start_date=now() - timedelta(days=2), end_date=now() - timedelta(days=1))
+            for i in range(elections)
+        ])
+        Candidate.objects.bulk_create([
+            Candidate(election=election, name=name, party="P", description="")
+            for election in Election.objects.all() for name in ("A", "B")
+        ])
+        for election in Election.objects.all()[:5]:
+            candidate = election.candidate_set.first()
+            Vote.objects.bulk_create([Vote(voter=v, election=election, candidate=candidate) for v in self.voters])
+            vote_counter.increment(candidate.id, len(self.voters))
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_election_changelist_is_constant(self):
+        counts = []
+        for page_size in (100, 1000):
+            Election.objects.all().delete()
+            self.seed(page_size)
+            with mock.patch.object(ElectionAdmin, "list_per_page", page_size):
+                count, response = self.count_queries("/admin/voting/election/")
+            counts.append(count)
+        self.assertEqual(counts[0], counts[1])
+        self.assertContains(response, "A (P)")
+
+    def test_candidate_changelist_is_constant(self):
+        counts = []
+        for page_size in (100, 1000):
+            Election.objects.all().delete()
+            self.seed(page_size // 2)
+            with mock.patch.object(CandidateAdmin, "list_per_page", page_size):
+                count, response = self.count_queries("/admin/voting/candidate/")
+            counts.append(count)
+        self.assertEqual(counts[0], counts[1])
+        self.assertContains(response, "100.00%")
+
+    def test_filtered_candidate_changelist_keeps_election_percentages(self):
+        self.seed(1)
+        b = Candidate.objects.get(name="B")
+        vote_counter.increment(b.id, 1)
+        # Searching shows only B; its share is still of the whole election
+        count, response = self.count_queries("/admin/voting/candidate/?q=B")
+        self.assertContains(response, "25.00%")
+
+
+class ResultsChartTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(CHART_CACHE_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.results = {"election": "E", "candidates": [{"name": "A", "votes": 3}, {"name": "B", "votes": 1}]}
+
+    def test_chart_rendered_once_per_content(self):
+        with mock.patch("voting.charts.render_pie_chart", wraps=render_pie_chart) as render:
+            digest = get_results_chart(self.results)
+            self.assertEqual(get_results_chart(self.results), digest)
+        self.assertEqual(render.call_count, 1)
+        with open(chart_path(digest), "rb") as chart:
+            self.assertEqual(chart.read(8), b"\x89PNG\r\n\x1a\n")
+
+    def test_no_votes_no_chart(self):
+        self.assertIsNone(get_results_chart({"candidates": [{"name": "A", "votes": 0}]}))
+
+    def test_chart_served_with_caching_headers(self):
+        digest = get_results_chart(self.results)
+        staff = make_staff(1)
+        self.client.force_login(staff)
+        response = self.client.get(f"/charts/{digest}.png")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["ETag"], f'"{digest}"')
+        self.assertEqual(self.client.get(f"/charts/{'0' * 64}.png").status_code, 404)
+
+    def test_scheduler_prerenders_chart_but_requests_do_not(self):
+        elections = [make_election(name) for name in ("Lazy", "Scheduled")]
+        for election in elections:
+            candidate = make_candidate(election, election.name)
+            VotingService.cast_vote(make_voter(election.id), election.id, candidate.id)
+        Election.objects.update(end_date=now() - timedelta(minutes=1))
+        lazy, scheduled = Election.objects.order_by("id")
+
+        # Finalized lazily by the first results request: no matplotlib in the request
+        with self.captureOnCommitCallbacks(execute=True):
+            results = ElectionResultService.get_results(lazy.id)
+        self.assertFalse(os.path.exists(chart_path(chart_digest(results))))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ElectionLifecycleScheduler().run_due_transitions()
+        snapshot = ElectionResultSnapshot.objects.get(election=scheduled)
+        self.assertTrue(os.path.exists(chart_path(chart_digest(snapshot.results))))
+
+
+class SiteStatisticsTests(TestCase):
+    def test_counters_follow_inserts_and_deletes(self):
+        election = make_election()
+        candidate = make_candidate(election)
+        VotingService.cast_vote(make_voter(1), election.id, candidate.id)
+        self.assertEqual(site_statistics.totals(), {"users": 1, "elections": 1, "candidates": 1, "votes": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            election.delete()  # cascades to the candidate and the vote
+        self.assertEqual(site_statistics.totals(), {"users": 1, "elections": 0, "candidates": 0, "votes": 0})
+
+    def test_cascades_recount_votes_once(self):
+        election = make_election()
+        candidates = [make_candidate(election, name=name) for name in "ABC"]
+        for index in range(30):
+            VotingService.cast_vote(make_voter(index), election.id, candidates[index % 3].id)
+        reconcile = mock.patch.object(site_statistics, "reconcile", wraps=site_statistics.reconcile)
+        with CaptureQueriesContext(connection) as queries, reconcile as reconcile:
+            with self.captureOnCommitCallbacks(execute=True):
+                election.delete()
+        shard_updates = [query["sql"] for query in queries.captured_queries
+                         if query["sql"].startswith("UPDATE") and "statistic_shard" in query["sql"]]
+        self.assertEqual(len(shard_updates), 4)  # The election and its candidates, not the 30 votes
+        reconcile.assert_called_once_with("votes")
+        self.assertEqual(site_statistics.totals()["votes"], 0)
+
+    def test_first_read_seeds_existing_rows(self):
+        election = make_election()
+        make_candidate(election)
+        make_voter(1)
+        StatisticShard.objects.all().delete()  # Rows from before the counters existed
+        make_voter(2).delete()
+        self.assertEqual(StatisticShard.objects.count(), 0)
+        self.assertEqual(site_statistics.totals(), {"users": 1, "elections": 1, "candidates": 1, "votes": 0})
+        make_voter(3)
+        self.assertEqual(site_statistics.totals()["users"], 2)
+
+    def test_reconcile_corrects_drift(self):
+        make_voter(1)
+        site_statistics.totals()
+        site_statistics.increment("users", 5)
+        self.assertEqual(site_statistics.reconcile()["users"], 5)
+        self.assertEqual(site_statistics.totals()["users"], 1)
+
+    def test_admin_index_reads_counters(self):
+        staff = make_staff(1, superuser=True)
+        self.client.force_login(staff)
+        site_statistics.reconcile()  # Seeded, as by the first read
+        with mock.patch.object(Vote.objects, "count", side_effect=AssertionError("COUNT(*) on votes")):
+            self.assertEqual(self.client.get("/admin/").status_code, 200)
+
+        api = APIClient()
+        api.force_authenticate(staff)
+        self.assertEqual(api.get("/api/stats/").data["users"], 1)
+
+
+class TallyReconciliationTests(TwoCandidateTestCase):
+    def setUp(self):
+        super().setUp()
+        for index in range(5):
+            VotingService.cast_vote(make_voter(index), self.election.id, self.a.id if index < 3 else self.b.id)
+        Vote.objects.update(timestamp=now() - timedelta(minutes=1))
+
+    def test_consistent_counters_report_no_drift(self):
+        self.assertEqual(TallyReconciler(chunk_size=2).run(), [])
+        self.assertEqual(
+            dict(CandidateTally.objects.values_list("candidate_id", "counted_votes")), {self.a.id: 3, self.b.id: 2}
+        )
+        self.assertEqual(TallyCheckpoint.objects.get().last_vote_id, Vote.objects.latest("id").id)
+
+    def test_later_runs_only_scan_new_votes(self):
+        TallyReconciler().run()
+        VotingService.cast_vote(make_voter(5), self.election.id, self.b.id)
+        with CaptureQueriesContext(connection) as queries:
+            TallyReconciler(chunk_size=1000000, lag=0).run()
+        scans = [query["sql"] for query in queries.captured_queries if 'FROM "vote"' in query["sql"]
+                 and "GROUP BY" in query["sql"]]
+        self.assertEqual(len(scans), 1)
+        self.assertEqual(CandidateTally.objects.get(candidate=self.b).counted_votes, 3)
+
+    def test_fix_corrects_drifted_counter(self):
+        vote_counter.increment(self.a.id, 4)
+        Candidate.objects.filter(id=self.b.id).update(votes=-1)
+        self.assertEqual(
+            sorted(TallyReconciler().run()), sorted([(self.a.id, 3, 7, False), (self.b.id, 2, 1, False)])
+        )
+        TallyReconciler(fix=True).run()
+        self.assertEqual(vote_counter.totals_for_election(self.election.id), {self.a.id: 3, self.b.id: 2})
+        self.assertEqual(TallyReconciler().run(), [])
+
+    def test_unsettled_votes_are_not_checkpointed(self):
+        TallyReconciler().run()
+        # An older id whose transaction commits late must still be scanned
+        VotingService.cast_vote(make_voter(5), self.election.id, self.b.id)
+        checkpoint = TallyCheckpoint.objects.get().last_vote_id
+
+        # Counted from the ledger directly, so it is in flight rather than drift
+        self.assertEqual(TallyReconciler().run(), [(self.b.id, 3, 3, False)])
+        self.assertEqual(TallyCheckpoint.objects.get().last_vote_id, checkpoint)
+        self.assertEqual(CandidateTally.objects.get(candidate=self.b).counted_votes, 2)
+
+
+class LiveResultsStreamTests(TwoCandidateTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hub = LiveResultsHub(max_buffer=4)
+
+    def vote(self, index, candidate):
+        VotingService.cast_vote(make_voter(index), self.election.id, candidate.id)
+        results_cache.bump(self.election.id)  # what the on_commit hook does
+
+    @staticmethod
+    def drain(subscriber):
+        events = []
+        while not subscriber.queue.empty():
+            events.append(subscriber.queue.get_nowait().decode())
+        return events
+
+    async def test_one_read_serves_thousands_of_subscribers(self):
+        broadcaster = self.hub.broadcaster(self.election.id)
+        broadcaster.task = True  # drive refresh() by hand instead of the polling task
+        subscribers = [broadcaster.subscribe() for _ in range(5000)]
+
+        with mock.patch.object(
+            ElectionResultService, "get_results", wraps=ElectionResultService.get_results
+        ) as get_results:
+            await broadcaster.refresh()
+            await broadcaster.refresh()  # tally version unchanged: no read at all
+            await sync_to_async(self.vote)(1, self.b)
+            await broadcaster.refresh()
+        self.assertEqual(get_results.call_count, 2)
+
+        for subscriber in subscribers:
+            snapshot, delta = self.drain(subscriber)
+            self.assertIn("event: snapshot", snapshot)
+            self.assertIn("event: delta", delta)
+        self.assertIn('"total_votes":1', delta)
+        self.assertIn(f'"id":{self.b.id},"name":"B","party":"Q","votes":1', delta)
+
+    async def test_slow_subscriber_skips_to_latest_snapshot(self):
+        broadcaster = self.hub.broadcaster(self.election.id)
+        broadcaster.task = True
+        slow = broadcaster.subscribe()
+        await broadcaster.refresh()
+        for index in range(6):
+            await sync_to_async(self.vote)(index, self.a)
+            await broadcaster.refresh()
+
+        events = self.drain(slow)
+        self.assertLessEqual(len(events), 4)
+        self.assertGreaterEqual(slow.resets, 1)
+        # Missed deltas are replaced by a snapshot, later deltas follow it
+        self.assertTrue(any("event: snapshot" in event for event in events))
+        self.assertIn('"total_votes":6', events[-1])
+        self.assertEqual(events[-1].split("\n")[0], f"id: {broadcaster.version}")
+
+    async def test_last_event_id_resumes_from_history(self):
+        broadcaster = self.hub.broadcaster(self.election.id)
+        broadcaster.task = True
+        await broadcaster.refresh()
+        seen = str(broadcaster.version)
+        for index, candidate in enumerate((self.a, self.b)):
+            await sync_to_async(self.vote)(index, candidate)
+            await broadcaster.refresh()
+
+        resumed = self.drain(broadcaster.subscribe(last_event_id=seen))
+        self.assertEqual([event.split("\n")[1] for event in resumed], ["event: delta", "event: delta"])
+        self.assertEqual(self.drain(broadcaster.subscribe(last_event_id=str(broadcaster.version))), [])
+        self.assertIn("event: snapshot", self.drain(broadcaster.subscribe(last_event_id="stale"))[0])
+
+    def close(self):
+        Election.objects.filter(id=self.election.id).update(end_date=now() - timedelta(seconds=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            ElectionLifecycleScheduler(hooks={}).run_due_transitions()
+
+    async def test_closing_publishes_the_winner(self):
+        broadcaster = self.hub.broadcaster(self.election.id)
+        broadcaster.task = True
+        subscriber = broadcaster.subscribe()
+        await sync_to_async(self.vote)(1, self.b)
+        await broadcaster.refresh()
+        self.assertIn('"winner":null', self.drain(subscriber)[0])
+
+        # No vote changes the tally: the close itself must move the version
+        await sync_to_async(self.close)()
+        await broadcaster.refresh()
+        (delta,) = self.drain(subscriber)
+        self.assertIn("event: delta", delta)
+        self.assertIn(f'"winner":{{"id":{self.b.id},"name":"B"', delta)
+
+    async def test_stream_endpoint(self):
+        voter = await sync_to_async(make_voter)(1)
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(voter).access_token))()
+        client = AsyncClient()
+        stream_url = f"/api/elections/{self.election.id}/results/stream/"
+        self.assertEqual((await client.get(stream_url)).status_code, 401)
+        # Access tokens never go in the URL
+        self.assertEqual((await client.get(f"{stream_url}?token={token}")).status_code, 401)
+
+        response = await client.post(f"{stream_url}ticket/", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 201)
+        ticket = response.json()["ticket"]
+        other = await Election.objects.acreate(name="Other", start_date=now(), end_date=now() + timedelta(hours=1))
+        self.assertEqual((await client.get(f"/api/elections/{other.id}/results/stream/?ticket={ticket}")).status_code, 401)
+        with override_settings(RESULTS_STREAM_TICKET_SECONDS=-1):
+            self.assertEqual((await client.get(f"{stream_url}?ticket={ticket}")).status_code, 401)
+
+        response = await client.get(f"{stream_url}?ticket={ticket}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        self.assertIn(b"event: snapshot", await anext(stream))
+        await stream.aclose()
+
+
+class VoteLedgerExportTests(TestCase):
+    def setUp(self):
+        self.election = make_election()
+        self.a = make_candidate(self.election)
+        for index in range(5):
+            VotingService.cast_vote(make_voter(index), self.election.id, self.a.id)
+        self.votes = list(Vote.objects.order_by("id"))
+        staff = make_staff(99)
+        self.api = APIClient()
+        self.api.force_authenticate(staff)
+
+    def export(self, ext, **params):
+        response = self.api.get(f"/api/elections/{self.election.id}/votes.{ext}", params)
+        return response, b"".join(response.streaming_content)
+
+    def test_csv_export_reads_votes_in_one_query_per_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            response, body = self.export("csv")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = body.decode().splitlines()
+        self.assertEqual(lines[0], "id,timestamp,election_id,candidate_id,candidate_name,voter_id,voter_username")
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[1].endswith(f",{self.a.id},A,{self.votes[0].voter_id},voter0"))
+        vote_queries = [query for query in queries.captured_queries if 'FROM "vote"' in query["sql"]]
+        self.assertEqual(len(vote_queries), 1)
+
+    def test_ndjson_gzip_with_id_range(self):
+        response, body = self.export(
+            "ndjson.gz", after_id=self.votes[0].id, before_id=self.votes[4].id
+        )
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        records = [json.loads(line) for line in gzip.decompress(body).splitlines()]
+        self.assertEqual([record["id"] for record in records], [vote.id for vote in self.votes[1:4]])
+        self.assertEqual(records[0]["candidate_name"], "A")
+
+    def test_rejects_bad_filters_and_non_staff(self):
+        url = f"/api/elections/{self.election.id}/votes"
+        self.assertEqual(self.api.get(f"{url}.csv", {"since": "yesterday"}).status_code, 400)
+        self.assertEqual(self.api.get(f"{url}.xml").status_code, 404)
+        voter = APIClient()
+        voter.force_authenticate(self.votes[0].voter)
+        self.assertEqual(voter.get(f"{url}.csv").status_code, 403)
+
+    def test_command_pages_by_chunk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "votes.csv")
+            with CaptureQueriesContext(connection) as queries:
+                call_command("export_votes", self.election.id, "--output", path, "--chunk-size", "2",
+                             "--since", (now() - timedelta(hours=1)).isoformat())
+            with open(path) as export:
+                self.assertEqual(len(export.read().splitlines()), 6)
+        vote_queries = [query for query in queries.captured_queries if 'FROM "vote"' in query["sql"]]
+        self.assertEqual(len(vote_queries), 3)
+
+
+class TurnoutRollupTests(TwoCandidateTestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = (now() - timedelta(minutes=30)).replace(second=0, microsecond=0)
+
+    def vote(self, index, candidate, minute):
+        VotingService.cast_vote(make_voter(index), self.election.id, candidate.id)
+        Vote.objects.filter(voter__username=f"voter{index}").update(timestamp=self.start + timedelta(minutes=minute, seconds=5))
+
+    def test_backfill_then_tail(self):
+        self.vote(0, self.a, 0)
+        self.vote(1, self.b, 0)
+        self.vote(2, self.a, 2)
+        rollup = TurnoutRollup(lag=0)
+        self.assertEqual(rollup.backfill(self.election.id), 3)
+
+        self.vote(3, self.a, 2)
+        self.vote(4, self.b, 5)
+        self.assertEqual(rollup.tail(), 2)
+        self.assertEqual(rollup.tail(), 0)
+        self.assertEqual(TurnoutBucket.objects.get(candidate=self.a, minute=self.start + timedelta(minutes=2)).votes, 2)
+
+        api = APIClient()
+        api.force_authenticate(make_voter(99))
+        with CaptureQueriesContext(connection) as queries:
+            timeline = api.get(f"/api/elections/{self.election.id}/turnout/").data
+        self.assertLessEqual(len(queries), 3)
+        self.assertEqual(len(timeline["minutes"]), 3)
+        self.assertEqual(timeline["minutes"][0], self.start.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:00Z"))
+        self.assertEqual(timeline["turnout"], [2, 4, 5])
+        self.assertEqual(
+            {candidate["name"]: candidate["votes"] for candidate in timeline["candidates"]},
+            {"A": [1, 3, 3], "B": [1, 1, 2]},
+        )
+
+    def test_tail_waits_for_votes_to_settle(self):
+        rollup = TurnoutRollup(lag=60)
+        rollup.tail()  # checkpoint at the end of the empty ledger
+        VotingService.cast_vote(make_voter(0), self.election.id, self.a.id)
+        self.assertEqual(rollup.tail(), 0)
+        Vote.objects.update(timestamp=now() - timedelta(minutes=2))
+        self.assertEqual(rollup.tail(), 1)
+
+    def test_backfill_command_covers_every_election(self):
+        self.vote(0, self.a, 0)
+        other = make_election("Other")
+        candidate = make_candidate(other, "C", "R")
+        VotingService.cast_vote(make_voter(1), other.id, candidate.id)
+        call_command("backfill_turnout", stdout=StringIO())
+        self.assertEqual(TurnoutBucket.objects.count(), 2)
+
+
+class RankedChoiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        results_cache.clear()
+        self.election = make_election()
+        self.election.voting_method = Election.RANKED
+        self.election.save()
+        self.a, self.b, self.c = [
+            make_candidate(self.election, name) for name in "ABC"
+        ]
+
+    def test_instant_runoff_rounds(self):
+        ballots = np.array(
+            [[0, 1, 2], [0, 2, -1], [1, 0, -1], [1, 2, -1], [2, 1, -1], [2, -1, -1], [2, 0, 1], [1, -1, -1]],
+            dtype=np.int8,
+        )
+        rounds = instant_runoff(ballots, 3)
+        self.assertEqual([count["tallies"].tolist() for count in rounds], [[2, 3, 3], [0, 4, 4], [0, 6, 0]])
+        # B and C tie on tallies and first preferences: the higher index goes
+        self.assertEqual([count["eliminated"] for count in rounds], [0, 2, None])
+        self.assertEqual(rounds[-1]["exhausted"], 2)
+        self.assertEqual(rounds[-1]["winner"], 1)
+
+    def test_ballot_api_and_results(self):
+        api = APIClient()
+        for index, ranking in enumerate(
+            [[self.a.id, self.b.id], [self.b.id], [self.b.id, self.c.id], [self.c.id, self.b.id], [self.c.id]]
+        ):
+            api.force_authenticate(make_voter(index))
+            response = api.post(f"/api/elections/{self.election.id}/ballot/", {"ranking": ranking}, format="json")
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            api.post(f"/api/elections/{self.election.id}/ballot/", {"ranking": [self.a.id]}, format="json").status_code,
+            400,
+        )
+        self.assertEqual(
+            api.post(f"/api/elections/{self.election.id}/vote/", {"candidate_id": self.a.id}).status_code, 400
+        )
+        api.force_authenticate(make_voter(10))
+        for ranking, code in (([self.a.id, self.a.id], 400), ([], 400), ([999], 404)):
+            response = api.post(f"/api/elections/{self.election.id}/ballot/", {"ranking": ranking}, format="json")
+            self.assertEqual(response.status_code, code)
+
+        results = api.get(f"/api/elections/{self.election.id}/results/").data
+        self.assertEqual(results["total_votes"], 5)
+        self.assertEqual(len(results["rounds"]), 2)
+        self.assertEqual(results["rounds"][0]["eliminated"], self.a.id)
+        self.assertEqual((results["candidates"][0]["id"], results["candidates"][0]["votes"]), (self.b.id, 3))
+        self.assertIsNone(results["winner"])
+
+        Election.objects.filter(id=self.election.id).update(end_date=now() - timedelta(minutes=1))
+        self.election.refresh_from_db()
+        snapshot = ElectionResultService.finalize_election(self.election)
+        self.assertEqual(snapshot.winner, self.election.get_winner())
+        self.assertEqual(snapshot.results["rounds"], results["rounds"])
+        self.assertEqual(snapshot.winner, self.b)
+        self.assertEqual(RankedBallot.objects.filter(election=self.election).count(), 5)
+
+    def test_ballots_count_in_admin_and_statistics(self):
+        for index, ranking in enumerate([[self.a.id, self.b.id], [self.c.id]]):
+            VotingService.cast_ranked_ballot(make_voter(index), self.election.id, ranking)
+        self.assertEqual(site_statistics.totals()["votes"], 2)
+        self.assertEqual(site_statistics.reconcile()["votes"], 0)
+
+        Election.objects.filter(id=self.election.id).update(end_date=now() - timedelta(minutes=1))
+        election_admin = ElectionAdmin(Election, admin.site)
+        row = election_admin.get_queryset(RequestFactory().get("/admin/voting/election/")).get(id=self.election.id)
+        self.assertEqual(election_admin.total_votes(row), 2)
+        # First preferences are not the runoff winner: wait for the snapshot
+        self.assertEqual(election_admin.display_winner(row), "Results Pending")
+        self.assertEqual(election_admin.results_chart(row), "Results Pending")
+        self.assertFalse(ElectionResultSnapshot.objects.exists())  # Viewing does not finalize
+        ElectionResultService.finalize_election(row)
+        row = election_admin.get_queryset(RequestFactory().get("/admin/voting/election/")).get(id=self.election.id)
+        self.assertEqual(election_admin.display_winner(row), f"{self.a.name} (P)")
+        self.assertIn("<img", election_admin.results_chart(row))
+
+
+class BallotFileTests(TwoCandidateTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        super().setUp()
+        for index, candidate in enumerate([self.a, self.b, self.b]):
+            VotingService.cast_vote(make_voter(index), self.election.id, candidate.id)
+        staff = make_staff(99)
+        self.api = APIClient()
+        self.api.force_authenticate(staff)
+
+    def test_export_round_trips_through_memmap(self):
+        path = os.path.join(self.directory.name, "ballots.votes")
+        header = export_ballot_file(self.election, path, chunk_size=2)
+        ballots = BallotFile(path)
+        self.assertEqual(header["count"], 3)
+        self.assertIsInstance(ballots.columns["candidate"], np.memmap)
+        self.assertEqual(ballots.totals(), {self.a.id: 1, self.b.id: 2})
+        self.assertEqual(ballots.votes_per_hour(), [3])
+        self.assertTrue(ballots.verify_data())
+
+    def test_recount_api_checks_live_tally(self):
+        url = f"/api/elections/{self.election.id}/recount/"
+        with override_settings(BALLOT_SNAPSHOT_DIR=self.directory.name):
+            self.assertEqual(self.api.get(url).status_code, 404)
+            call_command("export_ballots", self.election.id, stdout=StringIO())
+            recount = self.api.get(url, {"verify": 1}).data
+            self.assertTrue(recount["matches_live_tally"])
+            self.assertTrue(recount["data_intact"])
+            self.assertEqual([candidate["votes"] for candidate in recount["candidates"]], [2, 1])
+
+            vote_counter.increment(self.a.id)  # counter drift
+            recount = self.api.get(url).data
+            self.assertFalse(recount["matches_live_tally"])
+            self.assertEqual(recount["candidates"][1]["live_votes"], 2)
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        latency_histograms.clear()
+        self.voter = make_voter(1)
+
+    def test_disabled_by_default(self):
+        api = APIClient()
+        api.force_authenticate(self.voter)
+        self.assertNotIn("Server-Timing", api.get("/api/elections/"))
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    @override_settings(REQUEST_INSTRUMENTATION=True, REQUEST_LOG_SAMPLE_RATE=1, METRICS_TOKEN="scrape")
+    def test_server_timing_log_and_metrics(self):
+        api = APIClient()
+        api.force_authenticate(self.voter)
+        with self.assertLogs("voting.requests") as logs:
+            response = api.get("/api/elections/")
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries, \d+ repeated", app;dur=[\d.]+$')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record["url_name"], record["status"]), ("ongoing-elections", 200))
+
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        metrics = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape").content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{url_name="ongoing-elections",le="+Inf"} 1', metrics)
+        self.assertIn('db_queries_total{url_name="ongoing-elections"}', metrics)
+
+    def test_recorder_fingerprints_repeated_queries(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for index in range(3):
+                list(User.objects.filter(id=index))
+            list(User.objects.filter(id__in=[1, 2, 3]))
+            list(User.objects.filter(id__in=[4, 5]))
+        self.assertEqual(recorder.count, 5)
+        self.assertEqual([count for _, count in recorder.duplicates()], [3, 2])
+
+
+class LoadBenchmarkTests(TestCase):
+    def test_seed_scale_keeps_counters_consistent(self):
+        call_command("seed_scale", voters=50, elections=4, candidates=3, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 50)
+        self.assertEqual(
+            sorted(Election.objects.values_list("status", flat=True)),
+            sorted([Election.ONGOING, Election.CLOSED, Election.ONGOING, Election.UPCOMING]),
+        )
+        self.assertEqual(Vote.objects.count(), 90)
+        for election in Election.objects.all():
+            counted = dict(Vote.objects.filter(election=election).values_list("candidate").annotate(total=Count("id")))
+            live = vote_counter.totals_for_election(election.id)
+            self.assertEqual({key: value for key, value in live.items() if value}, counted)
+        self.assertEqual(site_statistics.totals(), {"users": 50, "elections": 4, "candidates": 12, "votes": 90})
+
+    def test_runs_with_overlapping_prefixes_do_not_mix(self):
+        call_command("seed_scale", voters=10, elections=1, candidates=2, stdout=StringIO())
+        output = StringIO()
+        call_command("seed_scale", voters=5, elections=1, candidates=2, prefix="seed-2", stdout=output)
+        self.assertIn("5 voters", output.getvalue())
+        self.assertEqual(seeded_voters("seed").count(), 10)
+        self.assertEqual(seeded_voters("seed-2").count(), 5)
+        self.assertEqual(list(seeded_elections("seed").values_list("name", flat=True)), ["seed election 1"])
+
+    def test_bench_scale_reports_percentiles(self):
+        call_command("seed_scale", voters=20, elections=1, candidates=2, turnout=0.5, stdout=StringIO())
+        output = StringIO()
+        call_command(
+            "bench_scale", requests=4, concurrency=1, scenario=["dashboard_polling", "vote_surge", "results_refresh"],
+            stdout=output, stderr=StringIO(),
+        )
+        report = json.loads(output.getvalue())
+        for name in ("dashboard_polling", "vote_surge", "results_refresh"):
+            self.assertEqual(report["scenarios"][name]["errors"], 0, name)
+            self.assertEqual(set(report["scenarios"][name]["latency_ms"]), {"p50", "p95", "p99", "max"})
+        self.assertEqual(Vote.objects.count(), 14)
+
+
+class QueryBudgetTests(TestCase):
+    """Fixed query and response-size budgets per endpoint, at growing data scales.
+
+    Each scale adds elections, candidates and voters to the previous one,
+    so any per-row query shows up as a count that moves between scales.
+    """
+
+    # (elections, candidates per election, voters)
+    SCALES = {"small": (3, 2, 4), "medium": (9, 4, 12), "large": (27, 8, 40)}
+
+    # Endpoint: (queries, {scale: max response bytes})
+    BUDGETS = {
+        "elections": (2, {"small": 1000, "medium": 2500, "large": 7000}),
+        "candidates": (3, {"small": 400, "medium": 600, "large": 1000}),
+        "results (ongoing)": (2, {"small": 500, "medium": 800, "large": 1400}),
+        "results (completed)": (1, {"small": 600, "medium": 900, "large": 1500}),
+        "turnout": (3, {"small": 300, "medium": 400, "large": 600}),
+        "profile": (0, {"small": 300, "medium": 300, "large": 300}),
+        # Includes the post-insert check that the election is not finalized
+        "submit vote": (9, {"small": 100, "medium": 100, "large": 100}),
+        "admin elections": (7, {"small": 40000, "medium": 45000, "large": 60000}),
+        "admin candidates": (8, {"small": 40000, "medium": 60000, "large": 120000}),
+        "admin votes": (8, {"small": 40000, "medium": 60000, "large": 120000}),
+    }
+
+    def setUp(self):
+        cache.clear()
+        results_cache.clear()
+        self.staff = make_staff(0, superuser=True)
+        self.admin = self.client
+        self.admin.force_login(self.staff)
+        self.voters = 1
+
+    def grow(self, scale):
+        """Add elections, candidates and voters up to `scale`; every voter votes in every ongoing election."""
+        elections, candidates, voters = self.SCALES[scale]
+        existing = Election.objects.count()
+        for index in range(existing, elections):
+            election = make_election(f"E{index}", starts=[-2, 1, -3][index % 3], ends=[2, 3, -1][index % 3])
+            Candidate.objects.bulk_create([
+                Candidate(election=election, name=f"C{number}", party="P", description="") for number in range(candidates)
+            ])
+        while self.voters <= voters:
+            make_voter(self.voters)
+            self.voters += 1
+
+        for election in Election.objects.filter(status=Election.ONGOING):
+            candidate_ids = list(election.candidate_set.values_list("id", flat=True))
+            voted = set(Vote.objects.filter(election=election).values_list("voter_id", flat=True))
+            for voter in User.objects.filter(is_staff=False).exclude(id__in=voted):
+                VotingService.cast_vote(voter, election.id, candidate_ids[voter.id % len(candidate_ids)])
+        call_command("backfill_turnout", stdout=StringIO())
+
+    def measure(self):
+        voter = User.objects.get(username="voter1")
+        api = APIClient()
+        api.force_authenticate(voter)
+        # The newest elections have the most candidates at this scale
+        ongoing = Election.objects.filter(status=Election.ONGOING).order_by("id").last()
+        completed = Election.objects.filter(status=Election.CLOSED).order_by("id").last()
+        ElectionResultService.get_results(completed.id)  # finalized once, like in production
+
+        new_voter = make_voter(1000 + self.voters)
+        self.voters += 1
+        ballot = APIClient()
+        ballot.force_authenticate(new_voter)
+        candidate = ongoing.candidate_set.first()
+        # Warm every counter shard, so the vote takes the steady-state update path
+        VoteCounterShard.objects.bulk_create(
+            [VoteCounterShard(candidate=candidate, shard=shard, count=0) for shard in range(vote_counter.num_shards)],
+            ignore_conflicts=True,
+        )
+        StatisticShard.objects.bulk_create(
+            [StatisticShard(name="votes", shard=shard, value=0) for shard in range(site_statistics.num_shards)],
+            ignore_conflicts=True,
+        )
+
+        requests = {
+            "elections": lambda: api.get("/api/elections/"),
+            "candidates": lambda: api.get(f"/api/elections/{ongoing.id}/candidates/"),
+            "results (ongoing)": lambda: api.get(f"/api/elections/{ongoing.id}/results/"),
+            "results (completed)": lambda: api.get(f"/api/elections/{completed.id}/results/"),
+            "turnout": lambda: api.get(f"/api/elections/{ongoing.id}/turnout/"),
+            "profile": lambda: api.get("/api/profile/"),
+            "submit vote": lambda: ballot.post(f"/api/elections/{ongoing.id}/vote/", {"candidate_id": candidate.id}),
+            "admin elections": lambda: self.admin.get("/admin/voting/election/"),
+            "admin candidates": lambda: self.admin.get("/admin/voting/candidate/"),
+            "admin votes": lambda: self.admin.get("/admin/voting/vote/"),
+        }
+        measurements = {}
+        for name, request in requests.items():
+            results_cache.clear()
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = request()
+            self.assertLess(response.status_code, 300, name)
+            measurements[name] = (len(queries), len(response.content))
+        return measurements
+
+    def test_endpoints_stay_within_budget(self):
+        table, failed = [], False
+        for scale in self.SCALES:
+            self.grow(scale)
+            for name, (queries, size) in self.measure().items():
+                query_budget, size_budgets = self.BUDGETS[name]
+                over = queries != query_budget or size > size_budgets[scale]
+                failed = failed or over
+                table.append((name, scale, queries, query_budget, size, size_budgets[scale], "OVER" if over else ""))
+
+        if failed:
+            lines = [f"{'endpoint':<22}{'scale':<8}{'queries':>8}{'budget':>8}{'bytes':>9}{'budget':>9}"]
+            lines += [f"{name:<22}{scale:<8}{q:>8}{qb:>8}{b:>9}{bb:>9}  {flag}" for name, scale, q, qb, b, bb, flag in table]
+            self.fail("Endpoint over its query or size budget:\n" + "\n".join(lines))
+
+
+class FastSerializationTests(TestCase):
+    def setUp(self):
+        self.voter = make_voter(1)
+        self.elections = [make_election("Ongoing"), make_election("Upcoming", 2, 4), make_election("Löwe\u2028", -4, -2)]
+        Candidate.objects.create(election=self.elections[0], name="Zoë", party="P", description="",
+                                 profile_picture="uploads/profile_pics/a.jpg")
+        Candidate.objects.create(election=self.elections[0], name="B\u2029", party="", description="", votes=4)
+        vote_counter.increment(Candidate.objects.get(name="Zoë").id, 3)
+        Vote.objects.create(voter=self.voter, election=self.elections[2], candidate=Candidate.objects.create(
+            election=self.elections[2], name="C", party="Q", description=""
+        ))
+
+    def test_candidates_match_model_serializer_bytes(self):
+        candidates = Candidate.objects.filter(election=self.elections[0]).with_vote_totals().order_by("id")
+        expected = JSONRenderer().render(CandidateSerializer(candidates, many=True).data)
+        self.assertEqual(FastJSONRenderer().render(serialize_candidates(candidates)), expected)
+        self.assertIn(b'"votes":3', expected)
+        self.assertIn(b"\\u2029", expected)
+
+    def test_elections_match_model_serializer_bytes(self):
+        voted = VotingService.get_voted_election_ids(self.voter)
+        by_status = serialize_elections_by_status(VotingService.get_active_elections(), voted)
+        context = {"voted_election_ids": voted}
+        for status in (Election.ONGOING, Election.UPCOMING, Election.CLOSED):
+            elections = VotingService.get_active_elections().filter(status=status)
+            expected = JSONRenderer().render(ElectionSerializer(elections, many=True, context=context).data)
+            self.assertEqual(FastJSONRenderer().render(by_status[status]), expected)
+        self.assertTrue(by_status[Election.CLOSED][0]["has_voted"])
+
+    def test_renderer_matches_stdlib_output(self):
+        results = ElectionResultService.get_results(self.elections[2].id)
+        profile = {"date_of_birth": date(1990, 1, 1), "at": now(), "ratio": 33.33, "ids": {1: [True, None]}}
+        for data in (results, profile, {"big": 2 ** 70}, [0.1, 1e-7, 1e20, -0.0]):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        with self.assertRaises(ValueError):
+            FastJSONRenderer().render({"ratio": float("nan")})
+        indented = FastJSONRenderer().render({"a": 1}, "application/json; indent=2")
+        self.assertEqual(indented, JSONRenderer().render({"a": 1}, "application/json; indent=2"))
+
+    def test_api_responses_use_fast_path(self):
+        api = APIClient()
+        api.force_authenticate(self.voter)
+        with mock.patch.object(JSONRenderer, "render") as stdlib_render:
+            response = api.get("/api/elections/")
+        self.assertEqual(response.status_code, 200)
+        stdlib_render.assert_not_called()
+        self.assertEqual(response.json()["completed_elections"][0]["name"], "Löwe\u2028")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        results_cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):  # Committed before the test starts
+            self.voter = make_voter(1)
+            self.election = make_election()
+            self.candidate = make_candidate(self.election)
+        self.api = APIClient()
+        self.api.force_authenticate(self.voter)
+        self.urls = [
+            "/api/elections/",
+            f"/api/elections/{self.election.id}/candidates/",
+            f"/api/elections/{self.election.id}/results/",
+        ]
+
+    def revalidate(self, url, response):
+        return self.api.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_unchanged_resources_answer_304_without_a_body(self):
+        for url in self.urls:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            with CaptureQueriesContext(connection) as queries:
+                revalidated = self.revalidate(url, response)
+            self.assertEqual(revalidated.status_code, 304, url)
+            self.assertEqual(revalidated.content, b"")
+            self.assertLessEqual(len(queries), 1, url)  # Results read the election row, nothing more
+
+    def test_vote_changes_every_etag(self):
+        before = {url: self.api.get(url) for url in self.urls}
+        with self.captureOnCommitCallbacks(execute=True):
+            VotingService.cast_vote(self.voter, self.election.id, self.candidate.id)
+        for url, response in before.items():
+            revalidated = self.revalidate(url, response)
+            self.assertEqual(revalidated.status_code, 200, url)
+            self.assertNotEqual(revalidated["ETag"], response["ETag"])
+        self.assertTrue(self.api.get("/api/elections/").json()["ongoing_elections"][0]["has_voted"])
+
+    def test_elections_etag_is_per_user(self):
+        response = self.api.get("/api/elections/")
+        other = APIClient()
+        other.force_authenticate(make_voter(2))
+        self.assertEqual(other.get("/api/elections/", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+        # Another voter's ballot leaves this voter's listing valid
+        with self.captureOnCommitCallbacks(execute=True):
+            VotingService.cast_vote(User.objects.get(username="voter2"), self.election.id, self.candidate.id)
+        self.assertEqual(self.revalidate("/api/elections/", response).status_code, 304)
+
+    def test_edits_and_lifecycle_changes_invalidate(self):
+        listing = self.api.get("/api/elections/")
+        candidates = self.api.get(self.urls[1])
+        self.candidate.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.candidate.save()
+        self.assertEqual(self.revalidate(self.urls[1], candidates).status_code, 200)
+        self.assertEqual(self.revalidate("/api/elections/", listing).status_code, 304)
+
+        Election.objects.filter(id=self.election.id).update(end_date=now() - timedelta(minutes=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            ElectionLifecycleScheduler(hooks={}).run_due_transitions()
+        self.assertEqual(self.revalidate("/api/elections/", listing).status_code, 200)
+
+    def test_results_etag_changes_when_polling_closes(self):
+        response = self.api.get(self.urls[2])
+        with mock.patch("voting.models.now", return_value=now() + timedelta(hours=2)):
+            revalidated = self.revalidate(self.urls[2], response)
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertEqual(revalidated.json()["winner"]["id"], self.candidate.id)
+
+    def test_bumps_from_another_process_invalidate(self):
+        listing = self.api.get("/api/elections/")
+        candidates = self.api.get(self.urls[1])
+        # The queue worker and scheduler run elsewhere, with their own cache
+        # client on the shared backend
+        other_process = caches.create_connection(settings.RESULTS_CACHE_ALIAS)
+        with mock.patch.object(ChangeCounters, "backend", new_callable=mock.PropertyMock, return_value=other_process), \
+                mock.patch.object(ResultsCache, "backend", new_callable=mock.PropertyMock, return_value=other_process):
+            ChangeCounters().bump(f"ballots:{self.voter.id}")
+            ResultsCache().bump(self.election.id)
+        self.assertEqual(self.revalidate("/api/elections/", listing).status_code, 200)
+        self.assertEqual(self.revalidate(self.urls[1], candidates).status_code, 200)
+
+    def test_deleting_an_election_bumps_once(self):
+        for index in range(2, 42):
+            VotingService.cast_vote(make_voter(index), self.election.id, self.candidate.id)
+        listing = self.api.get("/api/elections/")
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.election.delete()
+        self.assertLess(len(queries), 30)  # Ballots are fast-deleted, not loaded row by row
+        self.assertEqual(len(callbacks), 3)  # Results, listing counter, ballot recount
+        self.assertEqual(self.revalidate("/api/elections/", listing).status_code, 200)
+
+    def test_queued_votes_bump_the_voter_counter(self):
+        before = change_counters.get_many(f"ballots:{self.voter.id}")
+        with self.settings(VOTE_QUEUE_PATH=os.path.join(tempfile.mkdtemp(), "queue.sqlite3")):
+            queue = get_vote_queue()
+            queue.enqueue(self.voter.id, self.election.id, self.candidate.id)
+            with self.captureOnCommitCallbacks(execute=True):
+                queue.drain()
+        self.assertNotEqual(change_counters.get_many(f"ballots:{self.voter.id}"), before)
+
+
+class ReadRoutingPolicyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+        self.voter = make_voter(1)
+        self.election = make_election()
+        self.candidate = make_candidate(self.election)
+
+    def route(self, view, user):
+        """Alias the router picks for reads inside `view`, as resolved by the middleware."""
+        request = RequestFactory().get("/api/elections/")
+        request.user = user
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            return self.router.db_for_read(Election)
+
+        middleware = ReadConsistencyMiddleware(get_response)
+        return middleware(request)
+
+    def test_views_follow_their_policy(self):
+        from .views import ElectionResultsAPIView, ElectionsAPIView, SubmitVoteAPIView
+        with mock.patch("voting.routing.replica_alias", return_value="replica"):
+            self.assertEqual(self.route(ElectionsAPIView.as_view(), self.voter), "replica")
+            self.assertEqual(self.route(ElectionResultsAPIView.as_view(), self.voter), "replica")
+            self.assertIsNone(self.route(SubmitVoteAPIView.as_view(), self.voter))
+        # Without a replica configured, replica views read the primary
+        with override_settings(REPLICA_DATABASE="missing"):
+            self.assertEqual(self.route(ElectionsAPIView.as_view(), self.voter), "default")
+        self.assertIsNone(self.router.db_for_read(Election))  # Policy ends with the request
+        self.assertEqual(self.router.db_for_write(Vote), "default")
+
+    async def test_async_requests_follow_their_policy(self):
+        from .views import ElectionsAPIView
+        request = RequestFactory().get("/api/elections/")
+        request.user = AnonymousUser()
+
+        async def get_response(request):
+            # Django's async handler runs a sync process_view in a thread
+            await sync_to_async(middleware.process_view)(request, ElectionsAPIView.as_view(), (), {})
+            return self.router.db_for_read(Election)
+
+        middleware = ReadConsistencyMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        with mock.patch("voting.routing.replica_alias", return_value="replica"):
+            self.assertEqual(await middleware(request), "replica")
+        self.assertIsNone(self.router.db_for_read(Election))
+
+    def test_voting_pins_the_voter_to_the_primary(self):
+        from .views import ElectionsAPIView
+        # Every read of the vote path must reach the primary: the "replica"
+        # alias has no connection here, so a stray read would fail
+        with reads_from("replica"), self.captureOnCommitCallbacks(execute=True):
+            VotingService.cast_vote(self.voter, self.election.id, self.candidate.id)
+        self.assertTrue(is_pinned_to_primary(self.voter.id))
+        self.assertFalse(is_pinned_to_primary(make_voter(2).id))
+
+        with mock.patch("voting.routing.replica_alias", return_value="replica"):
+            self.assertIsNone(self.route(ElectionsAPIView.as_view(), self.voter))
+            self.assertEqual(self.route(ElectionsAPIView.as_view(), User.objects.get(username="voter2")), "replica")
+        # A pin set by the queue worker's cache client is seen here
+        other_process = caches.create_connection(settings.ROUTING_CACHE_ALIAS)
+        with mock.patch("voting.routing._pins", return_value=other_process):
+            pin_to_primary(User.objects.get(username="voter2").id)
+        self.assertTrue(is_pinned_to_primary(User.objects.get(username="voter2").id))
+
+        with override_settings(PRIMARY_STICKY_SECONDS=0):
+            cache.clear()
+            voter = User.objects.get(username="voter2")
+            with self.captureOnCommitCallbacks(execute=True):
+                VotingService.cast_vote(voter, self.election.id, self.candidate.id)
+            self.assertFalse(is_pinned_to_primary(voter.id))
+
+
+HAS_REPLICA = "replica" in settings.DATABASES
+
+
+@skipUnless(HAS_REPLICA, "needs a replica alias, e.g. voting_system.replica_settings")
+class ReadReplicaTests(TestCase):
+    """End to end against two databases that never replicate, so every read shows where it went."""
+
+    # The test runner checks every listed alias, even for skipped classes
+    databases = {"default", "replica"} if HAS_REPLICA else {"default"}
+
+    def setUp(self):
+        cache.clear()
+        results_cache.clear()
+        self.voter = make_voter(1)
+        self.api = APIClient()
+        self.api.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.voter).access_token}")
+        self.election = make_election("Primary name")
+        self.candidate = make_candidate(self.election)
+
+        # The replica lags: same rows, older name
+        User.objects.using("replica").create(id=self.voter.id, username="voter1", email="voter1@example.com",
+                                             first_name="Test", last_name="Voter", date_of_birth=date(1990, 1, 1))
+        stale = Election.objects.get(id=self.election.id)
+        stale.name = "Replica name"
+        stale.save(using="replica")
+        self.candidate.save(using="replica")
+
+    def test_listings_read_the_replica_until_the_user_votes(self):
+        response = self.api.get("/api/elections/")
+        self.assertEqual(response.json()["ongoing_elections"][0]["name"], "Replica name")
+        self.assertFalse(response.has_header("ETag"))  # A lagging body must never be revalidated
+        # Candidates carry live totals, so they always come from the primary
+        candidates = self.api.get(f"/api/elections/{self.election.id}/candidates/")
+        self.assertEqual(candidates.json()["election_name"], "Primary name")
+        self.assertTrue(candidates.has_header("ETag"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(f"/api/elections/{self.election.id}/vote/", {"candidate_id": self.candidate.id})
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Vote.objects.using("replica").exists())
+
+        # Read-your-writes: the voter now sees the primary, vote included
+        response = self.api.get("/api/elections/")
+        self.assertTrue(response.has_header("ETag"))
+        listing = response.json()
+        self.assertEqual(listing["ongoing_elections"][0]["name"], "Primary name")
+        self.assertTrue(listing["ongoing_elections"][0]["has_voted"])
+        self.assertEqual(self.api.get(f"/api/elections/{self.election.id}/results/").json()["total_votes"], 1)
+
+    def test_duplicate_check_uses_the_primary(self):
+        Vote.objects.create(voter=self.voter, election=self.election, candidate=self.candidate)
+        response = self.api.post(f"/api/elections/{self.election.id}/vote/", {"candidate_id": self.candidate.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Vote.objects.count(), 1)
+
+    def test_completed_results_come_from_the_replica(self):
+        closed = make_election("Closed", -3, -1)
+        closed.save(using="replica")
+        ElectionResultSnapshot.objects.using("replica").create(
+            election_id=closed.id, total_votes=7, results={"election": "Closed", "total_votes": 7, "candidates": [], "winner": None},
+        )
+        self.assertEqual(self.api.get(f"/api/elections/{closed.id}/results/").json()["total_votes"], 7)
+        self.assertFalse(ElectionResultSnapshot.objects.filter(election=closed).exists())
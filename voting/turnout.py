@@ -0,0 +1,120 @@
+from datetime import timedelta, timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncMinute
+from django.utils.timezone import now
+
+from .models import Candidate, TallyCheckpoint, TurnoutBucket, Vote
+
+
+class TurnoutRollup:
+    """Maintains `TurnoutBucket` rows by tailing the Vote ledger.
+
+    New votes are read in primary-key ranges and folded into per-minute
+    buckets with one `GROUP BY` per range, off the vote-commit path so the
+    per-minute rows never become a point of lock contention for voters.
+    Only votes older than `lag` seconds are read, giving transactions that
+    were still open when the ids were handed out time to commit; the
+    backfill rebuilds an election exactly, up to the same checkpoint.
+    """
+
+    CHECKPOINT = 'turnout'
+
+    def __init__(self, chunk_size=50000, lag=None):
+        self.chunk_size = chunk_size
+        self.lag = lag if lag is not None else getattr(settings, 'TURNOUT_ROLLUP_LAG', 10)
+
+    def checkpoint(self):
+        """Locked checkpoint row; a new one starts at the current end of the ledger."""
+        checkpoint = TallyCheckpoint.objects.select_for_update().filter(name=self.CHECKPOINT).first()
+        if checkpoint is None:
+            last_vote_id = Vote.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+            TallyCheckpoint.objects.get_or_create(name=self.CHECKPOINT, defaults={'last_vote_id': last_vote_id})
+            checkpoint = TallyCheckpoint.objects.select_for_update().get(name=self.CHECKPOINT)
+        return checkpoint
+
+    def bucket_counts(self, votes):
+        return (
+            votes.annotate(bucket=TruncMinute('timestamp', tzinfo=timezone.utc))
+            .values_list('election_id', 'candidate_id', 'bucket')
+            .annotate(votes=Count('id'))
+            .order_by()
+        )
+
+    def tail(self):
+        """Roll up votes committed since the last run. Returns the number of votes read."""
+        rolled = 0
+        while True:
+            with transaction.atomic():
+                checkpoint = self.checkpoint()
+                start = checkpoint.last_vote_id
+                settled = Vote.objects.filter(id__gt=start, timestamp__lte=now() - timedelta(seconds=self.lag))
+                # Id of the chunk_size-th settled vote, or the last one; ids may have gaps
+                chunk_end = list(settled.order_by('id').values_list('id', flat=True)[self.chunk_size - 1:self.chunk_size])
+                end = chunk_end[0] if chunk_end else settled.aggregate(max_id=Max('id'))['max_id']
+                if end is None:
+                    return rolled
+
+                counts = list(self.bucket_counts(Vote.objects.filter(id__gt=start, id__lte=end)))
+                existing = {
+                    (candidate_id, minute): votes
+                    for candidate_id, minute, votes in TurnoutBucket.objects.filter(
+                        candidate_id__in={row[1] for row in counts}, minute__in={row[2] for row in counts}
+                    ).values_list('candidate_id', 'minute', 'votes')
+                }
+                TurnoutBucket.objects.bulk_create(
+                    [
+                        TurnoutBucket(election_id=election_id, candidate_id=candidate_id, minute=minute,
+                                      votes=existing.get((candidate_id, minute), 0) + votes)
+                        for election_id, candidate_id, minute, votes in counts
+                    ],
+                    update_conflicts=True, unique_fields=['election', 'candidate', 'minute'], update_fields=['votes'],
+                )
+                checkpoint.last_vote_id = end
+                checkpoint.save(update_fields=['last_vote_id', 'updated_at'])
+                rolled += sum(row[3] for row in counts)
+
+    def backfill(self, election_id):
+        """Rebuild an election's buckets from its votes up to the checkpoint. Returns the votes counted."""
+        with transaction.atomic():
+            checkpoint = self.checkpoint()
+            TurnoutBucket.objects.filter(election_id=election_id).delete()
+            counts = self.bucket_counts(Vote.objects.filter(election_id=election_id, id__lte=checkpoint.last_vote_id))
+            buckets = TurnoutBucket.objects.bulk_create([
+                TurnoutBucket(election_id=election_id, candidate_id=candidate_id, minute=minute, votes=votes)
+                for _, candidate_id, minute, votes in counts.iterator()
+            ], batch_size=1000)
+        return sum(bucket.votes for bucket in buckets)
+
+
+turnout_rollup = TurnoutRollup()
+
+
+def turnout_timeline(election):
+    """Cumulative turnout and per-candidate vote curves, one point per minute with votes."""
+    candidates = list(Candidate.objects.filter(election=election).order_by('id').values_list('id', 'name'))
+    rows = list(TurnoutBucket.objects.filter(election=election).values_list('candidate_id', 'minute', 'votes'))
+    if not rows:
+        minutes, curves = [], np.zeros((len(candidates), 0), dtype=np.int64)
+    else:
+        candidate_ids, buckets, votes = zip(*rows)
+        row_of = {candidate_id: row for row, (candidate_id, _) in enumerate(candidates)}
+        # Buckets are UTC; numpy datetimes are naive
+        buckets = np.array([bucket.replace(tzinfo=None) for bucket in buckets], dtype='datetime64[m]')
+        minutes, column = np.unique(buckets, return_inverse=True)
+        per_minute = np.zeros((len(candidates), len(minutes)), dtype=np.int64)
+        np.add.at(per_minute, ([row_of[candidate_id] for candidate_id in candidate_ids], column), votes)
+        curves = per_minute.cumsum(axis=1)
+
+    return {
+        "election": election.name,
+        "minutes": [f"{minute}:00Z" for minute in np.asarray(minutes).astype(str)],
+        "turnout": curves.sum(axis=0).tolist(),
+        "candidates": [
+            {"id": candidate_id, "name": name, "votes": curve.tolist()}
+            for (candidate_id, name), curve in zip(candidates, curves)
+        ],
+    }
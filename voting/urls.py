@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from .views import *
 from django.views.generic import TemplateView
 from rest_framework_simplejwt.views import TokenRefreshView
@@ -14,15 +14,27 @@ urlpatterns = [
     path('email-verified/', TemplateView.as_view(template_name="email_verified.html"), name="email-verified"),
     path('forgot-password/',forgot_password_page,name="forgot_password"),
     path('reset-password/<str:uid>/<str:token>',reset_password_page,name="reset-password"),
+    path('metrics', metrics, name="metrics"),
+    re_path(r'^charts/(?P<digest>[0-9a-f]{64})\.png$', results_chart, name="results-chart"),
     # API Endpoints
     path('api/register/', RegisterAPIView.as_view(), name="api-register"),
     path('api/verify-email/<uuid:token>/', VerifyEmailAPIView.as_view(), name="verify-email"),
     path('api/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/login/async/', async_login, name='async-login'),
     path('api/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/profile/', UserProfileAPIView.as_view(), name='user-profile'),
     path('api/elections/', ElectionsAPIView.as_view(), name='ongoing-elections'),
     path('api/elections/<int:election_id>/vote/', SubmitVoteAPIView.as_view(), name='submit-vote'),
+    path('api/elections/<int:election_id>/ballot/', RankedBallotAPIView.as_view(), name='submit-ballot'),
+    path('api/votes/<str:receipt_id>/', VoteReceiptAPIView.as_view(), name='vote-receipt'),
     path('api/elections/<int:election_id>/results/', ElectionResultsAPIView.as_view(), name='election-results'),
+    path('api/elections/<int:election_id>/recount/', RecountAPIView.as_view(), name='election-recount'),
+    path('api/elections/<int:election_id>/turnout/', TurnoutTimelineAPIView.as_view(), name='turnout-timeline'),
+    path('api/elections/<int:election_id>/votes.<str:ext>', VoteLedgerExportAPIView.as_view(), name='vote-ledger-export'),
+    path('api/elections/<int:election_id>/results/stream/', election_results_stream, name='election-results-stream'),
+    path('api/elections/<int:election_id>/results/stream/ticket/', ResultsStreamTicketAPIView.as_view(), name='results-stream-ticket'),
+    path('api/stats/', SiteStatisticsAPIView.as_view(), name='site-stats'),
+    path('api/stats/results-cache/', ResultsCacheStatsAPIView.as_view(), name='results-cache-stats'),
     path("api/elections/<int:election_id>/candidates/", ElectionCandidatesAPIView.as_view(), name="election-candidates"),
 
     path('api/password-reset/', ForgotPasswordView.as_view(), name='password-reset'),
@@ -1,18 +1,40 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
-from django.core.mail import send_mail
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
+from django.views.decorators.http import etag
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.exceptions import NotFound, ValidationError
 
 from voting.serializers import *
-from voting.services import ElectionResultService, UserService, VotingService
+from rest_framework.exceptions import AuthenticationFailed, NotFound, ValidationError
+from voting.services import ElectionResultService, LoginService, UserService, VotingService
+from voting.passwords import password_pool
+from voting.outbox import queue_email
+from voting.cache import change_counters, results_cache
+from voting.charts import chart_path
+from voting.counters import site_statistics, vote_counter
+from voting.authentication import CachedJWTAuthentication, check_stream_ticket, issue_stream_ticket
+from voting.live import live_results
+from voting.exports import FORMATS, export_ledger, parse_ledger_filters
+from voting.turnout import turnout_timeline
+from voting.ballot_files import open_ballot_file, tally_checksum
+from voting.instrumentation import latency_histograms
+from voting.routing import REPLICA_POLICY, reading_from_replica
 from .models import User, EmailVerificationToken
 from django.contrib.auth.decorators import login_required
 
@@ -93,6 +115,32 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         }, status=status.HTTP_200_OK)
     
 
+@csrf_exempt
+@require_POST
+async def async_login(request):
+    """ASGI login: the password hash runs in a bounded pool, never on the event loop"""
+    try:
+        data = json.loads(request.body or b"{}")
+        if not isinstance(data, dict):
+            return JsonResponse({"detail": "Expected a JSON object."}, status=status.HTTP_400_BAD_REQUEST)
+        user = await LoginService.aget_user(data.get("email"))
+        password_ok = await password_pool.check(data.get("password") or "", user.password)
+        LoginService.check_credentials(user, password_ok)
+        tokens = await sync_to_async(LoginService.issue_tokens)(user)
+    except json.JSONDecodeError:
+        return JsonResponse({"detail": "Invalid JSON body."}, status=status.HTTP_400_BAD_REQUEST)
+    except AuthenticationFailed as e:
+        return JsonResponse({"detail": str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    except password_pool.Saturated:
+        return JsonResponse({"detail": "Too many login attempts, please retry."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    return JsonResponse({
+        "access_token": tokens["access"],
+        "refresh_token": tokens["refresh"],
+        "message": "Login successful!",
+    }, status=status.HTTP_200_OK)
+
+
 # Profile
 class UserProfileAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -125,32 +173,62 @@ class UserProfileAPIView(APIView):
     
 
 
+# ETags are built from change counters, never from the response body, so
+# a matching If-None-Match is answered with a 304 before any real work.
+# Per-election versions are the results-cache versions: they move on every
+# vote and every edit of the election or its candidates.
+
+def elections_etag(request):
+    """Active elections changed, or this user's `has_voted` flags did.
+
+    None (no ETag, no 304) when the listing is read from a replica: the
+    counters move at commit on the primary, so a lagging body would be
+    stored under the new validator and replayed until the next bump.
+    """
+    if reading_from_replica():
+        return None
+    elections, ballots = change_counters.get_many('elections', f'ballots:{request.user.id}')
+    return f"elections-{elections}-user-{request.user.id}-{ballots}"
+
+
+def candidates_etag(request, election_id):
+    return f"candidates-{election_id}-{results_cache.get_version(election_id)}"
+
+
+def results_etag(election):
+    """Results also change when polling closes, which no counter records."""
+    return f"results-{election.id}-{results_cache.get_version(election.id)}-{int(election.is_completed())}"
+
+
 class ElectionsAPIView(APIView):
     """Fetch all ongoing elections with candidates"""
     permission_classes = [IsAuthenticated]
+    read_consistency = REPLICA_POLICY
 
+    @method_decorator(etag(elections_etag))
     def get(self, request):
         try:
-            ongoing_elections = ElectionSerializer(VotingService.get_ongoing_elections(), many=True, context={'request': request}).data
-            upcoming_elections = ElectionSerializer(VotingService.get_upcoming_elections(), many=True, context={'request': request}).data
-            completed_elections = ElectionSerializer(VotingService.get_completed_elections(), many=True, context={'request': request}).data
-            return Response({"ongoing_elections": ongoing_elections,"completed_elections":completed_elections,"upcoming_elections":upcoming_elections}, status=status.HTTP_200_OK)
+            elections = serialize_elections_by_status(
+                VotingService.get_active_elections(), VotingService.get_voted_election_ids(request.user)
+            )
+            return Response({"ongoing_elections": elections[Election.ONGOING],"completed_elections":elections[Election.CLOSED],"upcoming_elections":elections[Election.UPCOMING]}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class ElectionCandidatesAPIView(APIView):
     """Fetch all candidates for a given election."""
+    # Live vote totals: read from the primary, like their ETag's version
     permission_classes = [IsAuthenticated]
 
+    @method_decorator(etag(candidates_etag))
     def get(self, request, election_id):
         try:
             election = get_object_or_404(Election, id=election_id)
             candidates = VotingService.get_candidates_for_election(election_id)
-            serializer = CandidateSerializer(candidates, many=True)
 
             return Response({
                 "election_name": election.name,
-                "candidates": serializer.data
+                "candidates": serialize_candidates(candidates)
             }, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -164,6 +242,10 @@ class SubmitVoteAPIView(APIView):
             user = request.user
             candidate_id = request.data.get("candidate_id")
 
+            if settings.VOTE_INGESTION_QUEUED:
+                receipt_id = VotingService.enqueue_vote(user, election_id, candidate_id)
+                return Response({"message": "Vote accepted!!", "receipt_id": receipt_id}, status=status.HTTP_202_ACCEPTED)
+
             candidate = VotingService.cast_vote(user, election_id, candidate_id)
             return Response({"message": "Vote submitted successfully!!", "candidate": candidate.name}, status=status.HTTP_201_CREATED)
         except NotFound as e:
@@ -174,20 +256,210 @@ class SubmitVoteAPIView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 
+class RankedBallotAPIView(APIView):
+    """Cast a ranked-choice ballot (Only once per election)"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, election_id):
+        try:
+            ranking = request.data.get("ranking")
+            if not isinstance(ranking, list):
+                raise ValidationError("Ranking must be a list of candidate ids.")
+            VotingService.cast_ranked_ballot(request.user, election_id, ranking)
+            return Response({"message": "Ballot submitted successfully!!"}, status=status.HTTP_201_CREATED)
+        except NotFound as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response({"error": str(e.detail[0]) if isinstance(e.detail, list) else str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class VoteReceiptAPIView(APIView):
+    """Report whether a queued vote has been committed"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, receipt_id):
+        try:
+            receipt = VotingService.get_vote_receipt(request.user, receipt_id)
+            return Response(receipt, status=status.HTTP_200_OK)
+        except NotFound as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class ElectionResultsAPIView(APIView):
     """Fetch results for completed elections"""
     permission_classes = [IsAuthenticated]
+    read_consistency = REPLICA_POLICY
 
     def get(self, request, election_id):
         try:
-            results = ElectionResultService.get_results(election_id)
-            return Response(results, status=status.HTTP_200_OK)
+            # Validated against the election row the results are read with
+            election = ElectionResultService.get_election(election_id)
+            tag = quote_etag(results_etag(election))
+            not_modified = get_conditional_response(request, etag=tag)
+            if not_modified is not None:
+                return not_modified
+            results = ElectionResultService.get_election_results(election)
+            return Response(results, status=status.HTTP_200_OK, headers={"ETag": tag})
         except NotFound as e:
             return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
         except ValidationError as e:
             return Response({"error": str(e.detail[0]) if isinstance(e.detail, list) else str(e.detail)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class TurnoutTimelineAPIView(APIView):
+    """Cumulative turnout and per-candidate curves, minute by minute"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, election_id):
+        try:
+            election = get_object_or_404(Election, id=election_id)
+            return Response(turnout_timeline(election), status=status.HTTP_200_OK)
+        except Http404:
+            return Response({"error": "Election not found."}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class RecountAPIView(APIView):
+    """Recount an election from its exported ballot file and check it against the live tally"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, election_id):
+        election = get_object_or_404(Election, id=election_id)
+        try:
+            ballots = open_ballot_file(election.id)
+        except FileNotFoundError:
+            return Response(
+                {"error": f"No ballot file; run `manage.py export_ballots {election.id}` first."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        totals = ballots.totals()
+        live = vote_counter.totals_for_election(election.id)
+        names = dict(Candidate.objects.filter(election=election).values_list('id', 'name'))
+        recount = {
+            "election": election.name,
+            "exported_at": ballots.header["exported_at"],
+            "last_vote_id": ballots.header["last_vote_id"],
+            "total_votes": ballots.header["count"],
+            "candidates": [
+                {"id": candidate_id, "name": names.get(candidate_id), "votes": votes, "live_votes": live.get(candidate_id, 0)}
+                for candidate_id, votes in sorted(totals.items(), key=lambda total: -total[1])
+            ],
+            "votes_per_hour": ballots.votes_per_hour(),
+            "tally_checksum": tally_checksum(totals),
+            "live_tally_checksum": tally_checksum(live),
+        }
+        recount["matches_live_tally"] = recount["tally_checksum"] == recount["live_tally_checksum"]
+        if request.query_params.get("verify"):
+            recount["data_intact"] = ballots.verify_data()
+        return Response(recount, status=status.HTTP_200_OK)
+
+
+class VoteLedgerExportAPIView(APIView):
+    """Stream an election's vote ledger for auditors as CSV or NDJSON, optionally gzipped"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, election_id, ext):
+        file_format, _, compression = ext.partition('.')
+        if file_format not in FORMATS or compression not in ('', 'gz'):
+            return Response({"error": "Export as .csv, .ndjson, .csv.gz or .ndjson.gz."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            election = get_object_or_404(Election, id=election_id)
+            filters = parse_ledger_filters(request.query_params)
+        except Http404:
+            return Response({"error": "Election not found."}, status=status.HTTP_404_NOT_FOUND)
+        except ValidationError as e:
+            return Response({"error": str(e.detail[0])}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            export_ledger(election.id, file_format, compress=bool(compression), **filters),
+            content_type="application/gzip" if compression else
+            ("text/csv" if file_format == "csv" else "application/x-ndjson"),
+        )
+        response["Content-Disposition"] = f'attachment; filename="election-{election.id}-votes.{ext}"'
+        return response
+
+
+class ResultsStreamTicketAPIView(APIView):
+    """Short-lived ticket for opening an election's results stream from EventSource"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, election_id):
+        election = get_object_or_404(Election, id=election_id)
+        return Response({
+            "ticket": issue_stream_ticket(request.user.id, election.id),
+            "expires_in": settings.RESULTS_STREAM_TICKET_SECONDS,
+        }, status=status.HTTP_201_CREATED)
+
+
+@require_GET
+async def election_results_stream(request, election_id):
+    """Live results as Server-Sent Events; EventSource cannot set headers, so `?ticket=` is accepted too"""
+    try:
+        if request.GET.get("ticket"):
+            user_id = check_stream_ticket(request.GET["ticket"], election_id)
+            if not await User.objects.filter(id=user_id, is_active=True).aexists():
+                raise AuthenticationFailed("User not found or inactive.")
+        elif not await sync_to_async(CachedJWTAuthentication().authenticate)(request):
+            raise AuthenticationFailed("Authentication credentials were not provided.")
+    except AuthenticationFailed as e:
+        return JsonResponse({"detail": str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    if not await Election.objects.filter(id=election_id).aexists():
+        return JsonResponse({"error": "Election not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    response = StreamingHttpResponse(
+        live_results.stream(election_id, request.headers.get("Last-Event-ID")),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Stop nginx from buffering the stream
+    return response
+
+
+@staff_member_required
+def results_chart(request, digest):
+    """Serve a rendered results chart; content-addressed, so it never changes"""
+    try:
+        chart = open(chart_path(digest), 'rb')
+    except FileNotFoundError:
+        raise Http404("Chart not found.")
+    response = FileResponse(chart, content_type="image/png")
+    response["Cache-Control"] = "private, max-age=31536000, immutable"
+    response["ETag"] = f'"{digest}"'
+    return response
+
+
+@require_GET
+def metrics(request):
+    """Request latency and SQL metrics in Prometheus text format"""
+    if not settings.REQUEST_INSTRUMENTATION:
+        raise Http404("Instrumentation is disabled.")
+    if settings.METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(latency_histograms.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class SiteStatisticsAPIView(APIView):
+    """Row counters for the ops dashboard"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(site_statistics.totals(), status=status.HTTP_200_OK)
+
+
+class ResultsCacheStatsAPIView(APIView):
+    """Hit and miss counters of this worker's results cache"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(results_cache.stats(), status=status.HTTP_200_OK)
         
 from django.utils.encoding import force_bytes, force_str     
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -203,12 +475,11 @@ class ForgotPasswordView(APIView):
             reset_link  = request.build_absolute_uri(reverse('reset-password', args=[uid,token]))
             # reset_link = f"{settings.FRONTEND_URL}/reset-password/{uid}/{token}/"
             
-            send_mail(
+            queue_email(
                 "Password Reset Request",
                 f"Click the link to reset your password: {reset_link}",
                 settings.DEFAULT_FROM_EMAIL,
                 [user.email],
-                fail_silently=False,
             )
             
             return Response({"message": "Password reset link sent!"}, status=status.HTTP_200_OK)
@@ -2,6 +2,9 @@
 ASGI config for voting_system project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn voting_system.asgi:application``)
+for the async login and the live results stream, which holds a connection
+open per subscriber without tying up a worker thread.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -0,0 +1,30 @@
+"""
+Local SQLite stand-in for load benchmarks:
+
+    export DJANGO_SETTINGS_MODULE=voting_system.bench_settings
+    python manage.py migrate --run-syncdb
+    python manage.py seed_scale --voters 20000 --elections 6 --candidates 8
+    python manage.py bench_scale --output bench.json
+"""
+
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'bench.sqlite3'),
+        'OPTIONS': {'timeout': 30},  # Concurrent writers wait for the lock instead of failing
+    }
+}
+ALLOWED_HOSTS = ['testserver', 'localhost', '127.0.0.1']
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+VOTE_QUEUE_PATH = os.path.join(BASE_DIR, 'bench_vote_queue.sqlite3')
+# Shared by every process on this machine, without a Redis server
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'voting-bench-cache'),
+    }
+}
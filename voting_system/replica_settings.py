@@ -0,0 +1,36 @@
+"""
+Two local SQLite databases standing in for the MySQL primary and its read
+replica. Nothing copies rows between them, so a read routed to the wrong
+alias shows up as missing or stale data:
+
+    export DJANGO_SETTINGS_MODULE=voting_system.replica_settings
+    python manage.py migrate --run-syncdb
+    python manage.py migrate --run-syncdb --database replica
+    python manage.py test voting.tests.ReadReplicaTests voting.tests.ReadRoutingPolicyTests
+
+Other test classes only declare the `default` database, so they cannot run
+against this configuration.
+"""
+
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'primary.sqlite3'),
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+    },
+}
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+# Shared by every process on this machine, without a Redis server
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'voting-replica-cache'),
+    }
+}
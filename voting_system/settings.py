@@ -50,11 +50,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'voting.middleware.InstrumentationMiddleware',  # Inactive unless REQUEST_INSTRUMENTATION is set
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'voting.middleware.JWTAuthenticationMiddleware',
+    'voting.middleware.ReadConsistencyMiddleware',  # After authentication: pinning is per user
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -94,6 +97,23 @@ DATABASES = {
     }
 }
 
+# Optional read replica of the primary. Views that tolerate slightly stale
+# data read from it; without DB_REPLICA_HOST every read goes to `default`.
+if os.getenv("DB_REPLICA_HOST"):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv("DB_REPLICA_HOST"),
+        'PORT': os.getenv("DB_REPLICA_PORT", os.getenv("DB_PORT")),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['voting.routing.PrimaryReplicaRouter']
+REPLICA_DATABASE = 'replica'
+# After voting, a user's reads stay on the primary this long (replication
+# lag); the pins live in this shared cache alias
+PRIMARY_STICKY_SECONDS = 15
+ROUTING_CACHE_ALIAS = 'default'
+
 
 
 # Password validation
@@ -159,10 +179,20 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD") # Replace with your email
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'voting.authentication.CachedJWTAuthentication',
+    ),
+    # orjson-backed JSON, byte-for-byte the same as DRF's JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': (
+        'voting.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
 }
 
+# Verified access tokens are cached per worker for at most this many seconds
+# (and never past their expiry), keyed by token signature
+JWT_AUTH_CACHE_TTL = 60
+JWT_AUTH_CACHE_MAX_ENTRIES = 10000
+
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -217,3 +247,77 @@ JAZZMIN_SETTINGS = {
 TIME_ZONE = 'Asia/Kolkata'
 USE_TZ = True  # Keep this True for correct datetime handling
 LOGIN_URL = "/login/"
+
+# Number of counter rows each candidate's live vote total is spread across
+VOTE_COUNTER_SHARDS = 16
+
+# Write-behind vote ingestion: when enabled, votes are queued in a local
+# SQLite file and committed in batches by `manage.py process_vote_queue`
+VOTE_INGESTION_QUEUED = os.getenv("VOTE_INGESTION_QUEUED", "false").lower() == "true"
+VOTE_QUEUE_PATH = os.path.join(BASE_DIR, 'vote_queue.sqlite3')
+
+# Shared cache: web workers, `process_vote_queue` and the scheduler all
+# read and bump the same keys here, so it must not be process-local
+# (a system check refuses LocMem)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0"),
+    }
+}
+
+# Election results cache: tally versions and shared entries live in this
+# Django cache alias; each worker also keeps an LRU of the most recent entries
+RESULTS_CACHE_ALIAS = 'default'
+RESULTS_CACHE_MAX_ENTRIES = 1024
+RESULTS_CACHE_TIMEOUT = 300
+
+# Password checks for the async login view run in this many threads
+# (default: one per CPU); logins beyond the pending limit get a 503
+LOGIN_HASH_WORKERS = None
+LOGIN_HASH_MAX_PENDING = 512
+
+# Email outbox delivery (`manage.py send_outbox`): failed sends are retried
+# after EMAIL_OUTBOX_RETRY_BASE seconds, doubling each attempt
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_BASE = 30
+EMAIL_OUTBOX_LEASE = 300
+
+# Rendered admin result charts, stored by content hash
+CHART_CACHE_DIR = os.path.join(BASE_DIR, 'chart_cache')
+
+# Shards per site statistic (admin home counters); reconcile them
+# periodically with `manage.py reconcile_statistics`
+STATISTIC_SHARDS = 8
+
+# Live results stream (`/api/elections/<id>/results/stream/`, needs an ASGI
+# server): one broadcaster per election checks the tally version every
+# LIVE_RESULTS_POLL_INTERVAL seconds; clients more than LIVE_RESULTS_MAX_BUFFER
+# events behind are sent a fresh snapshot instead
+LIVE_RESULTS_POLL_INTERVAL = 1
+LIVE_RESULTS_HEARTBEAT = 15
+LIVE_RESULTS_MAX_BUFFER = 32
+LIVE_RESULTS_HISTORY = 64
+# Lifetime of the signed ticket a browser puts in the stream URL instead of
+# its access token (EventSource cannot send headers)
+RESULTS_STREAM_TICKET_SECONDS = 60
+
+# Turnout rollup (`manage.py rollup_turnout --loop`) only reads votes older
+# than this many seconds, so transactions still open have committed
+TURNOUT_ROLLUP_LAG = 10
+
+# `manage.py reconcile_tallies` checkpoints only votes older than this many
+# seconds; newer ones are recounted on every run until they settle
+TALLY_RECONCILE_LAG = 10
+
+# Columnar ballot files for recounts (`manage.py export_ballots`); put this
+# on storage every worker can map
+BALLOT_SNAPSHOT_DIR = os.path.join(BASE_DIR, 'ballot_snapshots')
+
+# Per-request SQL and latency instrumentation: Server-Timing headers, a
+# sampled JSON log on the `voting.requests` logger and Prometheus metrics
+# at /metrics (send `Authorization: Bearer <METRICS_TOKEN>` when set)
+REQUEST_INSTRUMENTATION = os.getenv("REQUEST_INSTRUMENTATION", "false").lower() == "true"
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "0.01"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")